@@ -1,20 +1,34 @@
 # Pose_session.py
 import cv2
+import logging
 import time
-import mediapipe as mp
-import os
 import numpy as np
-import csv
-from pose import mountain_pose_score, tree_pose_score, warrior2_pose_score
+from adaptive_inference import AdaptiveDetector
+from free_flow import FreeFlowScorer
+from governor import QualityGovernor
+from hold_tracker import BREAK, DONE, HOLD_TIME, LOG, START, HoldTracker
+from landmark_store import LandmarkRecorder, detected_landmarks
+from perf import PerfHud, PerfStats
+from pipeline import PosePipeline
+from reference_cache import ReferenceCache
+from reference_index import load_scorers
+from roi_inference import RoiDetector
+from score_logger import ScoreLogger, open_sink
+from session_resources import create_pose_detector, reset_tracking
+from session_stats import SessionStats, lesson_name
+from text_overlay import TextCache
+from pose import FEEDBACK_LANDMARKS, FEEDBACK_MESSAGES, POSES, frame_xy
+
+log = logging.getLogger(__name__)
 
 # -------------------------
 # Pose mappings
 # -------------------------
-POSE_FUNCTIONS = {
-    "MOUNTAIN": mountain_pose_score,
-    "TREE": tree_pose_score,
-    "WARRIOR2": warrior2_pose_score
-}
+# Every pose in pose.POSE_SPECS is available; only the videos are listed here
+POSE_FUNCTIONS = {name: pose.score for name, pose in POSES.items()}
+
+# Batch scorers over (N, 33, 3) landmark arrays, for offline regrading
+POSE_BATCH_FUNCTIONS = {name: pose.score_batch for name, pose in POSES.items()}
 
 POSE_VIDEOS = {
     "MOUNTAIN": "mountain.MOV",
@@ -22,46 +36,42 @@ POSE_VIDEOS = {
     "WARRIOR2": "warriorII.MOV"
 }
 
-HOLD_TIME = 10.0      # seconds to hold after reaching 90%
-TARGET_SCORE = 90.0   # %
-LAST_LOG_TIME = 0     # Last time the score was logged
+# How each index pose's clip is turned upright; the clips above use reference_cache.CLIP_ROTATION
+POSE_ROTATIONS = {}
+
+
+def _reference_scorers():
+    try:
+        return load_scorers()
+    except Exception:  # corrupt or unreadable index
+        log.exception("Could not load the reference index, only rule-scored poses are available")
+        return {}
+
+
+# Poses recorded from a demo clip (reference_index.py) that have no rule spec
+for _name, _scorer in _reference_scorers().items():
+    if _name not in POSE_FUNCTIONS:
+        POSE_FUNCTIONS[_name] = _scorer.score
+        POSE_BATCH_FUNCTIONS[_name] = _scorer.score_batch
+        POSE_VIDEOS.setdefault(_name, _scorer.video)
+        POSE_ROTATIONS[_name] = _scorer.rotation
+
+FREE_FLOW = "FREE FLOW"  # shown while no pose is recognized in free-flow mode
+
 
 # -------------------------
 # Feedback logs
 # -------------------------
 
-def generate_feedback(scores):
-    feedback = []
-
-    # Knees
-    if "front_knee" in scores and scores["front_knee"] < 0.8:
-        feedback.append("Front knee not bent enough or too bent")
-    if "back_knee" in scores and scores["back_knee"] < 0.8:
-        feedback.append("Back leg should be straight")
-
-    # Arms
-    if "left_arm" in scores and scores["left_arm"] < 0.8:
-        feedback.append("Left arm not level with shoulder")
-    if "right_arm" in scores and scores["right_arm"] < 0.8:
-        feedback.append("Right arm not level with shoulder")
-
-    # Elbows
-    if "left_elbow" in scores and scores["left_elbow"] < 0.8:
-        feedback.append("Left elbow not fully extended")
-    if "right_elbow" in scores and scores["right_elbow"] < 0.8:
-        feedback.append("Right elbow not fully extended")
-
-    # Additional for other poses
-    if "standing_leg" in scores and scores["standing_leg"] < 0.8:
-        feedback.append("Standing leg should be straight")
-    if "lifted_foot" in scores and scores["lifted_foot"] < 0.8:
-        feedback.append("Lifted foot not high enough")
-    if "hands" in scores and scores["hands"] < 0.8:
-        feedback.append("Hands too far apart or too close")
-    if "hand_height" in scores and scores["hand_height"] < 0.8:
-        feedback.append("Hands not level with shoulders")
-
-    return feedback
+def generate_feedback(scores, threshold=0.8):
+    """
+    Messages for the rules in scores that fall below threshold, in rule order
+    """
+    return [
+        FEEDBACK_MESSAGES[name]
+        for name, value in scores.items()
+        if value < threshold and name in FEEDBACK_MESSAGES
+    ]
 
 # -------------------------
 # Circle drawing
@@ -69,182 +79,364 @@ def generate_feedback(scores):
 
 def draw_feedback_circles(frame, lm, scores, threshold=0.8):
     """
-    Draws red circles on joints that scored below threshold
+    Draws red circles on joints that scored below threshold.
+    lm is a (33, >=2) landmark array or a MediaPipe landmark list.
     """
     h, w, _ = frame.shape
+    xs, ys = frame_xy(lm)
 
-    def draw_point(landmark, color=(0, 0, 255)):
-        x, y = int(landmark.x * w), int(landmark.y * h)
+    def draw_point(index, color=(0, 0, 255)):
+        x, y = int(xs[index] * w), int(ys[index] * h)
         cv2.circle(frame, (x, y), 12, color, -1)
 
-    # Warrior II / general mapping
-    if "front_knee" in scores and scores["front_knee"] < threshold:
-        # Pick front knee landmark (we can infer in pose code or just use left knee for simplicity)
-        draw_point(lm[25])  # left knee
-    if "back_knee" in scores and scores["back_knee"] < threshold:
-        draw_point(lm[26])  # right knee
-    if "left_arm" in scores and scores["left_arm"] < threshold:
-        draw_point(lm[15])  # left wrist
-    if "right_arm" in scores and scores["right_arm"] < threshold:
-        draw_point(lm[16])  # right wrist
-    if "left_elbow" in scores and scores["left_elbow"] < threshold:
-        draw_point(lm[13])  # left elbow
-    if "right_elbow" in scores and scores["right_elbow"] < threshold:
-        draw_point(lm[14])  # right elbow
-    if "hands" in scores and scores["hands"] < threshold:
-        draw_point(lm[15])  # left wrist
-        draw_point(lm[16])  # right wrist
-    if "hand_height" in scores and scores["hand_height"] < threshold:
-        draw_point(lm[15])
-        draw_point(lm[16])
-    if "lifted_foot" in scores and scores["lifted_foot"] < threshold:
-        draw_point(lm[27])  # left ankle
-        draw_point(lm[28])  # right ankle
+    # Joints per rule come from the pose specs (pose.POSE_SPECS)
+    for name, value in scores.items():
+        if value < threshold:
+            for index in FEEDBACK_LANDMARKS.get(name, ()):
+                draw_point(index)
 
 
 # -------------------------
-# Main session runner (modified for 0.5s logging)
+# Frame compositing
 # -------------------------
-def run_pose_session(poses, mode="coach"):
+# Static video-mode background, built once and copied into the display buffer
+VIDEO_BACKGROUND = np.full((480, 640, 3), (211, 177, 211), dtype=np.uint8)
+TEXT_CACHE = TextCache()  # score, hold timer and feedback lines, rendered once each
+
+
+def compose_display(frame_cam, lm, pose_name, score, scores, mode="coach", clip=None, hold_elapsed=None,
+                    perf=None, out=None):
     """
-    Run a yoga session with live feedback (coach) or just video+score (video)
-    Logs scores to a CSV file every 0.5 seconds after reaching TARGET_SCORE.
+    Build the frame shown to the student: the camera image (coach) or a plain
+    background (video), feedback circles and text, the instructor clip, the
+    score and, while holding, the hold timer. Stage times go to perf if given.
+    The frame is composed into `out` when given; passing frame_cam itself as
+    `out` in coach mode draws straight onto the camera frame.
     """
-    mp_pose = mp.solutions.pose
-    pose_detector = mp_pose.Pose(
-        static_image_mode=False,
-        min_detection_confidence=0.5,
-        min_tracking_confidence=0.5
-    )
-
-    cap_cam = cv2.VideoCapture(0)  # always open camera for scoring
-
-    cv2.namedWindow("Yoga Sense", cv2.WINDOW_NORMAL)
-    cv2.setWindowProperty("Yoga Sense", cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
-
-    # Prepare CSV logging
-    score_log = []  # (pose_name, score, timestamp)
-    csv_file = f"yoga_scores_{int(time.time())}.csv"
-    with open(csv_file, "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(["Pose", "Score", "Timestamp"])
-
-    for pose_name in poses:
-        scorer = POSE_FUNCTIONS[pose_name]
-        hold_start = None
-        hold_active = False  # True when countdown started
-        last_log_time = 0    # Tracks 0.5s logging interval
-
-        # Video setup
-        cap_vid = None
-        if pose_name in POSE_VIDEOS and os.path.exists(POSE_VIDEOS[pose_name]):
-            cap_vid = cv2.VideoCapture(POSE_VIDEOS[pose_name])
-
-        while True:
-            ret_cam, frame_cam = cap_cam.read()
-            if not ret_cam:
-                break
+    # Build display first
+    background = frame_cam if mode == "coach" else VIDEO_BACKGROUND
+    if out is None:
+        display = background.copy()
+    else:
+        display = out
+        if display is not background:
+            np.copyto(display, background)
 
-            # Build display first
-            display = frame_cam.copy() if mode == "coach" else np.full((480, 640, 3), (211, 177, 211), dtype=np.uint8)
+    feedback = []
+    if lm is not None and mode == "coach":
+        # Generate textual feedback
+        feedback = generate_feedback(scores)
+        # Draw circles on incorrect joints
+        draw_feedback_circles(display, lm, scores)
+    if perf:
+        perf.lap("feedback")
+
+    # Overlay pose video (if any)
+    if clip:
+        display[:, -clip.width:] = clip.next_frame()
+    if perf:
+        perf.lap("overlay")
+
+    # Show hold timer
+    if hold_elapsed is not None:
+        TEXT_CACHE.draw(display,
+                    f"Holding: {hold_elapsed:.1f}s / {HOLD_TIME}s",
+                    (20, 100),
+                    cv2.FONT_HERSHEY_SIMPLEX,
+                    1.2,
+                    (255, 255, 255),
+                    3)
+
+    # Show score
+    TEXT_CACHE.draw(display,
+                f"{pose_name}  {int(score)}%",
+                (20, 50),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                1.4,
+                (0, 255, 0),
+                3)
+
+    # Show textual feedback
+    if mode == "coach":
+        for i, line in enumerate(feedback[:4]):
+            TEXT_CACHE.draw(display,
+                        line,
+                        (20, 140 + i * 40),
+                        cv2.FONT_HERSHEY_SIMPLEX,
+                        1,
+                        (0, 200, 255),
+                        2)
+    if perf:
+        perf.lap("text")
 
-            score = 0
-            feedback = []
+    return display
 
-            if ret_cam:
-                rgb = cv2.cvtColor(frame_cam, cv2.COLOR_BGR2RGB)
-                result = pose_detector.process(rgb)
-                if result.pose_landmarks:
-                    lm = result.pose_landmarks.landmark
-                    score, _, scores = scorer(lm)
 
-                    if mode == "coach":
-                        # Generate textual feedback
-                        feedback = generate_feedback(scores)
-                        # Draw circles on incorrect joints
-                        draw_feedback_circles(display, lm, scores)
-
-            # Overlay pose video (if any)
-            if cap_vid:
-                ret_vid, frame_vid = cap_vid.read()
-                if not ret_vid:
-                    cap_vid.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                    ret_vid, frame_vid = cap_vid.read()
-                frame_vid = cv2.rotate(frame_vid, cv2.ROTATE_90_COUNTERCLOCKWISE)
-                vh, vw = frame_vid.shape[:2]
-                scale = display.shape[0] / vh
-                new_w = int(vw * scale)
-                new_h = display.shape[0]
-                frame_vid_resized = cv2.resize(frame_vid, (new_w, new_h))
-                display[:, -new_w:] = frame_vid_resized
-
-            # Start hold when score reaches target
-            if score >= TARGET_SCORE and not hold_active:
-                hold_start = time.time()
-                hold_active = True
-                last_log_time = time.time()  # log immediately
-                timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
-                score_log.append((pose_name, score, timestamp))
-                with open(csv_file, "a", newline="") as f:
-                    writer = csv.writer(f)
-                    writer.writerow([pose_name, score, timestamp])
-
-            # Hold countdown & periodic logging
-            if hold_active:
-                elapsed = time.time() - hold_start
-
-                # Log score every 0.5s
-                if time.time() - last_log_time >= 0.5:
-                    timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
-                    score_log.append((pose_name, score, timestamp))
-                    with open(csv_file, "a", newline="") as f:
-                        writer = csv.writer(f)
-                        writer.writerow([pose_name, score, timestamp])
-                    last_log_time = time.time()
-
-                # Show hold timer
-                cv2.putText(display,
-                            f"Holding: {elapsed:.1f}s / {HOLD_TIME}s",
-                            (20, 100),
-                            cv2.FONT_HERSHEY_SIMPLEX,
-                            1.2,
-                            (255, 255, 255),
-                            3)
-                if elapsed >= HOLD_TIME:
-                    break  # next pose
-
-            # Show score
-            cv2.putText(display,
-                        f"{pose_name}  {int(score)}%",
-                        (20, 50),
-                        cv2.FONT_HERSHEY_SIMPLEX,
-                        1.4,
-                        (0, 255, 0),
-                        3)
-
-            # Show textual feedback
-            if mode == "coach":
-                for i, line in enumerate(feedback[:4]):
-                    cv2.putText(display,
-                                line,
-                                (20, 140 + i * 40),
-                                cv2.FONT_HERSHEY_SIMPLEX,
-                                1,
-                                (0, 200, 255),
-                                2)
-
-            cv2.imshow("Yoga Sense", display)
-            if cv2.waitKey(1) & 0xFF == 27:
-                cap_cam.release()
-                if cap_vid:
-                    cap_vid.release()
-                cv2.destroyAllWindows()
-                return
-
-        if cap_vid:
-            cap_vid.release()
-
-    cap_cam.release()
+# -------------------------
+# Presenting frames
+# -------------------------
+WINDOW_NAME = "Yoga Sense"
+
+
+def show_in_window(display, lm=None, score=0):
+    """
+    Default presenter: shows the frame in the session window.
+    Returns True when the student pressed Esc.
+    """
+    cv2.imshow(WINDOW_NAME, display)
+    return cv2.waitKey(1) & 0xFF == 27
+
+
+def show_message(text, duration_ms=2000):
+    """
+    Show a line of text on the plain background in the session window.
+    """
+    display = VIDEO_BACKGROUND.copy()
+    cv2.putText(display, text, (50, 240), cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 0, 0), 4, cv2.LINE_AA)
+    cv2.imshow(WINDOW_NAME, display)
+    cv2.waitKey(duration_ms)
     cv2.destroyAllWindows()
-    print(f"Session finished! Scores saved to {csv_file}")
+
+
+# -------------------------
+# Main session runner (modified for 0.5s logging)
+# -------------------------
+def run_pose_session(poses, mode="coach", pipelined=False, record=False,
+                     log_format="csv", telemetry=False, perf_hud=False, adaptive=False, target_fps=None,
+                     source=0, present=None, session_id=None, resources=None, stats=None, free_flow=False,
+                     clock=time.time, roi=False):
+    """
+    Run a yoga session with live feedback (coach) or just video+score (video)
+    Logs scores every 0.5 seconds during a hold (see hold_tracker.py), and a
+    row marking each hold that broke or was done, to a yoga_scores_* file in
+    log_format ("csv", "jsonl" or "binary"), on a background writer thread. With telemetry=True, every frame's score and
+    components are also logged to yoga_telemetry_*.
+    With pipelined=True, capture and inference run on worker threads and this
+    loop only scores, composites and displays the freshest result.
+    With record=True, per-frame landmarks are saved to yoga_landmarks_*.lmk
+    for replay without MediaPipe (see landmark_store.py).
+    Per-stage timings are always collected and saved to yoga_perf_*.json;
+    perf_hud=True also draws FPS and latency on screen.
+    With adaptive=True, MediaPipe only runs every few frames or on motion and
+    landmarks are extrapolated in between (see adaptive_inference.py).
+    With target_fps set, inference resolution and model complexity are
+    stepped up or down to hold that frame rate (see governor.py).
+    With roi=True, MediaPipe only sees a small crop around the student once
+    they are found (see roi_inference.py).
+    source is the cv2.VideoCapture camera index or path. present(display, lm,
+    score) shows each frame and returns True to quit; by default a fullscreen
+    window. session_id is appended to the names of the files written.
+    resources (a session_resources.SessionResources) lends an already open
+    camera and warmed-up detector instead of creating them; source is then
+    ignored and both stay open afterwards.
+    Time to target, hold scores and completion are added to `stats` (a
+    session_stats.SessionStats, new if None), which is returned.
+    With free_flow=True there is no schedule: every pose in `poses` (all
+    poses if None) is scored on every frame and the one the student is
+    doing is recognized and held (see free_flow.py), until Esc or the end
+    of the stream. A hold keeps its pose until it is done or breaks, even
+    when another pose is recognized meanwhile.
+    clock() gives the wall-clock time used for holds, logs and file names;
+    simulations pass their own (see soak.py).
+    """
+    perf = PerfStats()  # created first so first_frame_ms covers startup
+    if resources:
+        cap_cam, pose_detector = resources.acquire()
+    else:
+        pose_detector = create_pose_detector()
+        cap_cam = cv2.VideoCapture(source)  # always open camera for scoring
+    # Everything opened below is closed in the finally, also when a frame raises
+    governor = pipeline = reference_cache = score_logger = telemetry_logger = recorder = None
+    own_window = present is None
+    try:
+        if target_fps:
+            pose_detector = governor = QualityGovernor(
+                pose_detector, target_fps,
+                spares=resources.spare_detectors if resources else None, close_detector=not resources
+            )
+        if roi:
+            pose_detector = RoiDetector(pose_detector)
+        if adaptive:
+            pose_detector = AdaptiveDetector(pose_detector)
+
+        hud = PerfHud(perf) if perf_hud else None
+
+        if pipelined:
+            pipeline = PosePipeline(cap_cam, pose_detector, perf=perf)
+            pipeline.start()
+
+        # Instructor clips are decoded and scaled once, next pose prefetched during each hold
+        reference_cache = ReferenceCache(POSE_VIDEOS, rotations=POSE_ROTATIONS)
+        display_height = 480 if mode == "video" else int(cap_cam.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        if poses and not free_flow:
+            reference_cache.prefetch(poses[0], display_height)
+
+        if own_window:
+            cv2.namedWindow(WINDOW_NAME, cv2.WINDOW_NORMAL)
+            cv2.setWindowProperty(WINDOW_NAME, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+            present = show_in_window
+
+        # Prepare score logging
+        session_start = clock()
+        session_tag = f"{int(session_start)}_{session_id}" if session_id else f"{int(session_start)}"
+        score_logger = ScoreLogger(open_sink(log_format, f"yoga_scores_{session_tag}"))
+        if telemetry:
+            telemetry_logger = ScoreLogger(open_sink(log_format, f"yoga_telemetry_{session_tag}"))
+
+        if record:
+            recorder = LandmarkRecorder(f"yoga_landmarks_{session_tag}.lmk", session_start)
+
+        # Buffers reused by every frame, so the loop does not allocate per frame
+        frame_cam = rgb = None
+        video_display = np.empty_like(VIDEO_BACKGROUND)
+
+        stats = stats if stats is not None else SessionStats()
+        stats.begin_session()
+
+        recognizer = None
+        if free_flow:
+            recognizer = FreeFlowScorer(poses)
+            poses = [None]  # one open-ended segment; the pose follows the student
+
+        aborted = False  # Esc pressed
+        for pose_index, pose_name in enumerate(poses):
+            scorer = POSE_FUNCTIONS.get(pose_name)
+            hold = HoldTracker(clock=clock)
+            completed = False
+            if not recognizer:
+                stats.begin_pose(pose_name, clock())
+            next_pose = poses[pose_index + 1] if pose_index + 1 < len(poses) else None
+            if pose_index:
+                # Detect the new pose from scratch instead of tracking the last one
+                if pipeline:
+                    pipeline.reset_tracking()
+                else:
+                    reset_tracking(pose_detector)
+
+            while True:
+                if pipeline:
+                    if frame_cam is not None:
+                        pipeline.release(frame_cam)  # displayed, recycle the buffer
+                        frame_cam = None
+                    packet = pipeline.get()
+                    if packet is None:
+                        break
+                    capture_time, frame_cam, lm = packet
+                    perf.start()
+                else:
+                    perf.start()
+                    ret_cam, frame_cam = cap_cam.read(frame_cam)
+                    if not ret_cam:
+                        break
+                    capture_time = None
+                    perf.lap("capture")
+                    rgb = cv2.cvtColor(frame_cam, cv2.COLOR_BGR2RGB, dst=rgb)
+                    perf.lap("color")
+                    result = pose_detector.process(rgb)
+                    lm = detected_landmarks(result)  # not copied; the scorers and recorder read it as is
+                    perf.lap("inference")
+
+                if recorder:
+                    recorder.write(clock() - session_start, lm)
+
+                display_height = frame_cam.shape[0] if mode == "coach" else 480
+                score = 0
+                scores = {}
+                if recognizer:
+                    recognized, score, scores = recognizer.score(lm)
+                    if recognized != pose_name:
+                        if hold.active:
+                            # Another pose leads, but the hold only breaks through the
+                            # tracker's exit grace: keep scoring the held pose until then
+                            score, scores = 0, {}
+                            if lm is not None:
+                                score, _, scores = POSE_FUNCTIONS[pose_name](lm)
+                        else:
+                            pose_name = recognized
+                            hold.reset()
+                elif lm is not None:
+                    score, _, scores = scorer(lm)
+
+                # A hold starts at the target score and logs every LOG_INTERVAL until it is done or breaks
+                now = clock()
+                events = hold.update(score, now)
+                if START in events:
+                    if recognizer:
+                        stats.begin_pose(pose_name)  # free flow: an attempt is a started hold
+                    if next_pose:
+                        reference_cache.prefetch(next_pose, display_height)
+                if LOG in events:
+                    score_logger.log(now, pose_name, score, scores)
+                    stats.hold(now, score)
+                if telemetry_logger:
+                    telemetry_logger.log(now, pose_name or FREE_FLOW, score, scores)
+                if BREAK in events:
+                    # Marks the break for replay, with the broken hold's summary
+                    score_logger.log(now, pose_name, hold.mean, hold.summary(), BREAK)
+                    if recognizer:
+                        stats.end_pose(False)
+                if DONE in events:
+                    completed = True
+                    score_logger.log(now, pose_name, hold.mean, hold.summary(), DONE)
+                    if not recognizer:
+                        break  # next pose
+                    stats.end_pose(True)  # held; the next hold needs another pose
+                perf.lap("scoring")
+
+                display = compose_display(
+                    frame_cam, lm, pose_name or FREE_FLOW, score, scores, mode,
+                    clip=None if recognizer else reference_cache.get(pose_name, display_height),
+                    hold_elapsed=hold.elapsed(now) if hold.active else None,
+                    perf=perf,
+                    out=frame_cam if mode == "coach" else video_display
+                )
+                if hud:
+                    hud.draw(display)
+
+                quit_requested = present(display, lm, score)
+                perf.lap("display")
+                if pipeline:
+                    pipeline.mark_displayed(capture_time)
+                perf.end_frame(capture_time)
+                if quit_requested:
+                    aborted = True
+                    break
+
+            if not recognizer:
+                stats.end_pose(completed)
+            if aborted:
+                break
+        if recognizer:
+            stats.end_session(FREE_FLOW.lower(), completed=False)  # open-ended, never complete
+        else:
+            stats.end_session(lesson_name(poses), completed=not aborted)
+    finally:
+        if pipeline:
+            pipeline.stop()
+        if recorder:
+            recorder.close()
+        if score_logger:
+            score_logger.close()
+        if telemetry_logger:
+            telemetry_logger.close()
+        if reference_cache:
+            reference_cache.close()
+        if resources:
+            if governor:
+                governor.close()  # only the detectors it created
+            resources.release()
+        else:
+            cap_cam.release()
+            pose_detector.close()
+        if own_window:
+            cv2.destroyAllWindows()
+
+    perf.dump(f"yoga_perf_{session_tag}.json")
+    if aborted:
+        return stats
+
+    if pipeline:
+        log.info("Mean capture-to-display latency: %.1f ms", pipeline.mean_latency_ms)
+    log.info("Session finished! Scores saved to %s", score_logger.sink.path)
+    return stats
 
@@ -0,0 +1,109 @@
+# adaptive_inference.py
+"""
+Adaptive MediaPipe scheduling.
+
+AdaptiveDetector wraps a pose detector and only runs it every N frames, or
+sooner when the image changes noticeably. On the frames in between it
+extrapolates the last two detections at constant velocity, so scoring and
+feedback still update every frame. N follows the measured inference time:
+inference is kept to roughly `cpu_share` of the frame interval.
+"""
+import math
+import time
+
+import cv2
+
+from landmark_store import ArrayResult, result_landmarks
+from perf import ema
+
+MOTION_SIZE = (64, 48)  # thumbnail used for frame differencing
+
+
+class AdaptiveDetector:
+    """
+    Drop-in replacement for mp_pose.Pose exposing process(rgb).
+    `inferred` tells whether the last result came from the detector.
+    """
+
+    def __init__(self, pose_detector, max_interval=8, motion_threshold=6.0, cpu_share=0.5,
+                 max_extrapolation=2.0):
+        self.pose_detector = pose_detector
+        self.max_interval = max_interval
+        self.motion_threshold = motion_threshold
+        self.cpu_share = cpu_share
+        self.max_extrapolation = max_extrapolation  # in detection intervals
+
+        self.interval = 1
+        self.inferred = False
+        self._since = 0
+        self._thumb = None
+        self._history = []  # up to two (t, (33, 4) array) detections
+        self._inference_ms = None
+        self._frame_ms = None
+        self._last_call = None
+
+    def close(self):
+        self.pose_detector.close()
+
+    def reset(self):
+        """
+        Drop detection history so the next frame runs the detector.
+        """
+        reset = getattr(self.pose_detector, "reset", None)
+        if reset:
+            reset()
+        self._since = 0
+        self._thumb = None
+        self._history = []
+
+    def process(self, rgb, t=None):
+        t = time.perf_counter() if t is None else t
+        if self._last_call is not None:
+            self._frame_ms = ema(self._frame_ms, (t - self._last_call) * 1000)
+        self._last_call = t
+
+        thumb = cv2.cvtColor(cv2.resize(rgb, MOTION_SIZE, interpolation=cv2.INTER_NEAREST), cv2.COLOR_RGB2GRAY)
+        self._since += 1
+        if not self._history or self._since >= self.interval or self._motion(thumb) > self.motion_threshold:
+            return self._infer(rgb, t, thumb)
+
+        self.inferred = False
+        return ArrayResult(self._extrapolate(t))
+
+    def _motion(self, thumb):
+        return float(cv2.absdiff(thumb, self._thumb).mean())
+
+    def _infer(self, rgb, t, thumb):
+        start = time.perf_counter()
+        result = self.pose_detector.process(rgb)
+        self._inference_ms = ema(self._inference_ms, (time.perf_counter() - start) * 1000)
+        self._adapt_interval()
+
+        self.inferred = True
+        self._since = 0
+        self._thumb = thumb
+        values = result_landmarks(result)
+        if values is not None:
+            self._history = self._history[-1:] + [(t, values)]
+        else:
+            self._history = []
+        return result
+
+    def _adapt_interval(self):
+        if not self._frame_ms:
+            return
+        budget = self.cpu_share * self._frame_ms
+        self.interval = max(1, min(self.max_interval, math.ceil(self._inference_ms / budget)))
+
+    def _extrapolate(self, t):
+        t1, latest = self._history[-1]
+        if len(self._history) < 2:
+            return latest
+        t0, previous = self._history[0]
+        step = t1 - t0
+        if step <= 0:
+            return latest
+        ahead = min((t - t1) / step, self.max_extrapolation)
+        values = latest.copy()
+        values[:, :3] += (latest[:, :3] - previous[:, :3]) * ahead
+        return values
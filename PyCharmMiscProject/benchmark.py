@@ -0,0 +1,391 @@
+# benchmark.py
+"""
+Offline benchmarks for scoring, feedback, drawing and the frame loop.
+
+Needs no camera or window: landmarks are synthetic (a standing skeleton with
+noise) or come from a landmark recording, and the detector is a stub that
+hands them back. Results are written as JSON so runs can be compared
+between commits:
+
+    python benchmark.py --out before.json
+    python benchmark.py --out after.json --compare before.json
+    python benchmark.py --landmarks yoga_landmarks_1768475185.lmk
+"""
+import argparse
+import itertools
+import json
+import platform
+import statistics
+import subprocess
+import time
+import timeit
+
+import cv2
+import numpy as np
+
+import landmark_store
+from landmark_store import detected_landmarks, landmark_array, landmarks_from_array
+from free_flow import FreeFlowScorer
+from hold_tracker import HoldTracker
+from pose import POSE_SPECS, CompiledPose, CompiledPoseSet, joint_angle_2d
+from reference_index import ReferenceIndex
+from roi_inference import RoiDetector
+from synthetic import IDEAL_POSES, landmark_stream, synthetic_landmarks
+from text_overlay import TextCache
+from Pose_session import (
+    POSE_BATCH_FUNCTIONS, POSE_FUNCTIONS, compose_display,
+    draw_feedback_circles, generate_feedback
+)
+
+FRAME_SIZE = (720, 1280)
+SUSTAINED_FRAME_SIZE = (1080, 1920)
+
+
+def to_landmark_lists(frames):
+    """
+    Landmark lists as MediaPipe returns them: protobuf messages when
+    mediapipe is installed, so attribute access costs what it does live,
+    otherwise plain Python landmarks.
+    """
+    try:
+        from mediapipe.framework.formats import landmark_pb2
+    except ImportError:
+        return [landmarks_from_array(frame) for frame in frames]
+    lists = []
+    for frame in frames:
+        message = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z, visibility in frame:
+            message.landmark.add(x=x, y=y, z=z, visibility=visibility)
+        lists.append(message.landmark)
+    return lists
+
+
+class StubDetector:
+    """
+    Replays landmark lists in place of mp_pose.Pose.process.
+    """
+
+    class _Result:
+        __slots__ = ("pose_landmarks",)
+
+    class _Landmarks:
+        __slots__ = ("landmark",)
+
+    def __init__(self, landmark_lists):
+        self._results = []
+        for lm in landmark_lists:
+            landmarks = self._Landmarks()
+            landmarks.landmark = lm
+            result = self._Result()
+            result.pose_landmarks = landmarks
+            self._results.append(result)
+        self._index = 0
+
+    def process(self, rgb):
+        result = self._results[self._index]
+        self._index = (self._index + 1) % len(self._results)
+        return result
+
+
+# -------------------------
+# Timing
+# -------------------------
+def measure(fn, repeat=7, per_call=1):
+    """
+    Per-call time of fn in microseconds over `repeat` autoranged runs.
+    per_call divides each call's time, e.g. for batch calls over many frames.
+    """
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    runs = [t / number / per_call * 1e6 for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "min_us": min(runs),
+        "median_us": statistics.median(runs),
+        "mean_us": statistics.fmean(runs),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def run_benchmarks(frames):
+    landmark_lists = to_landmark_lists(frames)
+    lm = landmark_lists[0]
+    frame = np.full(FRAME_SIZE + (3,), 90, dtype=np.uint8)
+    # Every feedback key failing is the worst case for feedback and drawing
+    failing = {key: 0.5 for scorer in POSE_FUNCTIONS.values() for key in scorer(lm)[2]}
+    results = {}
+
+    results["joint_angle_2d"] = measure(lambda: joint_angle_2d(lm[23], lm[25], lm[27]))
+
+    for name, scorer in POSE_FUNCTIONS.items():
+        cycle = itertools.cycle(landmark_lists)
+        results[f"score/{name}"] = measure(lambda: scorer(next(cycle)))
+
+    for name, batch_scorer in POSE_BATCH_FUNCTIONS.items():
+        results[f"score_batch/{name}"] = measure(lambda: batch_scorer(frames), per_call=len(frames))
+
+    # Similarity to instructor frames, against an index built from synthetic demos
+    reference = ReferenceIndex()
+    for name in IDEAL_POSES:
+        reference.add(name, np.array(list(landmark_stream([("noisy", name, 10.0)]))))
+    for name in reference.poses:
+        scorer = reference.scorer(name)
+        cycle = itertools.cycle(landmark_lists)
+        results[f"reference/{name}"] = measure(lambda: scorer.score(next(cycle)))
+        results[f"reference_batch/{name}"] = measure(lambda: scorer.score_batch(frames), per_call=len(frames))
+
+    results["generate_feedback"] = measure(lambda: generate_feedback(failing))
+    results["draw_feedback_circles"] = measure(lambda: draw_feedback_circles(frame, lm, failing))
+    results["landmark_array"] = measure(lambda: landmark_array(lm))
+
+    # Holds that start, dip, break and start again, at 30 fps
+    hold = HoldTracker(hold_time=float("inf"))
+    ticks = itertools.count(0.0, 1 / 30)
+    hold_scores = itertools.cycle([95.0] * 60 + [85.0] * 15 + [70.0] * 45)
+    results["hold/update"] = measure(lambda: hold.update(next(hold_scores), next(ticks)))
+    results.update(overlay_text(generate_feedback(failing)))
+
+    # Scoring, feedback and drawing for one frame on the landmark list, as the
+    # live loop does, against converting it to the array first (the conversion
+    # is the difference)
+    for name, scorer in POSE_FUNCTIONS.items():
+        def on_objects(lm):
+            _, _, scores = scorer(lm)
+            generate_feedback(scores)
+            draw_feedback_circles(frame, lm, scores)
+
+        def on_array(lm):
+            p = landmark_array(lm)
+            _, _, scores = scorer(p)
+            generate_feedback(scores)
+            draw_feedback_circles(frame, p, scores)
+
+        cycle = itertools.cycle(landmark_lists)
+        results[f"frame_objects/{name}"] = measure(lambda: on_objects(next(cycle)))
+        results[f"frame_array/{name}"] = measure(lambda: on_array(next(cycle)))
+
+    # One iteration of run_pose_session after capture: color conversion,
+    # detector (stubbed), scoring, hold state and compositing. imshow/waitKey
+    # need a display and are not included.
+    for name, scorer in POSE_FUNCTIONS.items():
+        detector = StubDetector(landmark_lists)
+        hold = HoldTracker()
+
+        def loop_iteration():
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            lm = detected_landmarks(detector.process(rgb))
+            score, _, scores = scorer(lm)
+            now = time.perf_counter()
+            hold.update(score, now)
+            compose_display(frame, lm, name, score, scores, "coach",
+                            hold_elapsed=hold.elapsed(now) if hold.active else None)
+
+        results[f"loop/{name}"] = measure(loop_iteration)
+
+    results.update(free_flow_scaling(frames))
+    results.update(roi_overhead(landmark_lists))
+    results.update(sustained_session(landmark_lists))
+    return results
+
+
+# Left/right landmark pairs, for mirrored pose variants
+MIRROR = {11: 12, 13: 14, 15: 16, 23: 24, 25: 26, 27: 28}
+MIRROR.update({b: a for a, b in MIRROR.items()})
+
+
+def pose_variants(n):
+    """
+    n pose specs standing in for a larger pose library: the real poses, then
+    mirrored copies (new measures on the other side) and copies with shifted
+    targets (the same measures, different values).
+    """
+    def mirror(node):
+        if isinstance(node, tuple):
+            return tuple(mirror(x) for x in node)
+        return MIRROR.get(node, node) if isinstance(node, int) else node
+
+    def shift(term, k):
+        kind, measure, a, b = term
+        return (kind, measure, a + k * 0.1 * abs(b - a if kind == "ramp" else b), b)
+
+    specs = {}
+    for i in range(n):
+        name, rules = list(POSE_SPECS.items())[i % len(POSE_SPECS)]
+        variant = i // len(POSE_SPECS)
+        rules = [
+            dict(r, terms=[(w, shift(mirror(t) if variant % 2 else t, variant // 2)) for w, t in r["terms"]])
+            for r in rules
+        ]
+        specs[f"{name}_{variant}"] = rules
+    return specs
+
+
+def free_flow_scaling(frames, counts=(1, 3, 6, 12, 24, 48)):
+    """
+    Per-frame cost of scoring every pose for growing pose libraries: each
+    pose evaluated on its own against one CompiledPoseSet sharing measures
+    between poses, plus the budgeted FreeFlowScorer over the real poses.
+    """
+    results = {}
+    for n in counts:
+        specs = pose_variants(n)
+        separate = [CompiledPose(name, rules) for name, rules in specs.items()]
+        shared = CompiledPoseSet(specs)
+        cycle = itertools.cycle(frames)
+        results[f"free_flow/separate/{n}"] = measure(lambda: [pose.evaluate(next(cycle)) for pose in separate])
+        results[f"free_flow/shared/{n}"] = measure(lambda: shared.evaluate(next(cycle)))
+    scorer = FreeFlowScorer()
+    cycle = itertools.cycle(frames)
+    results["free_flow/scorer"] = measure(lambda: scorer.score(next(cycle)))
+    return results
+
+
+def overlay_text(feedback, size=SUSTAINED_FRAME_SIZE):
+    """
+    The session overlay's text on a 1080p frame, drawn with cv2.putText and
+    through a TextCache. The hold timer steps through a ten second hold so
+    the cache sees new strings the way a session does.
+    """
+    display = np.full(size + (3,), 90, dtype=np.uint8)
+    lines = [
+        ("TREE  87%", (20, 50), 1.4, (0, 255, 0), 3),
+        *((line, (20, 140 + i * 40), 1, (0, 200, 255), 2) for i, line in enumerate(feedback[:4])),
+    ]
+    timers = itertools.cycle(f"Holding: {t / 10:.1f}s / 10.0s" for t in range(100))
+    cache = TextCache()
+
+    def draw(put_text):
+        put_text(display, next(timers), (20, 100), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 3)
+        for text, org, scale, color, thickness in lines:
+            put_text(display, text, org, cv2.FONT_HERSHEY_SIMPLEX, scale, color, thickness)
+
+    return {
+        "text/putText": measure(lambda: draw(cv2.putText)),
+        "text/cached": measure(lambda: draw(cache.draw)),
+    }
+
+
+def roi_overhead(landmark_lists, size=SUSTAINED_FRAME_SIZE):
+    """
+    What RoiDetector adds per 1080p frame around a (stubbed) detector:
+    cropping, scaling to its input size and mapping the landmarks back. The
+    detector then works on input_size^2 pixels instead of the full frame.
+    """
+    rgb = np.full(size + (3,), 90, dtype=np.uint8)
+    direct = StubDetector(landmark_lists)
+    cropped = RoiDetector(StubDetector(landmark_lists))
+    return {
+        "roi/direct": measure(lambda: detected_landmarks(direct.process(rgb))),
+        "roi/cropped": measure(lambda: detected_landmarks(cropped.process(rgb))),
+    }
+
+
+def sustained_session(landmark_lists, iterations=600, size=SUSTAINED_FRAME_SIZE):
+    """
+    Per-frame time distribution of a long run of the frame loop at 1080p,
+    once allocating fresh frames like a plain cap.read() loop and once reading
+    into reused buffers the way run_pose_session does. Tail latency and
+    jitter (stdev) are what the buffer reuse is for, so both are reported.
+    """
+    camera = np.full(size + (3,), 90, dtype=np.uint8)
+    name, scorer = next(iter(POSE_FUNCTIONS.items()))
+
+    def run(preallocated):
+        detector = StubDetector(landmark_lists)
+        hold = HoldTracker()
+        frame = np.empty_like(camera) if preallocated else None
+        rgb = None
+        times = np.empty(iterations)
+        for i in range(iterations):
+            start = time.perf_counter()
+            if preallocated:
+                np.copyto(frame, camera)  # stands in for cap.read(frame)
+                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+            else:
+                frame = camera.copy()
+                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            lm = detected_landmarks(detector.process(rgb))
+            score, _, scores = scorer(lm)
+            now = time.perf_counter()
+            hold.update(score, now)
+            compose_display(frame, lm, name, score, scores, "coach",
+                            hold_elapsed=hold.elapsed(now) if hold.active else None,
+                            out=frame if preallocated else None)
+            times[i] = (time.perf_counter() - start) * 1e6
+        return {
+            "min_us": float(times.min()),
+            "median_us": float(np.median(times)),
+            "mean_us": float(times.mean()),
+            "p99_us": float(np.percentile(times, 99)),
+            "max_us": float(times.max()),
+            "stdev_us": float(times.std()),
+            "number": iterations,
+            "repeat": 1,
+        }
+
+    return {
+        "sustained/allocating": run(False),
+        "sustained/preallocated": run(True),
+    }
+
+
+def metadata(source):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "landmarks": source,
+    }
+
+
+def print_results(results, baseline=None):
+    for name, stats in results.items():
+        line = f"{name:<28} {stats['median_us']:>10.2f} us"
+        if "p99_us" in stats:
+            line += f"  p99 {stats['p99_us']:.2f}  stdev {stats['stdev_us']:.2f}"
+        if baseline and name in baseline:
+            ratio = stats["median_us"] / baseline[name]["median_us"]
+            line += f"   x{ratio:.2f} vs baseline"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pose scoring and the frame loop offline.")
+    parser.add_argument("--landmarks", help=".lmk recording to use instead of synthetic landmarks")
+    parser.add_argument("--frames", type=int, default=256, help="synthetic frames to generate")
+    parser.add_argument("--out", default="benchmark.json", help="where to write the JSON results")
+    parser.add_argument("--compare", help="earlier JSON results to compare against")
+    args = parser.parse_args(argv)
+
+    if args.landmarks:
+        track = landmark_store.open_landmarks(args.landmarks)
+        frames = np.asarray(track.landmarks[track.detected], dtype=np.float64)
+        source = args.landmarks
+    else:
+        frames = synthetic_landmarks(args.frames)
+        source = f"synthetic:{args.frames}"
+
+    results = run_benchmarks(frames)
+    with open(args.out, "w") as f:
+        json.dump({"meta": metadata(source), "results": results}, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    print_results(results, baseline)
+    print(f"Results saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
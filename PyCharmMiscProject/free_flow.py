@@ -0,0 +1,104 @@
+# free_flow.py
+"""
+Free-flow scoring: which pose the student is doing, and how well.
+
+FreeFlowScorer evaluates every pose of a pose.CompiledPoseSet on each
+frame, so measures shared between poses are computed once, and reports the
+best-scoring pose. A pose is only recognized above `min_score`, and the
+recognized pose only changes when another one beats it by `margin`, so the
+label does not flicker between poses that score alike.
+
+Evaluating all poses has to fit in `budget_ms` per frame. The scorer times
+itself; when the full evaluation costs more than the budget (a large pose
+set on a slow machine) it runs it only every few frames, often enough to
+stay within budget on average, and scores just the recognized pose on the
+frames in between.
+
+Only poses with a rule spec (pose.POSE_SPECS) take part: poses from the
+reference index (reference_index.py) score by similarity to an instructor,
+which is not comparable with rule scores, so they are left out.
+"""
+import logging
+import math
+import time
+
+import numpy as np
+
+from perf import ema
+from pose import POSE_SET, POSE_SPECS, CompiledPoseSet, landmarks_to_array
+
+BUDGET_MS = 1.0        # per frame, for all poses together
+RECOGNIZE_SCORE = 50.0  # % below which no pose is recognized
+SWITCH_MARGIN = 5.0     # % another pose must lead by to take over
+
+log = logging.getLogger(__name__)
+
+
+class FreeFlowScorer:
+    """
+    score(lm) -> (pose name or None, accuracy, {rule name: score}) per frame.
+    Poses without a rule spec are skipped.
+    """
+
+    def __init__(self, poses=None, budget_ms=BUDGET_MS, min_score=RECOGNIZE_SCORE, margin=SWITCH_MARGIN):
+        if poses is None:
+            self.pose_set = POSE_SET
+        else:
+            skipped = [name for name in poses if name not in POSE_SPECS]
+            if skipped:
+                log.info("Free flow skips poses without a rule spec: %s", ", ".join(skipped))
+            specs = {name: POSE_SPECS[name] for name in poses if name in POSE_SPECS}
+            if not specs:
+                raise ValueError("free flow needs at least one pose with a rule spec")
+            self.pose_set = CompiledPoseSet(specs)
+        self.budget_ms = budget_ms
+        self.min_score = min_score
+        self.margin = margin
+        self.current = None  # index into pose_set of the recognized pose
+        self.accuracies = np.zeros(len(self.pose_set))  # every pose, last full evaluation
+        self.cost_ms = None  # smoothed cost of a full evaluation
+        self._since_full = 0
+
+    @property
+    def stride(self):
+        """
+        Frames per full evaluation needed to stay within budget.
+        """
+        if self.cost_ms is None:
+            return 1
+        return max(1, math.ceil(self.cost_ms / self.budget_ms))
+
+    def score(self, lm):
+        if lm is None:
+            return self._name(), 0.0, {}
+        p = landmarks_to_array(lm)
+        self._since_full += 1
+        if self.current is not None and self._since_full < self.stride:
+            # Over budget: only the recognized pose this frame
+            pose = self.pose_set.poses[self.current]
+            accuracy, scores = pose.evaluate(p)
+            return pose.name, float(accuracy), dict(zip(pose.rule_names, scores.tolist()))
+
+        start = time.perf_counter()
+        accuracies, scores = self.pose_set.evaluate(p)
+        self.cost_ms = ema(self.cost_ms, (time.perf_counter() - start) * 1000)
+        self._since_full = 0
+        self.accuracies = accuracies
+        self._recognize(accuracies)
+        if self.current is None:
+            return None, float(accuracies.max()), {}
+        return self._name(), float(accuracies[self.current]), self.pose_set.rule_scores(scores, self.current)
+
+    def _recognize(self, accuracies):
+        best = int(accuracies.argmax())
+        if accuracies[best] < self.min_score:
+            self.current = None
+        elif self.current is None or accuracies[best] > accuracies[self.current] + self.margin:
+            self.current = best
+
+    def _name(self):
+        return None if self.current is None else self.pose_set.names[self.current]
+
+    def reset(self):
+        self.current = None
+        self._since_full = 0
@@ -0,0 +1,172 @@
+# governor.py
+"""
+Frame-rate governor for pose inference.
+
+QualityGovernor wraps a pose detector and picks the inference input width
+and MediaPipe model complexity from a fixed ladder of quality levels, so
+that processing stays within a share of the target frame time. It moves
+one level at a time: down after the smoothed processing time has been over
+budget for `patience` frames, up only after it has been well under budget
+(below `headroom` of it) for `up_patience` frames, and never twice within
+`cooldown` frames. A level it had to leave for being over budget is not
+retried for `memory` frames, so it does not bounce between two levels.
+Every switch is logged.
+
+The detectors for the other model complexities are built ahead of time, on
+a background thread or by SessionResources, never on the inference thread
+at the moment of a switch. Until one is ready its levels are skipped.
+
+Landmarks are normalized to the image, so a smaller input changes nothing
+for scoring or drawing.
+"""
+import logging
+import threading
+import time
+
+import cv2
+
+from perf import ema
+from session_resources import create_pose_detector, reset_tracking
+
+# (input width or None for the camera's, model complexity), best first
+LEVELS = (
+    (None, 2),
+    (None, 1),
+    (960, 1),
+    (640, 1),
+    (640, 0),
+    (480, 0),
+    (320, 0),
+)
+DEFAULT_LEVEL = 1  # camera resolution, MediaPipe's default complexity
+
+log = logging.getLogger(__name__)
+
+
+class QualityGovernor:
+    """
+    Drop-in replacement for mp_pose.Pose exposing process(rgb). The detector
+    passed in is used for `complexity`. Detectors for other complexities
+    come from `spares` (complexity -> detector, possibly still being filled
+    in, e.g. SessionResources.spare_detectors), which stay open; without
+    spares they are built on a background thread. close() closes the ones
+    it built, and the one passed in only when close_detector is True.
+    """
+
+    def __init__(self, pose_detector, target_fps=30.0, complexity=1, level=DEFAULT_LEVEL,
+                 share=0.8, headroom=0.6, patience=15, up_patience=90, cooldown=60,
+                 memory=1800, spares=None, close_detector=False):
+        self.budget_ms = 1000.0 / target_fps * share
+        self.headroom = headroom
+        self.patience = patience
+        self.up_patience = up_patience
+        self.cooldown = cooldown
+        self.memory = memory
+
+        self.level = level
+        self.switches = 0
+        self.processing_ms = None
+        self._detectors = {complexity: pose_detector}
+        self._spares = spares
+        self._created = [pose_detector] if close_detector else []
+        self._closing = False
+        self._loader = None
+        if spares is None:
+            self._loader = threading.Thread(target=self._load_spares, args=(complexity,), daemon=True)
+            self._loader.start()
+        self._over = 0
+        self._under = 0
+        self._since_switch = 0
+        self._frames = 0
+        self._too_slow = {}  # level -> frame it was left for being over budget
+        self._input = None  # resize buffer
+
+    def _load_spares(self, complexity):
+        # The lighter model first: shedding load is the urgent direction
+        for other in sorted({c for _, c in LEVELS} - {complexity}):
+            if self._closing:
+                return
+            detector = create_pose_detector(model_complexity=other)
+            self._created.append(detector)
+            self._detectors[other] = detector
+
+    def _detector(self, complexity):
+        detector = self._detectors.get(complexity)
+        if detector is None and self._spares is not None:
+            detector = self._spares.get(complexity)
+        return detector
+
+    def _next_level(self, level, step):
+        # Nearest level in this direction whose detector is ready
+        while 0 <= level < len(LEVELS):
+            if self._detector(LEVELS[level][1]) is not None:
+                return level
+            level += step
+        return None
+
+    @property
+    def pose_detector(self):
+        return self._detector(LEVELS[self.level][1])
+
+    def process(self, rgb):
+        start = time.perf_counter()
+        width = LEVELS[self.level][0]
+        if width and width < rgb.shape[1]:
+            size = (width, round(rgb.shape[0] * width / rgb.shape[1]))
+            if self._input is not None and self._input.shape[1::-1] != size:
+                self._input = None  # level changed, reallocate once
+            rgb = self._input = cv2.resize(rgb, size, dst=self._input, interpolation=cv2.INTER_AREA)
+        result = self.pose_detector.process(rgb)
+        self._observe((time.perf_counter() - start) * 1000)
+        return result
+
+    def _observe(self, ms):
+        self.processing_ms = ema(self.processing_ms, ms)
+        self._since_switch += 1
+        self._frames += 1
+        over = self.processing_ms > self.budget_ms
+        under = self.processing_ms < self.budget_ms * self.headroom
+        self._over = self._over + 1 if over else 0
+        self._under = self._under + 1 if under else 0
+        if self._since_switch < self.cooldown:
+            return
+        if self._over >= self.patience:
+            level = self._next_level(self.level + 1, 1)
+            if level is not None:
+                self._too_slow[self.level] = self._frames
+                self._switch(level)
+        elif self._under >= self.up_patience:
+            level = self._next_level(self.level - 1, -1)
+            left = self._too_slow.get(level)
+            if level is not None and (left is None or self._frames - left > self.memory):
+                self._switch(level)
+
+    def _switch(self, level):
+        if LEVELS[level][1] != LEVELS[self.level][1]:
+            # Switching back later should not resume from stale tracking
+            reset_tracking(self.pose_detector)
+        log.info("Governor: level %d %s -> %d %s at %.1f ms (budget %.1f ms)",
+                 self.level, _describe(LEVELS[self.level]), level, _describe(LEVELS[level]),
+                 self.processing_ms, self.budget_ms)
+        self.level = level
+        self.switches += 1
+        self._over = self._under = self._since_switch = 0
+
+    def reset(self):
+        reset_tracking(self.pose_detector)
+
+    def close(self):
+        self._closing = True
+        if self._loader:
+            self._loader.join()
+        for complexity, detector in list(self._detectors.items()):
+            if detector in self._created:
+                del self._detectors[complexity]
+        for detector in self._created:
+            detector.close()
+        self._created = []
+
+
+def _describe(level):
+    width, complexity = level
+    return f"({width or 'full'} px, complexity {complexity})"
@@ -0,0 +1,398 @@
+# grading_service.py
+"""
+Local HTTP service that grades uploaded practice videos.
+
+Jobs go into a bounded queue; a pool of worker processes runs MediaPipe and
+the pose.py scorers on them (the same grading as offline_session.py) and
+returns the score timeline, the logged holds and feedback per pose. When the
+queue is full new jobs are refused with 503 and Retry-After, so a burst of
+uploads cannot pile up unbounded work. Only the standard library is used
+for HTTP; the service is meant for localhost.
+
+    python grading_service.py --workers 4 --queue 32 --port 8765
+
+    POST /jobs?poses=TREE,WARRIOR2&name=clip.mp4   body: the video file
+    POST /jobs   {"path": "/local/clip.mp4", "poses": ["TREE", "WARRIOR2"]}
+        -> 202 {"id": ..., "status": "queued"}
+    GET  /jobs/<id>
+        -> {"id", "status": queued|running|done|failed, "progress": 0..1,
+            "result" (when done) or "error" (when failed)}
+    GET  /health
+        -> queue length, running jobs and worker count
+
+Landmark recordings (.lmk) are graded from the stored landmarks without
+running MediaPipe.
+"""
+import argparse
+import asyncio
+import collections
+import itertools
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+import landmark_store
+from offline_session import POSE_BATCH_FUNCTIONS, extract_landmarks, grade_landmarks
+from pose import POSES
+
+MAX_UPLOAD_BYTES = 512 * 1024 * 1024
+MAX_FINISHED_JOBS = 1024  # finished jobs kept for polling, oldest dropped first
+TIMELINE_STEP = 0.5       # seconds between timeline samples
+CHUNK = 1 << 20
+
+
+# -------------------------
+# Worker processes
+# -------------------------
+_progress_queue = None
+_pose_detector = None
+
+
+def _init_worker(progress_queue):
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def _detector():
+    # One detector per worker process, reused (with tracking reset) across jobs
+    global _pose_detector
+    from session_resources import create_pose_detector, reset_tracking
+    if _pose_detector is None:
+        _pose_detector = create_pose_detector()
+    reset_tracking(_pose_detector)
+    return _pose_detector
+
+
+def grade_job(job_id, path, poses):
+    """
+    Grade one video or .lmk recording; returns the JSON-ready result.
+    """
+    def progress(fraction):
+        _progress_queue.put((job_id, fraction))
+
+    if path.lower().endswith(landmark_store.EXTENSION):
+        track = landmark_store.open_landmarks(path)
+        timestamps, landmarks, detected = track.timestamps, np.asarray(track.landmarks), track.detected
+    else:
+        timestamps, landmarks, detected = extract_landmarks(path, _detector(), progress=progress)
+
+    segments = []
+    rows = grade_landmarks(poses, timestamps, landmarks, detected, segments)
+    result = {
+        "frames": len(timestamps),
+        "detected": int(np.count_nonzero(detected)),
+        "holds": [
+            {"pose": pose_name, "t": t, "score": score, "components": components, "event": event}
+            for pose_name, score, t, components, event in rows
+        ],
+        "poses": [],
+    }
+    for pose_name, first, end in segments:
+        result["poses"].append(_pose_summary(pose_name, timestamps[first:end],
+                                             landmarks[first:end], detected[first:end]))
+    return result
+
+
+def _pose_summary(pose_name, timestamps, landmarks, detected):
+    pose = POSES.get(pose_name)
+    if pose is not None:
+        accuracy, rule_scores = pose.evaluate(landmarks)
+    else:
+        # A reference-index pose: similarity only, no rules to give feedback on
+        accuracy, _ = POSE_BATCH_FUNCTIONS[pose_name](landmarks)
+    accuracy = np.where(detected, accuracy, 0.0)
+
+    timeline = []
+    if len(timestamps):
+        grid = np.arange(timestamps[0], timestamps[-1] + 1e-9, TIMELINE_STEP)
+        index = np.minimum(np.searchsorted(timestamps, grid), len(timestamps) - 1)
+        timeline = [[float(timestamps[i]), float(accuracy[i])] for i in index]
+
+    feedback = []
+    if pose is not None and detected.any():
+        # Rules that fail on average over the frames spent on this pose
+        feedback = pose.feedback(rule_scores[detected].mean(axis=0))
+    return {
+        "pose": pose_name,
+        "start": float(timestamps[0]) if len(timestamps) else None,
+        "end": float(timestamps[-1]) if len(timestamps) else None,
+        "timeline": timeline,
+        "feedback": feedback,
+    }
+
+
+# -------------------------
+# Service
+# -------------------------
+class Job:
+    __slots__ = ("id", "path", "poses", "status", "progress", "result", "error",
+                 "submitted", "finished", "owns_file")
+
+    def __init__(self, job_id, path, poses, owns_file=False):
+        self.id = job_id
+        self.path = path
+        self.poses = poses
+        self.status = "queued"
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self.submitted = time.time()
+        self.finished = None
+        self.owns_file = owns_file  # uploaded to a temporary file
+
+    def to_dict(self):
+        out = {"id": self.id, "status": self.status, "progress": self.progress,
+               "submitted": self.submitted, "finished": self.finished}
+        if self.result is not None:
+            out["result"] = self.result
+        if self.error is not None:
+            out["error"] = self.error
+        return out
+
+
+class HttpError(Exception):
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class GradingService:
+    """
+    Bounded job queue in front of a process pool. One dispatcher task per
+    worker pulls jobs, so at most `workers` jobs run and at most
+    `queue_size` wait. A worker that dies (crash, out of memory) breaks the
+    pool; it is replaced, and the jobs that were running in it are run once
+    more, each in a process of its own, so only the job that crashes fails.
+    """
+
+    def __init__(self, workers=None, queue_size=32, upload_dir=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self._own_upload_dir = upload_dir is None
+        self.upload_dir = upload_dir or tempfile.mkdtemp(prefix="yoga_uploads_")
+        self.jobs = {}
+        self._finished = collections.deque()
+        self._ids = itertools.count(1)
+        self._running = 0
+        self._queue = None
+        self._pool = None
+        self._progress_queue = None
+        self._tasks = []
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        self._progress_queue = multiprocessing.get_context("spawn").Queue()
+        self._pool = self._new_pool()
+        self._queue = asyncio.Queue(self.queue_size)
+        self._tasks = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+        threading.Thread(target=self._drain_progress, args=(loop,), daemon=True).start()
+
+    def _new_pool(self, workers=None):
+        return ProcessPoolExecutor(workers or self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_worker, initargs=(self._progress_queue,))
+
+    def _replace_pool(self, broken):
+        # Several jobs can see the same pool break; only the first replaces it
+        if broken is self._pool:
+            self._pool = self._new_pool()
+            broken.shutdown(wait=False, cancel_futures=True)
+
+    async def _grade(self, job):
+        loop = asyncio.get_running_loop()
+        pool = self._pool
+        try:
+            return await loop.run_in_executor(pool, grade_job, job.id, job.path, job.poses)
+        except BrokenProcessPool:
+            self._replace_pool(pool)
+        # Every job in a broken pool fails, not only the one whose worker died:
+        # run it again alone, where it can only break its own process
+        job.progress = 0.0
+        pool = self._new_pool(1)
+        try:
+            return await loop.run_in_executor(pool, grade_job, job.id, job.path, job.poses)
+        finally:
+            pool.shutdown(wait=False)
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._progress_queue.put(None)
+        if self._own_upload_dir:
+            shutil.rmtree(self.upload_dir, ignore_errors=True)
+
+    def _drain_progress(self, loop):
+        # Progress messages from worker processes, applied on the event loop
+        while True:
+            try:
+                item = self._progress_queue.get()
+            except (EOFError, OSError):
+                return
+            if item is None:
+                return
+            loop.call_soon_threadsafe(self._set_progress, *item)
+
+    def _set_progress(self, job_id, fraction):
+        job = self.jobs.get(job_id)
+        if job and job.status == "running":
+            job.progress = fraction
+
+    def submit(self, path, poses, owns_file=False):
+        unknown = [p for p in poses if p not in POSE_BATCH_FUNCTIONS]
+        if not poses or unknown:
+            raise HttpError(400, f"unknown poses: {unknown}" if unknown else "no poses given")
+        if not os.path.isfile(path):
+            raise HttpError(400, f"no such file: {path}")
+        job = Job(str(next(self._ids)), path, poses, owns_file)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise HttpError(503, "grading queue is full", {"Retry-After": "1"})
+        self.jobs[job.id] = job
+        return job
+
+    async def _dispatch(self):
+        while True:
+            job = await self._queue.get()
+            job.status = "running"
+            self._running += 1
+            try:
+                job.result = await self._grade(job)
+                job.status = "done"
+                job.progress = 1.0
+            except Exception as e:
+                job.status = "failed"
+                job.error = f"{type(e).__name__}: {e}"
+            finally:
+                self._running -= 1
+                job.finished = time.time()
+                if job.owns_file:
+                    os.remove(job.path)
+                self._retire(job)
+
+    def _retire(self, job):
+        self._finished.append(job.id)
+        while len(self._finished) > MAX_FINISHED_JOBS:
+            self.jobs.pop(self._finished.popleft(), None)
+
+    def health(self):
+        return {"queued": self._queue.qsize(), "running": self._running,
+                "workers": self.workers, "queue_size": self.queue_size}
+
+    # -------------------------
+    # HTTP
+    # -------------------------
+    async def handle(self, reader, writer):
+        try:
+            status, body, headers = 200, None, {}
+            try:
+                body = await self._route(reader)
+                if isinstance(body, Job):
+                    status, body = 202, body.to_dict()
+            except HttpError as e:
+                status, body, headers = e.status, {"error": str(e)}, e.headers
+            except (ValueError, KeyError) as e:
+                status, body = 400, {"error": str(e)}
+            payload = json.dumps(body).encode()
+            head = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+                    "Content-Type: application/json",
+                    f"Content-Length: {len(payload)}",
+                    "Connection: close"]
+            head += [f"{k}: {v}" for k, v in headers.items()]
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + payload)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, reader):
+        method, target, _ = (await reader.readline()).decode("latin-1").split(" ", 2)
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        url = urlsplit(target)
+        length = int(headers.get("content-length", 0))
+        if length > MAX_UPLOAD_BYTES:
+            raise HttpError(413, "upload too large")
+
+        if method == "GET" and url.path == "/health":
+            return self.health()
+        if method == "GET" and url.path.startswith("/jobs/"):
+            job = self.jobs.get(url.path[len("/jobs/"):])
+            if job is None:
+                raise HttpError(404, "no such job")
+            return job.to_dict()
+        if method == "POST" and url.path == "/jobs":
+            if headers.get("content-type", "").startswith("application/json"):
+                request = json.loads(await reader.readexactly(length))
+                return self.submit(request["path"], request["poses"])
+            query = parse_qs(url.query)
+            poses = [p for value in query.get("poses", []) for p in value.split(",") if p]
+            if self._queue.full():
+                raise HttpError(503, "grading queue is full", {"Retry-After": "1"})
+            path = await self._save_upload(reader, length, query.get("name", ["upload.mp4"])[0])
+            try:
+                return self.submit(path, poses, owns_file=True)
+            except HttpError:
+                os.remove(path)
+                raise
+        raise HttpError(404, "not found")
+
+    async def _save_upload(self, reader, length, name):
+        ext = os.path.splitext(name)[1] or ".mp4"
+        fd, path = tempfile.mkstemp(suffix=ext, dir=self.upload_dir)
+        with os.fdopen(fd, "wb") as f:
+            remaining = length
+            while remaining:
+                chunk = await reader.readexactly(min(CHUNK, remaining))
+                f.write(chunk)
+                remaining -= len(chunk)
+        return path
+
+
+_REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+            413: "Payload Too Large", 503: "Service Unavailable"}
+
+
+async def serve(host="127.0.0.1", port=8765, workers=None, queue_size=32):
+    service = GradingService(workers, queue_size)
+    await service.start()
+    server = await asyncio.start_server(service.handle, host, port)
+    print(f"Grading service on http://{host}:{port} with {service.workers} workers, queue {queue_size}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grade uploaded videos over local HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None, help="grading processes (default: CPU count)")
+    parser.add_argument("--queue", type=int, default=32, help="jobs that may wait before uploads are refused")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.queue))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
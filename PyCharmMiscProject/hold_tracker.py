@@ -0,0 +1,165 @@
+# hold_tracker.py
+"""
+Hold tracking: whether the student is holding the pose, for how long and how well.
+
+HoldTracker is the hold state machine shared by live sessions
+(run_pose_session, and so soak.py's simulated ones) and offline grading
+(offline_session.grade_landmarks). It is fed one score per frame, timed by
+its clock or an explicit `now` (wall-clock time live, media timestamps
+offline, a simulated clock in simulations), and returns the events that
+frame caused. Logging, statistics and moving on to the next pose are up to
+the caller.
+
+A hold starts once the score has stayed at or above enter_score for
+enter_grace seconds. It breaks once the score has stayed below exit_score
+for exit_grace seconds; scores in such a dip are summarized but not
+logged. Keeping exit_score below enter_score stops a score
+that hovers around the target from starting and breaking holds frame
+after frame. A hold that lasts hold_time is done, and no new hold starts
+until reset().
+
+While a hold runs, its scores are summarized as they arrive: count, mean,
+variance, min and time at or above enter_score. Memory stays constant
+however long the hold lasts, and an update costs a few float operations.
+
+This module does not import cv2 or NumPy, so command-line tools can use
+its constants cheaply.
+"""
+import math
+import time
+
+HOLD_TIME = 10.0      # seconds to hold after reaching TARGET_SCORE
+TARGET_SCORE = 90.0   # % to start a hold
+EXIT_SCORE = 80.0     # % below which a hold starts to break
+ENTER_GRACE = 0.0     # seconds at TARGET_SCORE before the hold starts
+EXIT_GRACE = 1.0      # seconds below EXIT_SCORE before the hold breaks
+LOG_INTERVAL = 0.5    # seconds between logged scores during a hold
+
+# Events returned by HoldTracker.update(), in the order they happened
+START = "start"  # a hold started
+LOG = "log"      # this score is due to be logged (never while below exit_score)
+BREAK = "break"  # the hold broke before hold_time
+DONE = "done"    # the pose was held for hold_time
+
+NO_EVENTS = ()
+_START = (START, LOG)
+_LOG = (LOG,)
+_BREAK = (BREAK,)
+_DONE = (DONE,)
+_LOG_DONE = (LOG, DONE)
+
+
+class HoldTracker:
+    """
+    Hold state and running score summary for one pose.
+    update(score, now=None) -> tuple of events.
+    """
+
+    __slots__ = ("hold_time", "enter_score", "exit_score", "enter_grace", "exit_grace", "log_interval",
+                 "clock", "hold_start", "completed", "count", "mean", "min", "time_above",
+                 "_m2", "_since", "_last_log", "_last_time", "_last_score")
+
+    def __init__(self, hold_time=HOLD_TIME, enter_score=TARGET_SCORE, exit_score=EXIT_SCORE,
+                 enter_grace=ENTER_GRACE, exit_grace=EXIT_GRACE, log_interval=LOG_INTERVAL, clock=time.time):
+        self.hold_time = hold_time
+        self.enter_score = enter_score
+        self.exit_score = min(exit_score, enter_score)
+        self.enter_grace = enter_grace
+        self.exit_grace = exit_grace
+        self.log_interval = log_interval
+        self.clock = clock
+        self.reset()
+
+    def reset(self):
+        """
+        Wait for a new hold, as for a new pose.
+        """
+        self.hold_start = None
+        self.completed = False
+        self._since = None  # when the score crossed the threshold being waited on
+        self._clear()
+
+    def _clear(self):
+        self.count = 0
+        self.mean = 0.0
+        self.min = math.inf
+        self.time_above = 0.0
+        self._m2 = 0.0
+        self._last_log = self._last_time = self._last_score = None
+
+    @property
+    def active(self):
+        return self.hold_start is not None
+
+    @property
+    def variance(self):
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def elapsed(self, now=None):
+        if not self.active:
+            return 0.0
+        return (self.clock() if now is None else now) - self.hold_start
+
+    def summary(self):
+        """
+        The current (or last) hold's scores.
+        """
+        return {"count": self.count, "mean": self.mean, "std": self.std,
+                "min": self.min if self.count else 0.0, "time_above": self.time_above}
+
+    def update(self, score, now=None):
+        if now is None:
+            now = self.clock()
+        if self.completed:
+            return NO_EVENTS
+
+        if self.hold_start is None:
+            if score < self.enter_score:
+                self._since = None
+                return NO_EVENTS
+            if self._since is None:
+                self._since = now
+            if now - self._since < self.enter_grace:
+                return NO_EVENTS
+            self._clear()
+            self.hold_start = self._last_log = now
+            self._since = None
+            self._add(score, now)
+            return _START
+
+        self._add(score, now)
+        if score < self.exit_score:
+            if self._since is None:
+                self._since = now
+            if now - self._since >= self.exit_grace:
+                self.hold_start = self._since = None
+                return _BREAK
+            return NO_EVENTS  # a dip is not logged as part of the hold
+        else:
+            self._since = None
+            if now - self.hold_start >= self.hold_time:
+                self.hold_start = None
+                self.completed = True
+                return _LOG_DONE if now - self._last_log >= self.log_interval else _DONE
+
+        if now - self._last_log >= self.log_interval:
+            self._last_log = now
+            return _LOG
+        return NO_EVENTS
+
+    def _add(self, score, now):
+        # Welford's running mean and variance
+        self.count += 1
+        delta = score - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (score - self.mean)
+        if score < self.min:
+            self.min = score
+        if self._last_time is not None and self._last_score >= self.enter_score:
+            self.time_above += now - self._last_time
+        self._last_time = now
+        self._last_score = score
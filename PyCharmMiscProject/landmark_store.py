@@ -0,0 +1,192 @@
+# landmark_store.py
+"""
+Compact binary recording of per-frame pose landmarks.
+
+File layout (little endian):
+    32-byte header: magic b"YSLM", version, landmark count, field count,
+                    reserved, base_time (epoch seconds, float64), padding
+    N fixed-size records: t (float64, seconds since base_time),
+                          landmarks (33 x {x, y, z, visibility} float32)
+
+Frames without a detection are stored as NaN landmarks. The frame count is
+derived from the file size, so a recording cut short by a crash still
+replays up to its last complete frame. MediaPipe landmarks are float32, so
+storing them as float32 is lossless and replayed scores match live ones.
+"""
+import os
+import struct
+from collections import namedtuple
+from types import SimpleNamespace
+
+import numpy as np
+
+MAGIC = b"YSLM"
+VERSION = 1
+NUM_LANDMARKS = 33
+NUM_FIELDS = 4  # x, y, z, visibility
+EXTENSION = ".lmk"
+
+HEADER = struct.Struct("<4sHHHHd12x")
+RECORD_DTYPE = np.dtype([
+    ("t", "<f8"),
+    ("landmarks", "<f4", (NUM_LANDMARKS, NUM_FIELDS)),
+])
+
+LandmarkTrack = namedtuple("LandmarkTrack", ["base_time", "timestamps", "landmarks", "detected"])
+
+
+class Landmark:
+    """
+    Minimal stand-in for a MediaPipe NormalizedLandmark, for landmarks that
+    did not come out of MediaPipe (replayed, synthetic or extrapolated).
+    """
+    __slots__ = ("x", "y", "z", "visibility")
+
+    def __init__(self, x, y, z=0.0, visibility=1.0):
+        self.x, self.y, self.z, self.visibility = x, y, z, visibility
+
+
+def fill_landmarks(values, lm):
+    """
+    Write a MediaPipe landmark list, a (33, k) array or None (all NaN) into
+    a preallocated (33, 4) array.
+    """
+    if lm is None:
+        values[:] = np.nan
+    elif isinstance(lm, np.ndarray):
+        values[:] = np.nan
+        values[:, :lm.shape[-1]] = lm[:, :values.shape[-1]]
+    else:
+        values[:] = [(p.x, p.y, p.z, p.visibility) for p in lm]
+
+
+def landmark_array(lm):
+    """
+    (33, 4) float32 array from a MediaPipe landmark list, for the wrappers
+    that extrapolate or remap landmarks. The live loop does not convert (see
+    detected_landmarks): the per-frame scorers read the list faster than
+    the copy costs (frame_objects / frame_array in benchmark.py).
+    """
+    return np.array([(p.x, p.y, p.z, p.visibility) for p in lm], dtype=np.float32)
+
+
+class ArrayResult:
+    """
+    Detector result carrying just a (33, 4) landmark array, or None, for
+    wrappers that produce landmarks without running MediaPipe (extrapolated,
+    cropped, simulated). The MediaPipe-shaped pose_landmarks is only built
+    if something reads it; result_landmarks() and detected_landmarks() never do.
+    """
+    __slots__ = ("landmark_array",)
+
+    def __init__(self, values):
+        self.landmark_array = values
+
+    @property
+    def pose_landmarks(self):
+        if self.landmark_array is None:
+            return None
+        return SimpleNamespace(landmark=landmarks_from_array(self.landmark_array))
+
+
+def result_landmarks(result):
+    """
+    Landmarks of a detector result as a (33, 4) float32 array, or None when
+    nothing was detected. Results that already carry an array (see
+    ArrayResult) are not converted again.
+    """
+    values = getattr(result, "landmark_array", None)
+    if values is not None:
+        return values
+    if not result.pose_landmarks:
+        return None
+    return landmark_array(result.pose_landmarks.landmark)
+
+
+def detected_landmarks(result):
+    """
+    Landmarks of a detector result as the per-frame scorers take them,
+    without copying: the array of results that carry one (see ArrayResult),
+    otherwise MediaPipe's landmark list as is. None when nothing was detected.
+    """
+    values = getattr(result, "landmark_array", None)
+    if values is not None:
+        return values
+    if not result.pose_landmarks:
+        return None
+    return result.pose_landmarks.landmark
+
+
+def landmarks_from_array(values):
+    """
+    Landmark list from a (33, 2..4) array, usable wherever a MediaPipe list is.
+    """
+    return [Landmark(*map(float, p)) for p in values]
+
+
+# -------------------------
+# Recording
+# -------------------------
+class LandmarkRecorder:
+    """
+    Appends one record per frame. write() accepts a MediaPipe landmark list,
+    a (33, 3|4) array, or None for a frame without a detection.
+    """
+
+    def __init__(self, path, base_time=0.0):
+        self.path = path
+        self.frames = 0
+        self._record = np.zeros(1, dtype=RECORD_DTYPE)
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, NUM_LANDMARKS, NUM_FIELDS, 0, base_time))
+
+    def write(self, t, lm):
+        self._record["t"] = t
+        fill_landmarks(self._record["landmarks"][0], lm)
+        self._file.write(self._record.tobytes())
+        self.frames += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# -------------------------
+# Replay
+# -------------------------
+def open_landmarks(path):
+    """
+    Memory-map a recording. Returns a LandmarkTrack whose landmarks are a
+    read-only (N, 33, 4) float32 view; nothing is copied until it is used.
+    """
+    with open(path, "rb") as f:
+        magic, version, n_landmarks, n_fields, _, base_time = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} landmark recording")
+    if (n_landmarks, n_fields) != (NUM_LANDMARKS, NUM_FIELDS):
+        raise ValueError(f"{path} has unsupported landmark layout {n_landmarks}x{n_fields}")
+
+    n = (os.path.getsize(path) - HEADER.size) // RECORD_DTYPE.itemsize
+    if n == 0:
+        records = np.zeros(0, dtype=RECORD_DTYPE)
+    else:
+        records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER.size, shape=(n,))
+
+    landmarks = records["landmarks"]
+    return LandmarkTrack(base_time, records["t"], landmarks, ~np.isnan(landmarks[:, 0, 0]))
+
+
+def replay_landmarks(path):
+    """
+    Frame source over a recording: yields (t, landmarks) with landmarks a
+    (33, 4) array, or None where nothing was detected. The pose.py scorers
+    accept these arrays directly.
+    """
+    track = open_landmarks(path)
+    for t, lm, found in zip(track.timestamps, track.landmarks, track.detected):
+        yield float(t), (lm if found else None)
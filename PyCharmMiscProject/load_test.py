@@ -0,0 +1,95 @@
+# load_test.py
+"""
+Load test for grading_service.py using local files.
+
+Submits `--jobs` jobs for the given file with `--concurrency` clients, each
+polling its job until it finishes, and reports jobs/sec and end-to-end
+latency percentiles. Jobs refused with 503 are retried after Retry-After.
+
+    python grading_service.py --workers 4 &
+    python load_test.py student.mp4 --poses TREE WARRIOR2 --jobs 40 --concurrency 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import numpy as np
+
+
+async def request(host, port, method, path, body=None):
+    reader, writer = await asyncio.open_connection(host, port)
+    payload = json.dumps(body).encode() if body is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode() + payload
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    return status, json.loads(body)
+
+
+async def run_job(host, port, path, poses, poll_interval, stats):
+    start = time.perf_counter()
+    while True:
+        status, job = await request(host, port, "POST", "/jobs", {"path": path, "poses": poses})
+        if status != 503:
+            break
+        stats["rejected"] += 1
+        await asyncio.sleep(1.0)
+    if status != 202:
+        raise RuntimeError(f"submit failed ({status}): {job}")
+    while job["status"] in ("queued", "running"):
+        await asyncio.sleep(poll_interval)
+        _, job = await request(host, port, "GET", f"/jobs/{job['id']}")
+    stats[job["status"]] += 1
+    return time.perf_counter() - start
+
+
+async def load_test(host, port, path, poses, jobs, concurrency, poll_interval=0.1):
+    stats = {"done": 0, "failed": 0, "rejected": 0}
+    latencies = []
+    remaining = iter(range(jobs))
+
+    async def client():
+        for _ in remaining:
+            latencies.append(await run_job(host, port, path, poses, poll_interval, stats))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    p50, p90, p99 = np.percentile(latencies, (50, 90, 99)) if latencies else (0.0, 0.0, 0.0)
+    return dict(stats, jobs=jobs, seconds=elapsed, jobs_per_sec=jobs / elapsed,
+                latency_p50_s=float(p50), latency_p90_s=float(p90), latency_p99_s=float(p99),
+                latency_max_s=max(latencies, default=0.0))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the local grading service.")
+    parser.add_argument("path", help="local video or .lmk file to grade")
+    parser.add_argument("--poses", nargs="+", required=True)
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--out", help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(load_test(args.host, args.port, os.path.abspath(args.path), args.poses,
+                                    args.jobs, args.concurrency))
+    print(f"{results['done']} done, {results['failed']} failed, {results['rejected']} refused "
+          f"in {results['seconds']:.1f}s: {results['jobs_per_sec']:.2f} jobs/s")
+    print(f"latency p50 {results['latency_p50_s']:.2f}s  p90 {results['latency_p90_s']:.2f}s  "
+          f"p99 {results['latency_p99_s']:.2f}s  max {results['latency_max_s']:.2f}s")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
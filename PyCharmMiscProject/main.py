@@ -1,9 +1,14 @@
 # main.py
+# The vision stack (cv2, mediapipe, numpy via Pose_session) is imported after
+# the home page has drawn; see startup_timing.py for the startup report.
+import startup_timing
+import logging
+import sys
 import tkinter as tk
 from tkinter import ttk
 import threading
 from Lessons import LESSONS
-from Pose_session import run_pose_session
+from session_resources import SessionResources
 
 REMINDERS = [
     "You are doing great!",
@@ -13,6 +18,8 @@ REMINDERS = [
 ]
 
 font1 = "Lora"
+TARGET_FPS = 30  # inference quality is lowered on slow machines to hold this
+GOVERNOR_COMPLEXITIES = (0, 2)  # loaded once at startup for the governor's other levels
 
 
 # -------------------------
@@ -51,11 +58,12 @@ class MessageRotator:
 # LESSON PAGE
 # -------------------------
 class LessonPage(ttk.Frame):
-    def __init__(self, parent, lesson, home_callback, get_mode, reminders=None):
+    def __init__(self, parent, lesson, home_callback, get_mode, reminders=None, resources=None):
         super().__init__(parent, padding=12, style="Lesson.TFrame")
         self.lesson = lesson
         self.home_callback = home_callback
         self.get_mode = get_mode
+        self.resources = resources
 
         self.grid(row=0, column=0, sticky="nsew")
         self.grid_columnconfigure(0, weight=1)
@@ -74,37 +82,37 @@ class LessonPage(ttk.Frame):
         self.messages_lbl.grid(row=2, column=0, pady=(0, 10))
 
         self.rotator = MessageRotator(self.messages_lbl, reminders or [])
+        self.grid_rowconfigure(3, weight=1)
+        self.view = None  # session video, created with the first session
 
     def on_show(self):
         self.rotator.start()
-        threading.Thread(target=self._run_session, daemon=True).start()
-
-    def _run_session(self):
-        try:
-            run_pose_session(self.lesson["poses"], mode=self.get_mode())
-
-            # --- Show "Lesson Complete!" overlay for 2 seconds ---
-            import numpy as np
-            import cv2
-
-            display = np.full((480, 640, 3), (211, 177, 211), dtype=np.uint8)  # pink background
-            cv2.putText(
-                display,
-                "Lesson Complete!",
-                (50, 240),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                2,
-                (0, 0, 0),
-                4,
-                cv2.LINE_AA
-            )
-            cv2.imshow("Yoga Sense", display)
-            cv2.waitKey(2000)  # display for 2 seconds
-            cv2.destroyAllWindows()
-
-        finally:
-            # Always return to home page after finishing lesson
+        if self.view is None:
+            # Usually already imported in the background by YogaApp
+            from session_view import SessionView
+            self.view = SessionView(self, font=(font1, 40, "bold"), background="#e4b1d3")
+            self.view.grid(row=3, column=0, sticky="nsew")
+        self.view.run(self._run_session, self._session_done)
+
+    def stop_session(self):
+        """
+        Stop the running session, if any; returns whether one was running.
+        """
+        return self.view is not None and self.view.stop()
+
+    def _run_session(self, view):
+        # Worker thread; frames are painted by the view on the Tk thread
+        from Pose_session import run_pose_session
+
+        run_pose_session(self.lesson["poses"], mode=self.get_mode(), pipelined=True,
+                         target_fps=TARGET_FPS, resources=self.resources, present=view)
+
+    def _session_done(self, completed):
+        if not completed:
             self.home_callback()
+            return
+        # --- Show "Lesson Complete!" for 2 seconds, then return home ---
+        self.view.show_message("Lesson Complete!", 2000, self.home_callback)
 
 
 # -------------------------
@@ -154,13 +162,18 @@ class HomePage(ttk.Frame):
 # MAIN APP
 # -------------------------
 class YogaApp(tk.Tk):
-    def __init__(self):
+    def __init__(self, startup_report=False):
         super().__init__()
         self.title("Yoga Sense")
         self.attributes("-fullscreen", True)
-        self.bind("<Escape>", lambda e: self.destroy())
+        self.bind("<Escape>", self._on_escape)
         self.mode = "coach"
 
+        # Detector and camera load in the background once the home page is up
+        self.resources = SessionResources(spare_complexities=GOVERNOR_COMPLEXITIES)
+        self.startup_report = startup_report
+        self.vision_ready = threading.Event()
+
         self._setup_style()
 
         self.container = ttk.Frame(self)
@@ -173,11 +186,45 @@ class YogaApp(tk.Tk):
 
         # Lesson pages
         self.lesson_pages = [
-            LessonPage(self.container, l, self.show_home, self.get_mode, REMINDERS)
+            LessonPage(self.container, l, self.show_home, self.get_mode, REMINDERS, self.resources)
             for l in LESSONS
         ]
 
         self.show_home()
+        startup_timing.mark("window built")
+        self.after(0, self._after_first_paint)
+
+    def _after_first_paint(self):
+        self.update_idletasks()
+        startup_timing.mark("first paint")
+        threading.Thread(target=self._load_vision, daemon=True).start()
+        if self.startup_report:
+            self.after(100, self._check_startup_done)
+
+    def _load_vision(self):
+        import Pose_session  # noqa: F401  cv2, mediapipe, numpy
+        startup_timing.mark("vision imported")
+        self.resources.start()
+        self.resources.wait()
+        startup_timing.mark("detector ready")
+        self.vision_ready.set()
+
+    def _check_startup_done(self):
+        # Polled from the Tk thread: with --startup-report, exit once loaded
+        if self.vision_ready.is_set():
+            startup_timing.write_report()
+            self.destroy()
+        else:
+            self.after(100, self._check_startup_done)
+
+    def _on_escape(self, event):
+        # Esc ends a running lesson first, the app when none is running
+        if not any(page.stop_session() for page in self.lesson_pages):
+            self.destroy()
+
+    def destroy(self):
+        self.resources.close()
+        super().destroy()
 
     def toggle_mode(self):
         self.mode = "video" if self.mode == "coach" else "coach"
@@ -204,4 +251,5 @@ class YogaApp(tk.Tk):
 
 
 if __name__ == "__main__":
-    YogaApp().mainloop()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    YogaApp(startup_report="--startup-report" in sys.argv).mainloop()
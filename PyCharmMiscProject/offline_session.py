@@ -0,0 +1,207 @@
+# offline_session.py
+"""
+Headless grading of recorded sessions.
+
+Runs the same scoring and hold state machine (hold_tracker.py) as
+run_pose_session, but on media timestamps instead of wall-clock time and
+without any window, so a recording is graded as fast as the CPU allows.
+
+    python offline_session.py student.mp4 --poses TREE WARRIOR2 MOUNTAIN
+    python offline_session.py uploads/ --poses MOUNTAIN TREE --out graded/ --workers 4
+
+Landmark recordings (.lmk, see landmark_store.py) are graded straight from
+the stored landmarks without running MediaPipe; --record saves one next to
+each graded video so later regrades can skip inference.
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+import landmark_store
+from hold_tracker import BREAK, DONE, LOG, HoldTracker
+from Pose_session import POSE_BATCH_FUNCTIONS
+from score_logger import SINKS, open_sink
+from session_resources import create_pose_detector
+
+VIDEO_EXTENSIONS = (".mov", ".mp4", ".avi", ".mkv", ".webm", ".m4v")
+PROGRESS_FRAMES = 30
+
+
+# -------------------------
+# Inference
+# -------------------------
+def extract_landmarks(video_path, pose_detector=None, recorder=None, progress=None, rotate=None):
+    """
+    Run MediaPipe over every frame of a video. Nothing else in this module
+    needs mediapipe, so .lmk recordings are graded without it installed.
+    Returns (timestamps (N,), landmarks (N, 33, 4), detected (N,) bool).
+    progress(fraction) is called every PROGRESS_FRAMES frames when given.
+    Frames are turned with cv2.rotate(frame, rotate) first when rotate is set.
+    """
+    own_detector = pose_detector is None
+    if own_detector:
+        pose_detector = create_pose_detector()  # imports mediapipe only now
+
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    total = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+    timestamps, landmarks, detected = [], [], []
+    empty = np.zeros((33, 4))
+
+    index = 0
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        t = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000
+        if t <= 0 and index > 0:
+            t = index / fps  # container without usable timestamps
+        index += 1
+        if progress and total > 0 and index % PROGRESS_FRAMES == 0:
+            progress(min(index / total, 1.0))
+
+        if rotate is not None:
+            frame = cv2.rotate(frame, rotate)
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        result = pose_detector.process(rgb)
+        lm = landmark_store.result_landmarks(result)
+        if recorder:
+            recorder.write(t, lm)
+        timestamps.append(t)
+        if lm is not None:
+            landmarks.append(lm)
+            detected.append(True)
+        else:
+            landmarks.append(empty)
+            detected.append(False)
+
+    cap.release()
+    if own_detector:
+        pose_detector.close()
+
+    return (
+        np.asarray(timestamps, dtype=np.float64),
+        np.asarray(landmarks, dtype=np.float64).reshape(-1, 33, 4),
+        np.asarray(detected, dtype=bool),
+    )
+
+
+# -------------------------
+# Grading
+# -------------------------
+def grade_landmarks(poses, timestamps, landmarks, detected, segments=None):
+    """
+    Run the hold state machine over a landmark track.
+    Every pose is batch-scored over the whole track up front, then the poses
+    are walked in order exactly like run_pose_session walks camera frames.
+    Returns the logged rows as (pose_name, score, media_time, components,
+    event), including the rows marking a hold that broke or was done.
+    If a list is passed as segments, (pose_name, first, end) frame ranges
+    of each pose are appended to it.
+    """
+    frame_scores = {}
+    for pose_name in set(poses):
+        accuracy, components = POSE_BATCH_FUNCTIONS[pose_name](landmarks)
+        frame_scores[pose_name] = (np.where(detected, accuracy, 0.0), components)
+
+    rows = []
+    i = 0
+    for pose_name in poses:
+        hold = HoldTracker()
+        accuracy, components = frame_scores[pose_name]
+        first = i
+        while i < len(timestamps):
+            now, score = float(timestamps[i]), float(accuracy[i])
+            events = hold.update(score, now)
+            if LOG in events:
+                scores = {k: float(v[i]) for k, v in components.items()} if detected[i] else {}
+                rows.append((pose_name, score, now, scores, ""))
+            for event in events:
+                if event in (BREAK, DONE):
+                    rows.append((pose_name, hold.mean, now, hold.summary(), event))
+            i += 1
+            if DONE in events:
+                break  # next pose
+        if segments is not None:
+            segments.append((pose_name, first, i))
+    return rows
+
+
+def grade_video(video_path, poses, out_dir=None, record=False, log_format="csv"):
+    """
+    Grade one recording and write its yoga_scores log; returns the log path.
+    Videos are timestamped from the file's modification time plus the media
+    offset, landmark recordings from the session start stored in the file.
+    """
+    stem, ext = os.path.splitext(os.path.basename(video_path))
+    dest = out_dir or os.path.dirname(video_path)
+
+    if ext.lower() == landmark_store.EXTENSION:
+        track = landmark_store.open_landmarks(video_path)
+        base_time = track.base_time
+        rows = grade_landmarks(poses, track.timestamps, track.landmarks, track.detected)
+    else:
+        base_time = os.path.getmtime(video_path)
+        recorder = None
+        if record:
+            recorder = landmark_store.LandmarkRecorder(
+                os.path.join(dest, stem + landmark_store.EXTENSION), base_time
+            )
+        try:
+            timestamps, landmarks, detected = extract_landmarks(video_path, recorder=recorder)
+        finally:
+            if recorder:
+                recorder.close()
+        rows = grade_landmarks(poses, timestamps, landmarks, detected)
+
+    sink = open_sink(log_format, os.path.join(dest, f"yoga_scores_{stem}"))
+    sink.write([(base_time + t, pose_name, score, scores, event) for pose_name, score, t, scores, event in rows])
+    sink.close()
+    return sink.path
+
+
+def find_videos(path):
+    if os.path.isfile(path):
+        return [path]
+    return sorted(
+        os.path.join(path, name)
+        for name in os.listdir(path)
+        if name.lower().endswith(VIDEO_EXTENSIONS + (landmark_store.EXTENSION,))
+    )
+
+
+def grade_path(path, poses, out_dir=None, workers=None, record=False, log_format="csv"):
+    """
+    Grade a video file or every video in a directory, one process per video.
+    """
+    videos = find_videos(path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    if len(videos) <= 1 or workers == 1:
+        return [grade_video(v, poses, out_dir, record, log_format) for v in videos]
+    n = len(videos)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(
+            grade_video, videos, [poses] * n, [out_dir] * n, [record] * n, [log_format] * n
+        ))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grade recorded yoga sessions without a camera or window.")
+    parser.add_argument("path", help="video or .lmk file, or a directory of them")
+    parser.add_argument("--poses", nargs="+", required=True, choices=sorted(POSE_BATCH_FUNCTIONS))
+    parser.add_argument("--out", help="directory for the score logs (default: next to each video)")
+    parser.add_argument("--workers", type=int, default=None, help="parallel videos (default: CPU count)")
+    parser.add_argument("--record", action="store_true", help="save extracted landmarks as .lmk files")
+    parser.add_argument("--log-format", default="csv", choices=sorted(SINKS))
+    args = parser.parse_args(argv)
+
+    for log_file in grade_path(args.path, args.poses, args.out, args.workers, args.record, args.log_format):
+        print(f"Scores saved to {log_file}")
+
+
+if __name__ == "__main__":
+    main()
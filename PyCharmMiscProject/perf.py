@@ -0,0 +1,169 @@
+# perf.py
+"""
+Per-stage frame timing with fixed memory.
+
+Each stage keeps the last `size` samples in a ring buffer, so percentiles
+reflect recent behaviour and memory does not grow over a long session.
+The frame loop calls start() once per frame and lap(stage) after each stage;
+worker threads that own a stage (see pipeline.py) report with add().
+"""
+import json
+import time
+
+import cv2
+import numpy as np
+
+STAGES = ("capture", "color", "inference", "scoring", "feedback", "overlay", "text", "display")
+
+
+def ema(current, sample, alpha=0.2):
+    """
+    Exponential moving average of a timing; the first sample (current None) starts it.
+    """
+    return sample if current is None else current + alpha * (sample - current)
+
+
+class RollingHistogram:
+    """
+    Last `size` samples plus running count / mean / max over the whole run.
+    """
+
+    def __init__(self, size=512):
+        self._samples = np.zeros(size)
+        self._next = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        self._samples[self._next] = value
+        self._next = (self._next + 1) % len(self._samples)
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def recent(self):
+        return self._samples[:min(self.count, len(self._samples))]
+
+    def percentiles(self, qs=(50, 95, 99)):
+        samples = self.recent()
+        if not len(samples):
+            return tuple(0.0 for _ in qs)
+        return tuple(float(v) for v in np.percentile(samples, qs))
+
+    def summary(self):
+        p50, p95, p99 = self.percentiles()
+        return {
+            "p50": p50,
+            "p95": p95,
+            "p99": p99,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "count": self.count,
+        }
+
+
+class PerfStats:
+    """
+    Millisecond timings per stage, total frame time, frame interval (for FPS)
+    and capture-to-display latency.
+    """
+
+    def __init__(self, size=512):
+        self.stages = {name: RollingHistogram(size) for name in STAGES}
+        self.frame = RollingHistogram(size)
+        self.interval = RollingHistogram(size)
+        self.latency = RollingHistogram(size)
+        self._frame_start = None
+        self._last = None
+        self._last_end = None
+        self._created = time.perf_counter()
+        self.first_frame_ms = None  # from creation to the end of the first frame
+
+    def start(self):
+        self._frame_start = self._last = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        self.stages[stage].add((now - self._last) * 1000)
+        self._last = now
+
+    def add(self, stage, ms):
+        self.stages[stage].add(ms)
+
+    def end_frame(self, capture_time=None):
+        """
+        Close the frame; capture_time (perf_counter) defaults to the frame start.
+        """
+        now = time.perf_counter()
+        self.frame.add((now - self._frame_start) * 1000)
+        self.latency.add((now - (capture_time or self._frame_start)) * 1000)
+        if self._last_end is not None:
+            self.interval.add((now - self._last_end) * 1000)
+        else:
+            self.first_frame_ms = (now - self._created) * 1000
+        self._last_end = now
+
+    @property
+    def fps(self):
+        samples = self.interval.recent()
+        return 1000 / samples.mean() if len(samples) else 0.0
+
+    def summary(self):
+        return {
+            "fps": self.fps,
+            "first_frame_ms": self.first_frame_ms,
+            "frame_ms": self.frame.summary(),
+            "latency_ms": self.latency.summary(),
+            "stages_ms": {name: hist.summary() for name, hist in self.stages.items() if hist.count},
+        }
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+
+# -------------------------
+# On-screen HUD
+# -------------------------
+class PerfHud:
+    """
+    Draws FPS, latency and the slowest stages in the bottom-left corner.
+    The text is rebuilt every `refresh` seconds, not every frame, so the
+    percentile computation stays off the per-frame path.
+    """
+
+    def __init__(self, perf, refresh=0.5):
+        self.perf = perf
+        self.refresh = refresh
+        self._lines = []
+        self._updated = 0.0
+
+    def _build_lines(self):
+        perf = self.perf
+        lat50, lat95, _ = perf.latency.percentiles()
+        lines = [f"{perf.fps:5.1f} FPS  latency p50 {lat50:.0f} / p95 {lat95:.0f} ms"]
+        stage_p95 = sorted(
+            ((hist.percentiles((50, 95)), name) for name, hist in perf.stages.items() if hist.count),
+            reverse=True,
+            key=lambda item: item[0][1]
+        )
+        for (p50, p95), name in stage_p95[:4]:
+            lines.append(f"{name:<10} p50 {p50:5.1f}  p95 {p95:5.1f} ms")
+        return lines
+
+    def draw(self, display):
+        now = time.monotonic()
+        if now - self._updated >= self.refresh:
+            self._lines = self._build_lines()
+            self._updated = now
+        h = display.shape[0]
+        for i, line in enumerate(reversed(self._lines)):
+            cv2.putText(display,
+                        line,
+                        (20, h - 20 - i * 28),
+                        cv2.FONT_HERSHEY_SIMPLEX,
+                        0.7,
+                        (255, 255, 0),
+                        2)
@@ -0,0 +1,163 @@
+# pipeline.py
+import collections
+import queue
+import threading
+import time
+
+import cv2
+
+from landmark_store import detected_landmarks
+from session_resources import reset_tracking
+
+
+# -------------------------
+# Bounded "latest frame" queue
+# -------------------------
+class LatestQueue:
+    """
+    Bounded queue that drops the oldest item when full, so a slow consumer
+    always gets the freshest frame instead of a growing backlog. on_drop is
+    called with every dropped item, e.g. to recycle its frame buffer.
+    """
+
+    def __init__(self, maxsize=1, on_drop=None):
+        self._items = collections.deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self.on_drop = on_drop
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+                old = self._items.popleft()
+                if self.on_drop and old is not None:
+                    self.on_drop(old)
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items, timeout):
+                raise queue.Empty
+            return self._items.popleft()
+
+
+# -------------------------
+# Capture -> inference pipeline
+# -------------------------
+class PosePipeline:
+    """
+    Runs camera capture and MediaPipe inference on their own threads.
+    The caller (render stage) pulls (capture_time, frame, landmarks) packets
+    with get() and reports them shown with mark_displayed(), which tracks the
+    capture-to-display latency. Stage timings for capture, color conversion
+    and inference go to `perf` (a perf.PerfStats) when given.
+    Camera frames are read into recycled buffers: the caller hands each frame
+    back with release() once it has been displayed.
+    """
+
+    def __init__(self, cap, pose_detector, queue_size=1, perf=None):
+        self.cap = cap
+        self.pose_detector = pose_detector
+        self.perf = perf
+        self.frames = LatestQueue(queue_size, on_drop=lambda item: self.release(item[1]))
+        self.results = LatestQueue(queue_size, on_drop=lambda item: self.release(item[1]))
+        self.finished = False
+        self._free = queue.SimpleQueue()  # frame buffers ready for reuse
+        self._rgb = None  # inference thread's color conversion buffer
+
+        self.latency_ms = 0.0
+        self._latency_total = 0.0
+        self._displayed = 0
+
+        self._reset = threading.Event()
+        self._stop = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, daemon=True),
+            threading.Thread(target=self._inference_loop, daemon=True),
+        ]
+
+    def start(self):
+        for t in self._threads:
+            t.start()
+
+    def stop(self):
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout=2.0)
+
+    def get(self, timeout=0.1):
+        """
+        Next packet, or None once the camera stream has ended or the pipeline stopped.
+        """
+        while not self.finished and not self._stop.is_set():
+            try:
+                packet = self.results.get(timeout)
+            except queue.Empty:
+                continue
+            if packet is None:
+                self.finished = True
+            return packet
+        return None
+
+    def reset_tracking(self):
+        """
+        Reset the detector's tracking before the next inference. The
+        detector belongs to the inference thread, so the reset happens there.
+        """
+        self._reset.set()
+
+    def release(self, frame):
+        """
+        Return a frame buffer obtained from get() for reuse by the capture thread.
+        """
+        self._free.put(frame)
+
+    def mark_displayed(self, capture_time):
+        self.latency_ms = (time.perf_counter() - capture_time) * 1000
+        self._latency_total += self.latency_ms
+        self._displayed += 1
+
+    @property
+    def mean_latency_ms(self):
+        return self._latency_total / self._displayed if self._displayed else 0.0
+
+    def _capture_loop(self):
+        while not self._stop.is_set():
+            try:
+                buffer = self._free.get_nowait()
+            except queue.Empty:
+                buffer = None  # pool grows until enough frames are in flight
+            start = time.perf_counter()
+            ret, frame = self.cap.read(buffer)
+            if not ret:
+                self.frames.put(None)
+                return
+            captured = time.perf_counter()
+            if self.perf:
+                self.perf.add("capture", (captured - start) * 1000)
+            self.frames.put((captured, frame))
+
+    def _inference_loop(self):
+        while not self._stop.is_set():
+            try:
+                item = self.frames.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is None:
+                self.results.put(None)
+                return
+            capture_time, frame = item
+            if self._reset.is_set():
+                self._reset.clear()
+                reset_tracking(self.pose_detector)
+            start = time.perf_counter()
+            rgb = self._rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb)
+            converted = time.perf_counter()
+            result = self.pose_detector.process(rgb)
+            lm = detected_landmarks(result)
+            if self.perf:
+                self.perf.add("color", (converted - start) * 1000)
+                self.perf.add("inference", (time.perf_counter() - converted) * 1000)
+            self.results.put((capture_time, frame, lm))
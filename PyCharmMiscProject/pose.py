@@ -1,167 +1,501 @@
 # pose.py
 import math
 
+import numpy as np
+
 # ------------------------
 # Helpers
 # ------------------------
+# Every scorer has a batch form that works on a landmark array of shape
+# (..., 33, >=2) holding x, y (and optionally z, visibility) per landmark.
+# A single frame is too small for NumPy to pay off, so the per-frame
+# functions run the same rules in plain Python floats with the math module.
+# Both forms apply the same operations in the same order, so they differ
+# only where NumPy's vectorized arctan2/hypot round differently from libm's,
+# in the last bits of a double. A frame scores the same bits in a batch of
+# any size.
+# Poses themselves are data (POSE_SPECS at the bottom), compiled once into
+# evaluators by compile_pose.
+
+def landmarks_to_array(lm):
+    """
+    Convert a MediaPipe landmark list into a (33, 3) array of x, y, z.
+    Arrays (e.g. replayed recordings) are passed through unchanged.
+    """
+    if isinstance(lm, np.ndarray):
+        return lm
+    return np.array([(p.x, p.y, p.z) for p in lm], dtype=np.float64)
+
+
+def landmarks_xy(landmarks):
+    """
+    (..., 33, 2) float64 x, y of a landmark array, for the batch scorers.
+    float32 landmarks are widened once per batch, so batch math runs in
+    float64 like the per-frame path (frame_xy).
+    """
+    return np.asarray(landmarks)[..., :2].astype(np.float64, copy=False)
+
+
+def _safe_ratio(num, den):
+    # A zero denominator (collapsed torso / shoulders) scores as "infinitely off"
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(den == 0, np.inf, num / den)
+
+
+def frame_xy(lm):
+    """
+    (xs, ys) lists of Python floats from a MediaPipe landmark list or a
+    (33, >=2) array, for the per-frame scorers.
+    """
+    if isinstance(lm, np.ndarray):
+        return lm[:, 0].tolist(), lm[:, 1].tolist()
+    return [p.x for p in lm], [p.y for p in lm]
+
+
+def _angle(bax, bay, bcx, bcy):
+    # atan2(|cross|, dot) stays accurate for nearly straight joints, where acos does not
+    if (bax == 0 and bay == 0) or (bcx == 0 and bcy == 0):
+        return 180.0
+    return math.degrees(math.atan2(abs(bax * bcy - bay * bcx), bax * bcx + bay * bcy))
+
+
+def joint_angles_2d(a, b, c):
+    """
+    Vectorized joint angle at b in degrees, for point arrays of shape (..., 2)
+    """
+    ba = a - b
+    bc = c - b
+    cross = ba[..., 0] * bc[..., 1] - ba[..., 1] * bc[..., 0]
+    dot = ba[..., 0] * bc[..., 0] + ba[..., 1] * bc[..., 1]
+    angle = np.degrees(np.arctan2(np.abs(cross), dot))
+    degenerate = ((ba[..., 0] == 0) & (ba[..., 1] == 0)) | ((bc[..., 0] == 0) & (bc[..., 1] == 0))
+    return np.where(degenerate, 180.0, angle)
+
 
 def joint_angle_2d(a, b, c):
-    ba = (a.x - b.x, a.y - b.y)
-    bc = (c.x - b.x, c.y - b.y)
-    mag_ba = math.hypot(*ba)
-    mag_bc = math.hypot(*bc)
-    if mag_ba == 0 or mag_bc == 0:
-        return 180
-    cosang = max(-1, min(1, (ba[0]*bc[0] + ba[1]*bc[1]) / (mag_ba * mag_bc)))
-    return math.degrees(math.acos(cosang))
+    """
+    Joint angle at b in degrees, for three landmarks
+    """
+    return _angle(a.x - b.x, a.y - b.y, c.x - b.x, c.y - b.y)
 
 
 def score_angle(actual, target, tolerance):
-    return max(0, 1 - abs(actual - target) / tolerance)
+    return np.maximum(0, 1 - np.abs(actual - target) / tolerance)
+
+
+def torso_lengths(landmarks):
+    p = landmarks_xy(landmarks)
+    shoulder_mid = (p[..., 11, :] + p[..., 12, :]) / 2
+    hip_mid = (p[..., 23, :] + p[..., 24, :]) / 2
+    d = shoulder_mid - hip_mid
+    return np.hypot(d[..., 0], d[..., 1])
 
 
 def torso_length(lm):
-    ls, rs = lm[11], lm[12]
-    lh, rh = lm[23], lm[24]
-    shoulder_mid = ((ls.x + rs.x) / 2, (ls.y + rs.y) / 2)
-    hip_mid = ((lh.x + rh.x) / 2, (lh.y + rh.y) / 2)
-    return math.dist(shoulder_mid, hip_mid)
+    return float(torso_lengths(landmarks_to_array(lm)))
 
 
 # ------------------------
-# MOUNTAIN
+# Rule building blocks
 # ------------------------
+# Measures are hashable tuples, so identical measures used by several rules
+# are computed once per frame. Landmark arguments are MediaPipe indices.
 
-def mountain_pose_score(lm):
-    ls, rs = lm[11], lm[12]
-    lw, rw = lm[15], lm[16]
-    lh, lk, la = lm[23], lm[25], lm[27]
-    rh, rk, ra = lm[24], lm[26], lm[28]
-    le, re = lm[13], lm[14]
-
-    shoulder_width = abs(ls.x - rs.x)
-    wrist_width = abs(lw.x - rw.x)
-
-    # --- arm height ---
-    left_height = max(0, min(1, (ls.y - lw.y) / 0.25))
-    right_height = max(0, min(1, (rs.y - rw.y) / 0.25))
-
-    # --- arm straightness ---
-    left_straight = score_angle(joint_angle_2d(ls, le, lw), 180, 60)
-    right_straight = score_angle(joint_angle_2d(rs, re, rw), 180, 60)
-
-    # --- arm width (the new part) ---
-    # ideal: wrists slightly wider than shoulders
-    width_ratio = wrist_width / shoulder_width
-
-    # Ideal relaxed V is around 2 shoulder widths
-    ideal = 1.8
-    tolerance = 0.8  # how relaxed we are about it
-
-    width_score = max(
-        0,
-        1 - abs(width_ratio - ideal) / tolerance
-    )
-
-    scores = {
-        "left_arm": 0.7 * left_height + 0.3 * left_straight,
-        "right_arm": 0.7 * right_height + 0.3 * right_straight,
-        "arm_width": width_score,
-        "left_leg": score_angle(joint_angle_2d(lh, lk, la), 180, 35),
-        "right_leg": score_angle(joint_angle_2d(rh, rk, ra), 180, 35),
-    }
+def angle(a, b, c):
+    """Joint angle at b, degrees"""
+    return ("angle", a, b, c)
 
-    accuracy = sum(scores.values()) / len(scores) * 100
-    return accuracy, None, scores
 
+def rise(a, b):
+    """How far a is below b on screen (y grows downwards)"""
+    return ("rise", a, b)
+
+
+def gap_x(a, b):
+    return ("gap_x", a, b)
+
+
+def gap_y(a, b):
+    return ("gap_y", a, b)
+
+
+def mid_gap_y(pair_a, pair_b):
+    """Vertical gap between the midpoints of two landmark pairs"""
+    return ("mid_gap_y", pair_a, pair_b)
 
-# ------------------------
-# TREE
-# ------------------------
 
-def tree_pose_score(lm):
-    ls, rs = lm[11], lm[12]
-    lw, rw = lm[15], lm[16]
-    lh, lk, la = lm[23], lm[25], lm[27]
-    rh, rk, ra = lm[24], lm[26], lm[28]
+def distance(a, b):
+    return ("distance", a, b)
 
-    torso = torso_length(lm)
 
+def torso():
+    return ("torso",)
 
 
-    left_leg = joint_angle_2d(lh, lk, la)
-    right_leg = joint_angle_2d(rh, rk, ra)
-    standing_leg = left_leg if abs(left_leg - 180) < abs(right_leg - 180) else right_leg
-    standing_leg_score = score_angle(standing_leg, 180, 30)
+def ratio(num, den):
+    """num / den, infinite when den is zero"""
+    return ("ratio", num, den)
 
-    left_lift = abs(la.y - lk.y) / torso
-    right_lift = abs(ra.y - rk.y) / torso
-    lifted = min(left_lift, right_lift)
 
-    if lifted < 0.15:
-        lifted_score = 1.0
-    elif lifted > 0.35:
-        lifted_score = 0.0
-    else:
-        lifted_score = 1 - (lifted - 0.15) / 0.2
+def lower(m1, m2):
+    return ("lower", m1, m2)
 
-    wrist_dist = math.dist((lw.x, lw.y), (rw.x, rw.y)) / torso
-    hands_score = max(0, 1 - wrist_dist * 2)
 
-    avg_wrist_y = (lw.y + rw.y) / 2
-    avg_shoulder_y = (ls.y + rs.y) / 2
-    height_score = max(0, 1 - abs(avg_wrist_y - avg_shoulder_y) / 0.35)
+def nearest(m1, m2, value):
+    """Whichever of m1, m2 is closer to value (m2 on ties)"""
+    return ("nearest", m1, m2, value)
 
-    scores = {
-        "standing_leg": standing_leg_score,
-        "lifted_foot": lifted_score,
-        "hands": hands_score,
-        "hand_height": height_score
+
+def farthest(m1, m2, value):
+    """The one of m1, m2 not picked by nearest()"""
+    return ("farthest", m1, m2, value)
+
+
+def target(measure, value, tolerance):
+    """1 at value, falling linearly to 0 at value +/- tolerance"""
+    return ("target", measure, value, tolerance)
+
+
+def ramp(measure, zero, one):
+    """0 at `zero`, 1 at `one`, linear and clipped in between"""
+    return ("ramp", measure, zero, one)
+
+
+def rule(name, terms, feedback=None, highlight=(), weight=1.0):
+    """
+    One scored component. terms is a single target()/ramp() or a list of
+    (weight, target()/ramp()) pairs that are summed. feedback is the message
+    shown when the rule fails and highlight the landmarks circled for it.
+    """
+    if isinstance(terms, tuple):
+        terms = [(1.0, terms)]
+    return {
+        "name": name,
+        "terms": terms,
+        "feedback": feedback,
+        "highlight": tuple(highlight),
+        "weight": weight,
     }
 
-    accuracy = sum(scores.values()) / len(scores) * 100
-    return accuracy, None, scores
+
+_LANDMARK_MEASURES = {
+    "rise": lambda p, a, b: p[..., a, 1] - p[..., b, 1],
+    "gap_x": lambda p, a, b: np.abs(p[..., a, 0] - p[..., b, 0]),
+    "gap_y": lambda p, a, b: np.abs(p[..., a, 1] - p[..., b, 1]),
+    "mid_gap_y": lambda p, a, b: np.abs(
+        (p[..., a[0], 1] + p[..., a[1], 1]) / 2 - (p[..., b[0], 1] + p[..., b[1], 1]) / 2
+    ),
+    "distance": lambda p, a, b: np.hypot(p[..., a, 0] - p[..., b, 0], p[..., a, 1] - p[..., b, 1]),
+    "torso": lambda p: torso_lengths(p),
+}
+
+_DERIVED_MEASURES = {
+    "ratio": lambda v1, v2: _safe_ratio(v1, v2),
+    "lower": lambda v1, v2: np.minimum(v1, v2),
+    "nearest": lambda v1, v2, value: np.where(np.abs(v1 - value) < np.abs(v2 - value), v1, v2),
+    "farthest": lambda v1, v2, value: np.where(np.abs(v1 - value) < np.abs(v2 - value), v2, v1),
+}
+
+# The same measures on one frame: xs, ys lists of floats, v the values computed so far
+_SCALAR_MEASURES = {
+    "angle": lambda a, b, c: lambda xs, ys, v: _angle(xs[a] - xs[b], ys[a] - ys[b], xs[c] - xs[b], ys[c] - ys[b]),
+    "rise": lambda a, b: lambda xs, ys, v: ys[a] - ys[b],
+    "gap_x": lambda a, b: lambda xs, ys, v: abs(xs[a] - xs[b]),
+    "gap_y": lambda a, b: lambda xs, ys, v: abs(ys[a] - ys[b]),
+    "mid_gap_y": lambda a, b: lambda xs, ys, v: abs((ys[a[0]] + ys[a[1]]) / 2 - (ys[b[0]] + ys[b[1]]) / 2),
+    "distance": lambda a, b: lambda xs, ys, v: math.hypot(xs[a] - xs[b], ys[a] - ys[b]),
+    "torso": lambda: lambda xs, ys, v: math.hypot((xs[11] + xs[12]) / 2 - (xs[23] + xs[24]) / 2,
+                                                  (ys[11] + ys[12]) / 2 - (ys[23] + ys[24]) / 2),
+    "ratio": lambda i, j: lambda xs, ys, v: math.inf if v[j] == 0 else v[i] / v[j],
+    "lower": lambda i, j: lambda xs, ys, v: min(v[i], v[j]),
+    "nearest": lambda i, j, value: lambda xs, ys, v: v[i] if abs(v[i] - value) < abs(v[j] - value) else v[j],
+    "farthest": lambda i, j, value: lambda xs, ys, v: v[j] if abs(v[i] - value) < abs(v[j] - value) else v[i],
+}
 
 
 # ------------------------
-# WARRIOR II
+# Rule compiler
 # ------------------------
 
-def warrior2_pose_score(lm):
-    ls, rs = lm[11], lm[12]
-    le, re = lm[13], lm[14]
-    lw, rw = lm[15], lm[16]
-    lh, lk, la = lm[23], lm[25], lm[27]
-    rh, rk, ra = lm[24], lm[26], lm[28]
-
-    left_knee = joint_angle_2d(lh, lk, la)
-    right_knee = joint_angle_2d(rh, rk, ra)
-
-    if abs(left_knee - 95) < abs(right_knee - 95):
-        front_knee, back_knee = left_knee, right_knee
-    else:
-        front_knee, back_knee = right_knee, left_knee
-
-    front_score = score_angle(front_knee, 105, 90)
-    back_score = score_angle(back_knee, 180, 70)
-
-    left_arm = max(0, 1 - abs(ls.y - lw.y) / 0.3)
-    right_arm = max(0, 1 - abs(rs.y - rw.y) / 0.3)
-
-    def elbow_score(s, e, w):
-        angle = joint_angle_2d(s, e, w)
-        angle_part = max(0, min(1, (angle - 135) / 45))
-        height_part = max(0, 1 - abs(s.y - w.y) / 0.3)
-        return (angle_part + height_part) / 2
-
-    scores = {
-        "front_knee": front_score,
-        "back_knee": back_score,
-        "left_arm": left_arm,
-        "right_arm": right_arm,
-        "left_elbow": elbow_score(ls, le, lw),
-        "right_elbow": elbow_score(rs, re, rw)
-    }
+class CompiledPose:
+    """
+    Evaluator for one pose spec. All joint angles the rules need are computed
+    in one vectorized call from precomputed index arrays, every other measure
+    once, and target/ramp terms as two array expressions. evaluate_frame()
+    runs the same steps on one frame without NumPy.
+    """
+
+    def __init__(self, name, rules):
+        self.name = name
+        self.rule_names = [r["name"] for r in rules]
+        self.weights = np.array([r["weight"] for r in rules], dtype=np.float64)
+        self._weight_list = self.weights.tolist()
+        self._weight_sum = math.fsum(self._weight_list)
+        self.messages = [r["feedback"] for r in rules]
+        self.highlights = [r["highlight"] for r in rules]
+
+        # Measures in dependency order, each computed once
+        slots = {}
+
+        def visit(node):
+            if node not in slots:
+                if node[0] in _DERIVED_MEASURES:
+                    visit(node[1])
+                    visit(node[2])
+                slots[node] = len(slots)
+            return slots[node]
+
+        terms = [(i, w, shape, visit(shape[1])) for i, r in enumerate(rules) for w, shape in r["terms"]]
+        self._n_slots = len(slots)
+
+        angles = [(node, slot) for node, slot in slots.items() if node[0] == "angle"]
+        self._angle_a = np.array([node[1] for node, _ in angles], dtype=np.intp)
+        self._angle_b = np.array([node[2] for node, _ in angles], dtype=np.intp)
+        self._angle_c = np.array([node[3] for node, _ in angles], dtype=np.intp)
+        self._angle_slots = [slot for _, slot in angles]
+
+        self._steps = []
+        self._scalar_steps = []
+        for node, slot in slots.items():
+            kind = node[0]
+            if kind in _DERIVED_MEASURES:
+                children = (slots[node[1]], slots[node[2]])
+                self._steps.append((slot, _DERIVED_MEASURES[kind], children, node[3:]))
+                self._scalar_steps.append((slot, _SCALAR_MEASURES[kind](*children, *node[3:])))
+            else:
+                if kind != "angle":
+                    self._steps.append((slot, _LANDMARK_MEASURES[kind], None, node[1:]))
+                self._scalar_steps.append((slot, _SCALAR_MEASURES[kind](*node[1:])))
+
+        def term_table(kind):
+            chosen = [(col, t) for col, t in enumerate(terms) if t[2][0] == kind]
+            return (
+                [col for col, _ in chosen],
+                [t[3] for _, t in chosen],
+                np.array([t[2][2] for _, t in chosen], dtype=np.float64),
+                np.array([t[2][3] for _, t in chosen], dtype=np.float64),
+            )
+
+        self._targets = term_table("target")
+        self._ramps = term_table("ramp")
+
+        # Weighted terms are summed per rule in spec order, one column at a
+        # time rather than as a matrix product, so a frame scores the same
+        # bits whether it is evaluated alone or in a batch of any size
+        self._n_terms = len(terms)
+        self._term_sums = [(col, i, w) for col, (i, w, _, _) in enumerate(terms)]
+        self._scalar_rules = [[] for _ in rules]
+        for i, w, shape, slot in terms:
+            if shape[0] == "ramp":
+                self._scalar_rules[i].append((w, True, slot, shape[2], shape[3] - shape[2]))
+            else:
+                self._scalar_rules[i].append((w, False, slot, shape[2], shape[3]))
+
+        self._feedback_rules = np.array([i for i, m in enumerate(self.messages) if m], dtype=np.intp)
+
+    def evaluate(self, landmarks):
+        """
+        Returns (accuracy (...,), rule scores (..., n_rules)) for landmark
+        arrays of shape (..., 33, >=2).
+        """
+        p = landmarks_xy(landmarks)
+        values = [None] * self._n_slots
+
+        if self._angle_slots:
+            a = joint_angles_2d(p[..., self._angle_a, :], p[..., self._angle_b, :], p[..., self._angle_c, :])
+            for k, slot in enumerate(self._angle_slots):
+                values[slot] = a[..., k]
+
+        for slot, fn, children, args in self._steps:
+            if children is None:
+                values[slot] = fn(p, *args)
+            else:
+                values[slot] = fn(values[children[0]], values[children[1]], *args)
+
+        terms = np.empty(p.shape[:-2] + (self._n_terms,))
+        cols, measure_slots, value, tolerance = self._targets
+        if cols:
+            v = np.stack([values[s] for s in measure_slots], axis=-1)
+            terms[..., cols] = np.maximum(0, 1 - np.abs(v - value) / tolerance)
+        cols, measure_slots, zero, one = self._ramps
+        if cols:
+            v = np.stack([values[s] for s in measure_slots], axis=-1)
+            terms[..., cols] = np.clip((v - zero) / (one - zero), 0, 1)
+
+        scores = np.zeros(p.shape[:-2] + (len(self.rule_names),))
+        for col, i, w in self._term_sums:
+            scores[..., i] += w * terms[..., col]
+        accuracy = np.zeros(p.shape[:-2])
+        for i, w in enumerate(self._weight_list):
+            accuracy += scores[..., i] * w
+        return accuracy / self._weight_sum * 100, scores
+
+    def evaluate_frame(self, lm):
+        """
+        (accuracy, [rule scores]) of one frame (a MediaPipe landmark list or
+        a (33, >=2) array) as Python floats.
+        """
+        xs, ys = frame_xy(lm)
+        v = [None] * self._n_slots
+        for slot, fn in self._scalar_steps:
+            v[slot] = fn(xs, ys, v)
+        scores = []
+        for terms in self._scalar_rules:
+            total = 0.0
+            for w, is_ramp, slot, start, span in terms:
+                # ramp(zero, one): start=zero, span=one-zero; target: start=value, span=tolerance
+                if is_ramp:
+                    t = (v[slot] - start) / span
+                    t = 0.0 if t < 0 else 1.0 if t > 1 else t
+                else:
+                    t = 1 - abs(v[slot] - start) / span
+                    t = 0.0 if t < 0 else t
+                total += w * t
+            scores.append(total)
+        accuracy = 0.0
+        for score, w in zip(scores, self._weight_list):
+            accuracy += score * w
+        return accuracy / self._weight_sum * 100, scores
+
+    def score_batch(self, landmarks):
+        """
+        (accuracy, {rule name: scores}) over a landmark array
+        """
+        accuracy, scores = self.evaluate(landmarks)
+        return accuracy, {name: scores[..., i] for i, name in enumerate(self.rule_names)}
+
+    def score(self, lm):
+        """
+        Per-frame scorer: (accuracy, None, {rule name: score}) for one frame
+        """
+        accuracy, scores = self.evaluate_frame(lm)
+        return accuracy, None, dict(zip(self.rule_names, scores))
+
+    def feedback(self, scores, threshold=0.8):
+        """
+        Messages for the failing rules, given the (n_rules,) scores from evaluate()
+        """
+        failing = self._feedback_rules[scores[self._feedback_rules] < threshold]
+        return [self.messages[i] for i in failing]
+
+
+def compile_pose(name, rules):
+    return CompiledPose(name, rules)
+
+
+class CompiledPoseSet:
+    """
+    Evaluator for several poses at once. The rules of all poses are compiled
+    together, so a measure used by more than one pose (the knee and elbow
+    angles, torso length, ...) is computed once per frame, and the accuracy
+    of every pose is a weighted sum over its slice of the rule scores.
+    """
+
+    def __init__(self, specs):
+        self.names = list(specs)
+        self.poses = [compile_pose(name, specs[name]) for name in self.names]
+        self._all = CompiledPose("+".join(self.names), [r for name in self.names for r in specs[name]])
+
+        self._rules = []  # slice of the rule scores belonging to each pose
+        start = 0
+        for pose in self.poses:
+            end = start + len(pose.rule_names)
+            self._rules.append(slice(start, end))
+            start = end
+
+    def __len__(self):
+        return len(self.names)
+
+    def evaluate(self, landmarks):
+        """
+        Returns (accuracy (..., n_poses), rule scores (..., n_rules of all
+        poses)) for landmark arrays of shape (..., 33, >=2).
+        """
+        _, scores = self._all.evaluate(landmarks)
+        accuracy = np.empty(scores.shape[:-1] + (len(self.poses),))
+        for j, (pose, rules) in enumerate(zip(self.poses, self._rules)):
+            # Same order of additions as CompiledPose.evaluate, so the same bits
+            total = np.zeros(scores.shape[:-1])
+            for i, w in enumerate(pose._weight_list, rules.start):
+                total += scores[..., i] * w
+            accuracy[..., j] = total / pose._weight_sum * 100
+        return accuracy, scores
+
+    def rule_scores(self, scores, index):
+        """
+        {rule name: score} of pose `index`, from one frame's rule scores
+        """
+        pose = self.poses[index]
+        return dict(zip(pose.rule_names, scores[self._rules[index]].tolist()))
 
-    accuracy = sum(scores.values()) / len(scores) * 100
-    return accuracy, None, scores
+
+# ------------------------
+# Pose specs
+# ------------------------
+# Landmarks: 11/12 shoulders, 13/14 elbows, 15/16 wrists, 23/24 hips,
+# 25/26 knees, 27/28 ankles (left/right). Adding a pose means adding an
+# entry here; scoring, feedback and joint highlighting all follow from it.
+
+POSE_SPECS = {
+    "MOUNTAIN": [
+        # arms raised (70%) and straight (30%)
+        rule("left_arm",
+             [(0.7, ramp(rise(11, 15), 0, 0.25)), (0.3, target(angle(11, 13, 15), 180, 60))],
+             feedback="Left arm not level with shoulder", highlight=(15,)),
+        rule("right_arm",
+             [(0.7, ramp(rise(12, 16), 0, 0.25)), (0.3, target(angle(12, 14, 16), 180, 60))],
+             feedback="Right arm not level with shoulder", highlight=(16,)),
+        # relaxed V: wrists about 1.8 shoulder widths apart
+        rule("arm_width", target(ratio(gap_x(15, 16), gap_x(11, 12)), 1.8, 0.8)),
+        rule("left_leg", target(angle(23, 25, 27), 180, 35)),
+        rule("right_leg", target(angle(24, 26, 28), 180, 35)),
+    ],
+    "TREE": [
+        rule("standing_leg", target(nearest(angle(23, 25, 27), angle(24, 26, 28), 180), 180, 30),
+             feedback="Standing leg should be straight"),
+        # full marks below 0.15 torso lengths between ankle and knee, none above 0.35
+        rule("lifted_foot", ramp(lower(ratio(gap_y(27, 25), torso()), ratio(gap_y(28, 26), torso())), 0.35, 0.15),
+             feedback="Lifted foot not high enough", highlight=(27, 28)),
+        rule("hands", target(ratio(distance(15, 16), torso()), 0, 0.5),
+             feedback="Hands too far apart or too close", highlight=(15, 16)),
+        rule("hand_height", target(mid_gap_y((15, 16), (11, 12)), 0, 0.35),
+             feedback="Hands not level with shoulders", highlight=(15, 16)),
+    ],
+    "WARRIOR2": [
+        # front knee is whichever knee is nearer a right angle
+        rule("front_knee", target(nearest(angle(23, 25, 27), angle(24, 26, 28), 95), 105, 90),
+             feedback="Front knee not bent enough or too bent", highlight=(25,)),
+        rule("back_knee", target(farthest(angle(23, 25, 27), angle(24, 26, 28), 95), 180, 70),
+             feedback="Back leg should be straight", highlight=(26,)),
+        rule("left_arm", target(gap_y(11, 15), 0, 0.3),
+             feedback="Left arm not level with shoulder", highlight=(15,)),
+        rule("right_arm", target(gap_y(12, 16), 0, 0.3),
+             feedback="Right arm not level with shoulder", highlight=(16,)),
+        rule("left_elbow",
+             [(0.5, ramp(angle(11, 13, 15), 135, 180)), (0.5, target(gap_y(11, 15), 0, 0.3))],
+             feedback="Left elbow not fully extended", highlight=(13,)),
+        rule("right_elbow",
+             [(0.5, ramp(angle(12, 14, 16), 135, 180)), (0.5, target(gap_y(12, 16), 0, 0.3))],
+             feedback="Right elbow not fully extended", highlight=(14,)),
+    ],
+}
+
+POSES = {name: compile_pose(name, rules) for name, rules in POSE_SPECS.items()}
+POSE_SET = CompiledPoseSet(POSE_SPECS)
+
+# Rule name -> feedback message / highlighted landmarks, across all poses
+FEEDBACK_MESSAGES = {}
+FEEDBACK_LANDMARKS = {}
+for _pose in POSES.values():
+    for _name, _message, _joints in zip(_pose.rule_names, _pose.messages, _pose.highlights):
+        if _message:
+            FEEDBACK_MESSAGES.setdefault(_name, _message)
+        if _joints:
+            FEEDBACK_LANDMARKS.setdefault(_name, _joints)
+
+mountain_pose_score = POSES["MOUNTAIN"].score
+mountain_pose_score_batch = POSES["MOUNTAIN"].score_batch
+tree_pose_score = POSES["TREE"].score
+tree_pose_score_batch = POSES["TREE"].score_batch
+warrior2_pose_score = POSES["WARRIOR2"].score
+warrior2_pose_score_batch = POSES["WARRIOR2"].score_batch
@@ -0,0 +1,167 @@
+# reference_cache.py
+"""
+Decoded instructor clips, ready to paste into the display.
+
+Each clip in POSE_VIDEOS is decoded, turned upright and resized once for the
+current display height into a preallocated frame buffer (a memory-mapped
+temp file for clips too large to keep in RAM). The session then just cycles
+through the buffer instead of decoding and transforming a frame per camera
+frame. The next pose's clip can be prefetched on a background thread.
+"""
+import collections
+import logging
+import os
+import tempfile
+import threading
+
+import cv2
+import numpy as np
+
+MAX_IN_MEMORY_BYTES = 256 * 1024 * 1024
+GET_TIMEOUT = 0.0  # seconds get() waits for a clip still decoding; the frame shows no clip meanwhile
+CLIP_ROTATION = cv2.ROTATE_90_COUNTERCLOCKWISE  # the instructor clips are recorded sideways
+
+log = logging.getLogger(__name__)
+
+
+class ReferenceClip:
+    """
+    All frames of one clip, rotated and scaled to a fixed height, served in a loop.
+    """
+
+    def __init__(self, path, height, rotate=CLIP_ROTATION):
+        cap = cv2.VideoCapture(path)
+        vw = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        vh = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        if rotate in (cv2.ROTATE_90_CLOCKWISE, cv2.ROTATE_90_COUNTERCLOCKWISE):
+            vw, vh = vh, vw
+
+        scale = height / vh if vh else 1.0
+        self.height = height
+        self.width = int(vw * scale)
+        self._backing = None
+
+        if count > 0:
+            self.frames = self._allocate(count)
+            n = 0
+            while n < count:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                if rotate is not None:
+                    frame = cv2.rotate(frame, rotate)
+                cv2.resize(frame, (self.width, self.height), dst=self.frames[n])
+                n += 1
+            self.frames = self.frames[:n]
+        else:
+            # Container does not report a frame count: decode, then pack
+            decoded = []
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                if rotate is not None:
+                    frame = cv2.rotate(frame, rotate)
+                decoded.append(cv2.resize(frame, (self.width, self.height)))
+            self.frames = self._allocate(len(decoded))
+            for i, frame in enumerate(decoded):
+                self.frames[i] = frame
+        cap.release()
+
+        self._index = 0
+
+    def _allocate(self, count):
+        shape = (count, self.height, self.width, 3)
+        if count * self.height * self.width * 3 <= MAX_IN_MEMORY_BYTES:
+            return np.empty(shape, dtype=np.uint8)
+        self._backing = tempfile.TemporaryFile(prefix="yoga_ref_")
+        return np.memmap(self._backing, dtype=np.uint8, mode="w+", shape=shape)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def next_frame(self):
+        frame = self.frames[self._index]
+        self._index = (self._index + 1) % len(self.frames)
+        return frame
+
+    def close(self):
+        # The mapping stays valid for anyone still holding a frame
+        if self._backing:
+            self._backing.close()
+            self._backing = None
+
+
+class ReferenceCache:
+    """
+    Holds the most recently used clips keyed by (pose name, display height).
+    rotations maps pose names to the cv2.rotate code their clip needs (None
+    if it is upright); clips not in it get CLIP_ROTATION. prefetch() starts
+    decoding a clip in the background; get() returns None until it is ready
+    instead of stalling the frame loop on the decode.
+    A clip that fails to decode is treated like a pose without a video.
+    """
+
+    def __init__(self, videos, max_clips=2, rotations=None):
+        self.videos = videos
+        self.rotations = rotations or {}
+        self.max_clips = max_clips
+        self._clips = collections.OrderedDict()
+        self._loading = {}
+        self._unreadable = set()
+        self._lock = threading.Lock()
+
+    def prefetch(self, pose_name, height):
+        key = (pose_name, height)
+        path = self.videos.get(pose_name)
+        if not height or not path or not os.path.exists(path):
+            return
+        with self._lock:
+            if key in self._clips or key in self._loading or key in self._unreadable:
+                return
+            done = threading.Event()
+            self._loading[key] = done
+        threading.Thread(target=self._load, args=(key, path, done), daemon=True).start()
+
+    def get(self, pose_name, height, timeout=GET_TIMEOUT):
+        """
+        The clip for pose_name at this height, or None if the pose has no
+        video or it is not decoded within timeout seconds (None waits).
+        """
+        key = (pose_name, height)
+        self.prefetch(pose_name, height)
+        with self._lock:
+            if key in self._clips:
+                self._clips.move_to_end(key)
+                return self._clips[key]
+            done = self._loading.get(key)
+        if done is None or not done.wait(timeout):
+            return None
+        with self._lock:
+            return self._clips.get(key)
+
+    def close(self):
+        with self._lock:
+            for clip in self._clips.values():
+                clip.close()
+            self._clips.clear()
+
+    def _load(self, key, path, done):
+        clip = None
+        try:
+            clip = ReferenceClip(path, key[1], self.rotations.get(key[0], CLIP_ROTATION))
+        except Exception as e:  # corrupt file, codec error, out of memory
+            log.warning("Could not load instructor clip %s: %s", path, e)
+        finally:
+            with self._lock:
+                if clip is not None and len(clip):
+                    self._clips[key] = clip
+                    # Evicted clips are only dropped, not closed: a caller may
+                    # still be showing one, and it is freed with the last reference
+                    while len(self._clips) > self.max_clips:
+                        self._clips.popitem(last=False)
+                else:
+                    self._unreadable.add(key)
+                del self._loading[key]
+            done.set()
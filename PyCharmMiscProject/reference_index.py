@@ -0,0 +1,280 @@
+# reference_index.py
+"""
+Instructor reference poses, scored by similarity instead of hand-written rules.
+
+A one-time preprocessing step runs MediaPipe over each instructor clip
+(POSE_VIDEOS, or any recorded demo), normalizes every frame's body joints
+by torso length and stores the distinct frames in a small index file:
+
+    python reference_index.py                         # the clips in POSE_VIDEOS
+    python reference_index.py --add CHAIR=chair.mp4   # a new pose from an upright demo
+    python reference_index.py --add CHAIR=chair.mp4 --rotate ccw   # ... filmed sideways
+
+ReferenceScorer compares a student's frame with its nearest instructor
+frame (vectorized over all frames of the pose, and over many student frames
+offline) and turns the distance into a 0-100% accuracy. It has the same
+score()/score_batch() forms as the pose.py scorers, so a pose recorded from
+a demo can be scheduled like any other: Pose_session picks up every pose in
+the index that has no rule spec, and grading_service grades them. Free flow
+recognizes rule-spec poses only (see free_flow.py).
+
+Each pose keeps the rotation its clip was read with (the instructor clips
+in POSE_VIDEOS are sideways, demos usually upright), so the session shows
+the clip the same way up (reference_cache.ReferenceCache).
+
+Frames are mirrored as well, so a student facing the other way than the
+instructor still matches. Holds are static, so matching single frames is
+enough; no time alignment (DTW) is done.
+"""
+import argparse
+import logging
+import os
+
+import numpy as np
+
+from pose import landmarks_to_array, landmarks_xy, torso_lengths
+
+INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reference_index.npz")
+FORMAT_VERSION = 2  # 2 added per-pose rotation; version 1 clips were all read with CLIP_ROTATION
+NO_ROTATION = -1   # stored for an upright clip
+
+# Shoulders, elbows, wrists, hips, knees, ankles (left/right alternating)
+BODY_JOINTS = np.array([11, 12, 13, 14, 15, 16, 23, 24, 25, 26, 27, 28])
+MIRRORED = np.array([1, 0, 3, 2, 5, 4, 7, 6, 9, 8, 11, 10])  # left <-> right within BODY_JOINTS
+SMOOTH_FRAMES = 5  # consecutive instructor frames averaged to take out detection jitter
+DEDUPE = 0.05      # torso lengths (RMS per joint) below which frames count as the same
+TOLERANCE = 0.75   # torso lengths (RMS per joint) at which the accuracy reaches 0
+# --rotate choices: cv2.rotate codes, spelled out so building the table needs no cv2
+ROTATIONS = {"none": None, "cw": 0, "180": 1, "ccw": 2}
+
+log = logging.getLogger(__name__)
+
+
+# -------------------------
+# Normalization
+# -------------------------
+def normalize(landmarks):
+    """
+    Body joints relative to the hip midpoint in torso lengths, flattened:
+    (features (..., 24) float32, valid (...,) bool). Frames with a torso of
+    zero length are not valid.
+    """
+    p = landmarks_xy(landmarks)[..., BODY_JOINTS, :]
+    hip_mid = (p[..., 6, :] + p[..., 7, :]) / 2
+    torso = torso_lengths(landmarks)
+    valid = torso > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        features = (p - hip_mid[..., None, :]) / np.where(valid, torso, 1.0)[..., None, None]
+    return features.reshape(features.shape[:-2] + (-1,)).astype(np.float32), valid
+
+
+def mirror(features):
+    """
+    The same poses seen in a mirror: x flipped, left and right swapped.
+    """
+    p = features.reshape(features.shape[:-1] + (len(BODY_JOINTS), 2))[..., MIRRORED, :].copy()
+    p[..., 0] *= -1
+    return p.reshape(features.shape)
+
+
+def smooth_runs(features, frames, width=SMOOTH_FRAMES):
+    """
+    Moving average of features over `width` frames, within each run of
+    consecutive frame numbers only, so frames on either side of a detection
+    gap are never averaged together. Returns (features, frames) with the
+    frame each average is centred on; runs shorter than width are kept as is.
+    """
+    kernel = np.full(width, 1 / width, dtype=np.float32)
+    breaks = np.flatnonzero(np.diff(frames) != 1) + 1
+    out_features, out_frames = [], []
+    for run, run_frames in zip(np.split(features, breaks), np.split(frames, breaks)):
+        if len(run) >= width:
+            run = np.stack([np.convolve(column, kernel, mode="valid") for column in run.T], axis=1)
+            run_frames = run_frames[width // 2:][:len(run)]
+        out_features.append(run)
+        out_frames.append(run_frames)
+    return np.concatenate(out_features), np.concatenate(out_frames)
+
+
+def distinct_frames(features, threshold=DEDUPE):
+    """
+    Indices of a subset of frames such that every frame is within threshold
+    (RMS per joint) of one of them.
+    """
+    limit = (threshold ** 2) * len(BODY_JOINTS)
+    kept = []
+    for i, f in enumerate(features):
+        if not kept or (((features[kept] - f) ** 2).sum(axis=1) > limit).all():
+            kept.append(i)
+    return np.array(kept, dtype=np.int32)
+
+
+# -------------------------
+# Index
+# -------------------------
+class ReferenceIndex:
+    """
+    Per pose: distinct normalized instructor frames (and their mirror
+    images), the frame numbers they came from, the source video and the
+    cv2.rotate code it was read with (None if upright).
+    """
+
+    def __init__(self):
+        self.poses = {}  # name -> (features (M, 24) float32, frames (M,) int32, video, rotation)
+
+    def add(self, pose_name, landmarks, detected=None, video="", rotation=None):
+        """
+        Add (or replace) a pose from an instructor landmark track (N, 33, >=2)
+        read from video turned by rotation.
+        """
+        features, valid = normalize(landmarks)
+        if detected is not None:
+            valid &= detected
+        frames = np.flatnonzero(valid).astype(np.int32)
+        if not len(frames):
+            raise ValueError(f"{pose_name}: no usable instructor frames")
+        features, frames = smooth_runs(features[frames], frames)
+        keep = distinct_frames(features)
+        features, frames = features[keep], frames[keep]
+        self.poses[pose_name] = (np.concatenate([features, mirror(features)]),
+                                 np.concatenate([frames, frames]), video, rotation)
+
+    def save(self, path=INDEX_PATH):
+        arrays = {"version": np.array(FORMAT_VERSION), "names": np.array(list(self.poses))}
+        for i, (features, frames, video, rotation) in enumerate(self.poses.values()):
+            arrays[f"features_{i}"] = features.astype(np.float16)  # plenty for torso-length units
+            arrays[f"frames_{i}"] = frames
+            arrays[f"video_{i}"] = np.array(video)
+            arrays[f"rotation_{i}"] = np.array(NO_ROTATION if rotation is None else rotation)
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        from reference_cache import CLIP_ROTATION
+
+        index = cls()
+        with np.load(path, allow_pickle=False) as data:
+            version = int(data["version"])
+            if version not in (1, FORMAT_VERSION):
+                raise ValueError(f"{path}: unsupported index version {version}")
+            for i, name in enumerate(data["names"].tolist()):
+                rotation = int(data[f"rotation_{i}"]) if version > 1 else CLIP_ROTATION
+                index.poses[name] = (data[f"features_{i}"].astype(np.float32), data[f"frames_{i}"],
+                                     str(data[f"video_{i}"]), None if rotation == NO_ROTATION else rotation)
+        return index
+
+    def scorer(self, pose_name, tolerance=TOLERANCE):
+        features, frames, video, rotation = self.poses[pose_name]
+        return ReferenceScorer(pose_name, features, frames, video, tolerance, rotation)
+
+
+# -------------------------
+# Scoring
+# -------------------------
+class ReferenceScorer:
+    """
+    Accuracy of a frame as its distance to the nearest instructor frame:
+    100% on it, 0% at `tolerance` torso lengths RMS per joint. video and
+    rotation say how to show the instructor clip.
+    """
+
+    def __init__(self, name, features, frames, video="", tolerance=TOLERANCE, rotation=None):
+        self.name = name
+        self.video = video
+        self.rotation = rotation
+        self.features = np.ascontiguousarray(features, dtype=np.float32)
+        self.frames = frames
+        self.tolerance = tolerance
+        self._sq_norms = (self.features ** 2).sum(axis=1)
+
+    def nearest(self, landmarks):
+        """
+        (instructor frame numbers (...,), RMS per-joint distances (...,)) of
+        the nearest instructor frame; the distance is inf for invalid frames.
+        """
+        query, valid = normalize(landmarks)
+        # |q - f|^2 = |q|^2 - 2 q.f + |f|^2, for all instructor frames at once
+        d2 = (query ** 2).sum(axis=-1)[..., None] - 2 * query @ self.features.T + self._sq_norms
+        best = d2.argmin(axis=-1)
+        d2 = np.maximum(np.take_along_axis(d2, best[..., None], axis=-1)[..., 0], 0)
+        distance = np.where(valid, np.sqrt(d2 / len(BODY_JOINTS)), np.inf)
+        return self.frames[best], distance
+
+    def evaluate(self, landmarks):
+        _, distance = self.nearest(landmarks)
+        similarity = np.maximum(0, 1 - distance / self.tolerance)
+        return similarity * 100, similarity
+
+    def score_batch(self, landmarks):
+        """
+        (accuracy, {"reference": similarity}) over a landmark array
+        """
+        accuracy, similarity = self.evaluate(landmarks)
+        return accuracy, {"reference": similarity}
+
+    def score(self, lm):
+        """
+        Per-frame scorer: (accuracy, None, {"reference": similarity})
+        """
+        accuracy, similarity = self.evaluate(landmarks_to_array(lm))
+        return float(accuracy), None, {"reference": float(similarity)}
+
+
+def load_scorers(path=INDEX_PATH):
+    """
+    {pose name: ReferenceScorer} for every pose in the index; empty without one.
+    """
+    if not os.path.exists(path):
+        return {}
+    index = ReferenceIndex.load(path)
+    return {name: index.scorer(name) for name in index.poses}
+
+
+# -------------------------
+# Building
+# -------------------------
+def build_index(videos, path=INDEX_PATH, update=False, rotations=None):
+    """
+    Extract, normalize and store the instructor tracks of {pose name: video
+    path}. rotations maps pose names to the cv2.rotate code their video
+    needs to be upright; videos not in it are read as they are. With
+    update=True, poses already in the index are kept.
+    """
+    from offline_session import extract_landmarks
+
+    rotations = rotations or {}
+    index = ReferenceIndex.load(path) if update and os.path.exists(path) else ReferenceIndex()
+    for pose_name, video in videos.items():
+        rotation = rotations.get(pose_name)
+        _, landmarks, detected = extract_landmarks(video, rotate=rotation)
+        index.add(pose_name, landmarks, detected, video, rotation)
+        log.info("%s: %d of %d frames detected, %d distinct",
+                 pose_name, detected.sum(), len(detected), len(index.poses[pose_name][0]) // 2)
+    index.save(path)
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the instructor reference landmark index.")
+    parser.add_argument("--add", nargs="+", metavar="POSE=VIDEO",
+                        help="add poses from demo videos to the existing index")
+    parser.add_argument("--rotate", choices=list(ROTATIONS), default="none",
+                        help="how the --add videos are turned to be upright (default: not at all)")
+    parser.add_argument("--index", default=INDEX_PATH)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.add:
+        videos = dict(item.split("=", 1) for item in args.add)
+        rotations = {pose_name: ROTATIONS[args.rotate] for pose_name in videos}
+    else:
+        from Pose_session import POSE_ROTATIONS, POSE_VIDEOS
+        from reference_cache import CLIP_ROTATION
+        videos = POSE_VIDEOS
+        rotations = {pose_name: POSE_ROTATIONS.get(pose_name, CLIP_ROTATION) for pose_name in videos}
+    build_index(videos, args.index, update=bool(args.add), rotations=rotations)
+    print(f"Index saved to {args.index}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# roi_inference.py
+"""
+Region-of-interest inference.
+
+RoiDetector wraps a pose detector and, while it is tracking the student,
+gives it only a square crop around them, scaled to INPUT_SIZE, instead of
+the whole camera frame. The crop is the bounding box of the last
+landmarks, padded by `padding` of its size on each side, and it stays put
+until the landmarks come within `margin` of its edge or the student takes
+up much less of it, so MediaPipe's own tracking sees a steady image.
+Whenever the crop does change, that tracking is reset, since it refers to
+the previous image. The landmarks are mapped back to full-frame
+coordinates, so scoring and drawing do not know a crop was used.
+
+When nothing is detected, the landmarks are mostly not visible or the
+student does not fit in a square crop, the next frame is searched in full
+again.
+"""
+import cv2
+import numpy as np
+
+from landmark_store import ArrayResult, result_landmarks
+from session_resources import reset_tracking
+
+INPUT_SIZE = 256       # pixels, square; MediaPipe's pose detector works at about this size
+MIN_VISIBILITY = 0.5   # landmarks used for the box
+MIN_VISIBLE = 8        # fewer visible landmarks than this means tracking is lost
+
+
+class RoiDetector:
+    """
+    Drop-in replacement for mp_pose.Pose exposing process(rgb).
+    `crop` is the (x, y, side) pixel square the last frame was cropped to,
+    or None when it was searched in full.
+    """
+
+    def __init__(self, pose_detector, input_size=INPUT_SIZE, padding=0.25, margin=0.05):
+        self.pose_detector = pose_detector
+        self.input_size = input_size
+        self.padding = padding
+        self.margin = margin
+        self.crop = None
+        self.cropped_frames = 0
+        self.full_frames = 0
+        self._input = np.empty((input_size, input_size, 3), dtype=np.uint8)
+
+    def close(self):
+        self.pose_detector.close()
+
+    def reset(self):
+        reset_tracking(self.pose_detector)
+        self.crop = None
+
+    def process(self, rgb):
+        crop = self.crop
+        if crop is None:
+            self.full_frames += 1
+            result = self.pose_detector.process(rgb)
+            values = result_landmarks(result)
+        else:
+            self.cropped_frames += 1
+            x, y, side = crop
+            cv2.resize(rgb[y:y + side, x:x + side], (self.input_size, self.input_size),
+                       dst=self._input, interpolation=cv2.INTER_LINEAR)  # as MediaPipe scales its input
+            result = self.pose_detector.process(self._input)
+            values = result_landmarks(result)
+            if values is None:
+                self.reset()  # lost: search the whole next frame
+                return result
+
+            # Crop-normalized -> frame-normalized; z is scaled like x
+            h, w = rgb.shape[:2]
+            values = values.copy()
+            values[:, 0] = (values[:, 0] * side + x) / w
+            values[:, 1] = (values[:, 1] * side + y) / h
+            values[:, 2] *= side / w
+            result = ArrayResult(values)
+
+        self._move_to(self._next_crop(values, rgb.shape, crop))
+        return result
+
+    def _move_to(self, crop):
+        if crop != self.crop:
+            # The detector tracks in the coordinates of the image it was given,
+            # which a different crop (or the full frame) no longer matches
+            reset_tracking(self.pose_detector)
+            self.crop = crop
+
+    def _next_crop(self, values, shape, crop):
+        """
+        The crop for the next frame: the current one while the student is
+        comfortably inside it, a new one around them otherwise, None to
+        search the full frame.
+        """
+        if values is None:
+            return None
+        visible = values[values[:, 3] >= MIN_VISIBILITY, :2]
+        if len(visible) < MIN_VISIBLE:
+            return None
+        h, w = shape[:2]
+        x0, y0 = visible.min(axis=0) * (w, h)
+        x1, y1 = visible.max(axis=0) * (w, h)
+        size = max(x1 - x0, y1 - y0)
+
+        if crop is not None:
+            cx, cy, side = crop
+            inset = self.margin * side
+            inside = x0 >= cx + inset and y0 >= cy + inset and x1 <= cx + side - inset and y1 <= cy + side - inset
+            if inside and size * (1 + 2 * self.padding) > side / 2:
+                return crop
+
+        if size <= 0 or size > min(w, h):
+            return None  # no square crop would hold the student
+        side = int(min(size * (1 + 2 * self.padding), min(w, h)))
+        # Centered on the student, shifted to stay inside the frame
+        x = int(min(max((x0 + x1 - side) / 2, 0), w - side))
+        y = int(min(max((y0 + y1 - side) / 2, 0), h - side))
+        return x, y, side
@@ -0,0 +1,257 @@
+# score_logger.py
+"""
+Background score logging.
+
+Events are (time, pose_name, score, components, event) where time is epoch
+seconds. For a score, event is "" and components maps each per-component
+score name to its value. A hold that broke or was done is marked by an event
+row ("break" / "done", see hold_tracker) carrying the hold's summary as
+components and its mean as score. The frame loop only ever does a
+non-blocking put onto a bounded queue; a writer thread drains it in batches
+and hands them to a sink:
+
+    csv     Pose,Score,Timestamp,Components,Event  (components as JSON)
+    jsonl   one JSON object per event
+    binary  append-only length-prefixed records, see BinarySink
+"""
+import csv
+import json
+import queue
+import struct
+import threading
+import time
+
+CSV_HEADER = ["Pose", "Score", "Timestamp", "Components", "Event"]
+
+
+def format_log_time(epoch):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(epoch))
+
+
+# -------------------------
+# Sinks
+# -------------------------
+class CsvSink:
+    extension = ".csv"
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "w", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(CSV_HEADER)
+
+    def write(self, events):
+        self._writer.writerows(
+            [pose_name, score, format_log_time(t), json.dumps(components, separators=(",", ":")), event]
+            for t, pose_name, score, components, event in events
+        )
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class JsonlSink:
+    extension = ".jsonl"
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "w")
+
+    def write(self, events):
+        self._file.writelines(
+            json.dumps({
+                "pose": pose_name,
+                "score": score,
+                "time": t,
+                "timestamp": format_log_time(t),
+                "components": components,
+                "event": event,
+            }) + "\n"
+            for t, pose_name, score, components, event in events
+        )
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class BinarySink:
+    """
+    File header b"YSSL" + version (uint16), then per event:
+        time (float64), score (float32), pose name length (uint8),
+        component count (uint8), event length (uint8), pose name (utf-8),
+        event (utf-8),
+        per component: name length (uint8), name (utf-8), value (float32)
+    Records are only ever appended, so a truncated file loses at most the
+    last event. read_binary_log() parses it back, version 1 files (which
+    have no event) included.
+    """
+    extension = ".yslog"
+    MAGIC = b"YSSL"
+    VERSION = 2
+    _HEADER = struct.Struct("<4sH")
+    _RECORD = struct.Struct("<dfBBB")
+    _RECORD_V1 = struct.Struct("<dfBB")
+    _VALUE = struct.Struct("<f")
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "wb")
+        self._file.write(self._HEADER.pack(self.MAGIC, self.VERSION))
+
+    def write(self, events):
+        parts = []
+        for t, pose_name, score, components, event in events:
+            name = pose_name.encode()
+            event = event.encode()
+            parts.append(self._RECORD.pack(t, score, len(name), len(components), len(event)))
+            parts.append(name)
+            parts.append(event)
+            for key, value in components.items():
+                key = key.encode()
+                parts.append(bytes((len(key),)))
+                parts.append(key)
+                parts.append(self._VALUE.pack(value))
+        self._file.write(b"".join(parts))
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def read_binary_log(path):
+    """
+    Yields (time, pose_name, score, components, event) events from a BinarySink file.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version = BinarySink._HEADER.unpack_from(data)
+    if magic != BinarySink.MAGIC or version not in (1, BinarySink.VERSION):
+        raise ValueError(f"{path} is not a version {BinarySink.VERSION} score log")
+    record = BinarySink._RECORD if version == BinarySink.VERSION else BinarySink._RECORD_V1
+
+    pos = BinarySink._HEADER.size
+    try:
+        while pos < len(data):
+            t, score, name_len, count, *event_len = record.unpack_from(data, pos)
+            pos += record.size
+            pose_name = data[pos:pos + name_len].decode()
+            pos += name_len
+            event_len = event_len[0] if event_len else 0
+            event = data[pos:pos + event_len].decode()
+            pos += event_len
+            components = {}
+            for _ in range(count):
+                key_len = data[pos]
+                key = data[pos + 1:pos + 1 + key_len].decode()
+                pos += 1 + key_len
+                components[key] = BinarySink._VALUE.unpack_from(data, pos)[0]
+                pos += BinarySink._VALUE.size
+            if pos > len(data):
+                return  # truncated inside the names, which slicing does not catch
+            yield t, pose_name, score, components, event
+    except (struct.error, IndexError, UnicodeDecodeError):
+        return  # truncated last record
+
+
+SINKS = {
+    "csv": CsvSink,
+    "jsonl": JsonlSink,
+    "binary": BinarySink,
+}
+
+
+def open_sink(kind, path_base):
+    """
+    Create a sink of the given kind, writing to path_base plus its extension.
+    """
+    sink_class = SINKS[kind]
+    return sink_class(path_base + sink_class.extension)
+
+
+# -------------------------
+# Background writer
+# -------------------------
+class ScoreLogger:
+    """
+    Queues events for a writer thread so logging I/O never blocks the caller.
+    When the queue is full, events are dropped and counted in `dropped`
+    rather than stalling the frame loop.
+    """
+
+    _STOP = object()
+
+    def __init__(self, sink, queue_size=4096, batch_size=256, flush_interval=1.0, close_timeout=5.0):
+        self.sink = sink
+        self.close_timeout = close_timeout
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def log(self, t, pose_name, score, components=None, event=""):
+        try:
+            self._queue.put_nowait((t, pose_name, float(score), dict(components or {}), event))
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        """
+        Write out queued events and close the sink. Gives up after
+        close_timeout seconds if the writer is stuck or has died (a sink
+        write raised), so closing never hangs the caller.
+        """
+        if self._thread.is_alive():
+            try:
+                self._queue.put(self._STOP, timeout=self.close_timeout)
+            except queue.Full:
+                pass
+            self._thread.join(self.close_timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _run(self):
+        try:
+            self._drain()
+        finally:
+            self.sink.close()  # also when a write raised, so the file is not left open
+
+    def _drain(self):
+        batch = []
+        last_flush = time.monotonic()
+        stopping = False
+        while not stopping:
+            timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush))
+            try:
+                item = self._queue.get(timeout=timeout)
+                # Drain whatever else is already waiting
+                while item is not self._STOP:
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    item = self._queue.get_nowait()
+                stopping = item is self._STOP
+            except queue.Empty:
+                pass
+
+            now = time.monotonic()
+            if batch and (stopping or len(batch) >= self.batch_size or now - last_flush >= self.flush_interval):
+                self.sink.write(batch)
+                self.sink.flush()
+                batch = []
+                last_flush = now
+            elif not batch:
+                last_flush = now
@@ -0,0 +1,162 @@
+# session_resources.py
+"""
+Detector and camera shared by every lesson of a running app.
+
+Building a MediaPipe Pose graph and negotiating a camera both take seconds.
+SessionResources does that once, on a background thread, while the app is
+starting, runs one warm-up inference and then lends the same detector and
+open camera to each run_pose_session call. Tracking state is reset between
+poses so one pose's landmarks do not seed the next; everything is released
+by close() when the app exits. Detectors of other model complexities for
+governor.py (spare_complexities) are built after that, on the same thread,
+and kept for the app's lifetime too.
+
+cv2 and mediapipe are imported where they are first used, so main.py can
+import this module before its window has drawn.
+"""
+import logging
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+
+def create_pose_detector(model_complexity=1):
+    import mediapipe as mp
+    return mp.solutions.pose.Pose(
+        static_image_mode=False,
+        model_complexity=model_complexity,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5
+    )
+
+
+def reset_tracking(pose_detector):
+    """
+    Forget the landmarks the detector is tracking, so the next frame is a
+    fresh detection. Detectors without tracking state are left alone.
+    """
+    reset = getattr(pose_detector, "reset", None)
+    if reset:
+        reset()
+
+
+class SessionResources:
+    """
+    Process-wide detector and camera. start() loads them in the background;
+    acquire() waits until they are ready and lends them to one session at a
+    time, release() hands them back. spare_detectors maps each of
+    spare_complexities to a detector once it is built.
+    """
+
+    def __init__(self, source=0, spare_complexities=()):
+        self.source = source
+        self.spare_complexities = spare_complexities
+        self.pose_detector = None
+        self.capture = None
+        self.spare_detectors = {}
+        self.ready_time = None  # seconds from start() until warmed up
+
+        self._ready = threading.Event()
+        self._error = None
+        self._in_use = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._started = False
+        self._closed = False
+        self._spare_lock = threading.Lock()
+        self._loader = threading.Thread(target=self._load, daemon=True)
+
+    def start(self):
+        """
+        Begin loading in the background; later calls do nothing.
+        """
+        with self._start_lock:
+            if not self._started:
+                self._started = True
+                self._loader.start()
+        return self
+
+    def _load(self):
+        start = time.perf_counter()
+        try:
+            import cv2
+            self.pose_detector = create_pose_detector()
+            self.capture = cv2.VideoCapture(self.source)
+            # One inference on a real frame builds the graph's lazy state
+            ret, frame = self.capture.read()
+            if ret:
+                self.pose_detector.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+                reset_tracking(self.pose_detector)
+            self.ready_time = time.perf_counter() - start
+            log.info("Detector and camera ready in %.1fs", self.ready_time)
+        except Exception as e:
+            self._error = e
+        finally:
+            self._ready.set()
+        if not self._error:
+            self._load_spares()
+
+    def _load_spares(self):
+        # After the lent detector is ready, so they never delay the first lesson
+        for complexity in self.spare_complexities:
+            try:
+                detector = create_pose_detector(model_complexity=complexity)
+            except Exception:
+                log.exception("Could not build a complexity %d detector", complexity)
+                continue
+            with self._spare_lock:
+                if self._closed:
+                    detector.close()
+                    return
+                self.spare_detectors[complexity] = detector
+
+    def wait(self, timeout=None):
+        """
+        Wait until loading has finished; returns False on timeout.
+        """
+        return self._ready.wait(timeout)
+
+    def acquire(self, timeout=None):
+        """
+        (capture, pose_detector) for one session. Blocks until loading has
+        finished and no other session holds them.
+        """
+        self.start()
+        if not self._ready.wait(timeout):
+            raise TimeoutError("detector and camera are still loading")
+        if self._error:
+            raise RuntimeError("could not load detector or camera") from self._error
+        if not self._in_use.acquire(timeout=-1 if timeout is None else timeout):
+            raise TimeoutError("detector and camera are in use by another session")
+        if not self.capture.isOpened():
+            self.capture.open(self.source)
+        reset_tracking(self.pose_detector)
+        return self.capture, self.pose_detector
+
+    def release(self):
+        self._in_use.release()
+
+    def close(self):
+        """
+        Release camera and detectors. Waits briefly for a running session to
+        hand them back first.
+        """
+        if self._started:
+            self._ready.wait(timeout=5)
+        locked = self._in_use.acquire(timeout=2)
+        try:
+            with self._spare_lock:
+                self._closed = True
+                spares = list(self.spare_detectors.values())
+                self.spare_detectors.clear()
+            for detector in spares:
+                detector.close()
+            if self.capture is not None:
+                self.capture.release()
+                self.capture = None
+            if self.pose_detector is not None:
+                self.pose_detector.close()
+                self.pose_detector = None
+        finally:
+            if locked:
+                self._in_use.release()
@@ -0,0 +1,334 @@
+# session_stats.py
+"""
+Per-pose and per-lesson statistics over yoga sessions, in fixed memory.
+
+SessionStats is fed one session at a time, either live from
+run_pose_session or by replaying yoga_scores_*.csv logs, and keeps only
+counters and fixed-size histograms, so memory does not grow with the number
+of sessions. For every pose and lesson it reports attempts, completed holds,
+completion rate, time to reach TARGET_SCORE and mean / p50 / p90 of the
+scores logged during the hold. Aggregates from several processes are
+combined with merge().
+
+    python session_stats.py logs/ --workers 8 --out yoga_summary.json
+
+A score log only contains the holds, so when replaying: a pose's time to
+target is measured from the end of the previous pose's hold (the first
+pose from the session start encoded in yoga_scores_<epoch>.csv), a hold is
+complete when the log has its "done" row (in logs from before Event rows
+were added: when its rows span HOLD_TIME), and a pose that never reached the
+target only counts as attempted when the log matches a lesson in Lessons.py.
+"""
+import argparse
+import csv
+import functools
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from hold_tracker import BREAK, DONE, HOLD_TIME
+from Lessons import LESSONS
+
+TIMESTAMP_RESOLUTION = 1.0  # CSV timestamps are whole seconds
+UNKNOWN_LESSON = "unknown"
+LOG_NAME = re.compile(r"yoga_scores_(\d+)(?:_.*)?\.csv$")
+
+
+# -------------------------
+# Fixed-size histograms
+# -------------------------
+class BoundedHistogram:
+    """
+    Counts in `bins` equal bins over [lo, hi]; values outside are clamped.
+    Mean is exact, quantiles are accurate to one bin width.
+    """
+
+    def __init__(self, lo, hi, bins):
+        self.lo = lo
+        self.hi = hi
+        self.counts = [0] * bins
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value):
+        bins = len(self.counts)
+        i = int((value - self.lo) / (self.hi - self.lo) * bins)
+        self.counts[min(max(i, 0), bins - 1)] += 1
+        self.count += 1
+        self.total += value
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        width = (self.hi - self.lo) / len(self.counts)
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return self.lo + (i + 0.5) * width
+        return self.hi
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+        }
+
+
+class Stats:
+    """
+    Counters and histograms for one pose or lesson.
+    """
+
+    def __init__(self):
+        self.attempts = 0
+        self.completed = 0
+        self.time_to_target = BoundedHistogram(0.0, 600.0, 1200)  # seconds
+        self.hold_score = BoundedHistogram(0.0, 100.0, 1000)      # %
+
+    def merge(self, other):
+        self.attempts += other.attempts
+        self.completed += other.completed
+        self.time_to_target.merge(other.time_to_target)
+        self.hold_score.merge(other.hold_score)
+
+    def summary(self):
+        return {
+            "attempts": self.attempts,
+            "completed": self.completed,
+            "completion_rate": self.completed / self.attempts if self.attempts else None,
+            "time_to_target_s": self.time_to_target.summary(),
+            "hold_score": self.hold_score.summary(),
+        }
+
+
+def lesson_name(poses, complete=True):
+    """
+    Title of the lesson with this pose sequence. With complete=False, poses
+    may be a prefix of the lesson; ambiguous or unmatched sequences are
+    UNKNOWN_LESSON.
+    """
+    poses = list(poses)
+    matches = [
+        lesson["title"] for lesson in LESSONS
+        if (lesson["poses"] == poses if complete else lesson["poses"][:len(poses)] == poses)
+    ]
+    return matches[0] if len(matches) == 1 else UNKNOWN_LESSON
+
+
+# -------------------------
+# Aggregator
+# -------------------------
+class SessionStats:
+    """
+    Streaming aggregate over sessions. Per session call begin_session(),
+    then for each pose begin_pose(), hold() for every logged hold score and
+    end_pose(), and finally end_session().
+    """
+
+    def __init__(self):
+        self.poses = {}
+        self.lessons = {}
+        self.sessions = 0
+        self._session = None
+        self._pose = None
+        self._pose_start = None
+        self._reached = False
+        self._all_completed = True
+
+    def _stats(self, table, name):
+        if name not in table:
+            table[name] = Stats()
+        return table[name]
+
+    def begin_session(self):
+        self._session = Stats()
+        self._all_completed = True
+
+    def begin_pose(self, pose_name, t=None):
+        """
+        t is when the pose started, or None when unknown.
+        """
+        self._pose = self._stats(self.poses, pose_name)
+        self._pose.attempts += 1
+        self._pose_start = t
+        self._reached = False
+
+    def hold(self, t, score):
+        if not self._reached:
+            self._reached = True
+            if self._pose_start is not None:
+                self._pose.time_to_target.add(t - self._pose_start)
+                self._session.time_to_target.add(t - self._pose_start)
+        self._pose.hold_score.add(score)
+        self._session.hold_score.add(score)
+
+    def end_pose(self, completed):
+        if completed:
+            self._pose.completed += 1
+        else:
+            self._all_completed = False
+        self._pose = None
+
+    def end_session(self, lesson, completed=True):
+        """
+        completed=False marks a session stopped before all its poses began,
+        or one whose completeness is unknown.
+        """
+        if self._pose is not None:
+            self.end_pose(False)
+        self._session.attempts = 1
+        self._session.completed = int(completed and self._all_completed)
+        self._stats(self.lessons, lesson).merge(self._session)
+        self._session = None
+        self.sessions += 1
+
+    def merge(self, other):
+        for table, other_table in ((self.poses, other.poses), (self.lessons, other.lessons)):
+            for name, stats in other_table.items():
+                self._stats(table, name).merge(stats)
+        self.sessions += other.sessions
+
+    def summary(self):
+        return {
+            "sessions": self.sessions,
+            "poses": {name: stats.summary() for name, stats in sorted(self.poses.items())},
+            "lessons": {name: stats.summary() for name, stats in sorted(self.lessons.items())},
+        }
+
+
+# -------------------------
+# Replaying score logs
+# -------------------------
+@functools.lru_cache(maxsize=1024)  # timestamps repeat for every row within the same second
+def _parse_time(text):
+    return time.mktime(time.strptime(text, "%Y-%m-%d %H:%M:%S"))
+
+
+def add_score_log(stats, path, hold_time=HOLD_TIME):
+    """
+    Replay one yoga_scores CSV (logs from before the Components and Event
+    columns were added included) as a session into stats.
+    """
+    match = LOG_NAME.search(os.path.basename(path))
+    session_start = float(match.group(1)) if match else None
+
+    stats.begin_session()
+    logged = []  # pose order, bounded by the lesson length
+    first = last = None  # span of the current hold's rows
+    done = False
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            stats.end_session(UNKNOWN_LESSON, completed=False)
+            return
+        pose_col, score_col, time_col = (header.index(c) for c in ("Pose", "Score", "Timestamp"))
+        event_col = header.index("Event") if "Event" in header else None
+
+        def pose_completed():
+            if event_col is not None:
+                return done
+            return first is not None and last - first >= hold_time - TIMESTAMP_RESOLUTION
+
+        for row in reader:
+            if not row:
+                continue
+            pose_name, score, t = row[pose_col], float(row[score_col]), _parse_time(row[time_col])
+            event = row[event_col] if event_col is not None else ""
+            if not logged or pose_name != logged[-1]:
+                if logged:
+                    stats.end_pose(pose_completed())
+                # The previous hold ended when this pose started
+                stats.begin_pose(pose_name, last if logged else session_start)
+                logged.append(pose_name)
+                first = None
+                done = False
+            last = t
+            if event == BREAK:
+                first = None  # the next row starts a new hold
+            elif event == DONE:
+                done = True
+            elif not event:
+                if first is None:
+                    first = t
+                stats.hold(t, score)
+
+    if not logged:
+        stats.end_session(UNKNOWN_LESSON, completed=False)
+        return
+    completed = pose_completed()
+    stats.end_pose(completed)
+
+    lesson = lesson_name(logged) if completed else UNKNOWN_LESSON
+    if lesson == UNKNOWN_LESSON:
+        lesson = lesson_name(logged, complete=False)
+    if lesson != UNKNOWN_LESSON and completed:
+        lesson_poses = next(l["poses"] for l in LESSONS if l["title"] == lesson)
+        if len(logged) < len(lesson_poses):
+            # The next pose was started but never reached the target
+            stats.begin_pose(lesson_poses[len(logged)])
+            stats.end_pose(False)
+    # Without a lesson there is no telling whether poses were left
+    stats.end_session(lesson, completed=lesson != UNKNOWN_LESSON)
+
+
+def aggregate_logs(paths, hold_time=HOLD_TIME):
+    stats = SessionStats()
+    for path in paths:
+        add_score_log(stats, path, hold_time)
+    return stats
+
+
+def find_score_logs(path):
+    if os.path.isfile(path):
+        return [path]
+    return sorted(
+        os.path.join(path, name)
+        for name in os.listdir(path)
+        if name.startswith("yoga_scores_") and name.endswith(".csv")
+    )
+
+
+def aggregate_path(path, workers=None, hold_time=HOLD_TIME):
+    """
+    SessionStats over every score log in a directory, split across processes.
+    """
+    logs = find_score_logs(path)
+    workers = workers or os.cpu_count() or 1
+    if len(logs) <= 1 or workers == 1:
+        return aggregate_logs(logs, hold_time)
+    chunks = [logs[i::workers] for i in range(workers)]
+    stats = SessionStats()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(aggregate_logs, chunks, [hold_time] * workers):
+            stats.merge(part)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarise yoga_scores_*.csv logs per pose and lesson.")
+    parser.add_argument("path", nargs="?", default=".", help="score log or directory of them")
+    parser.add_argument("--workers", type=int, default=None, help="parallel processes (default: CPU count)")
+    parser.add_argument("--hold-time", type=float, default=HOLD_TIME)
+    parser.add_argument("--out", default="yoga_summary.json")
+    args = parser.parse_args(argv)
+
+    summary = aggregate_path(args.path, args.workers, args.hold_time).summary()
+    with open(args.out, "w") as f:
+        json.dump(summary, f, indent=1)
+    print(f"{summary['sessions']} sessions, summary saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
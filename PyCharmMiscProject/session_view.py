@@ -0,0 +1,192 @@
+# session_view.py
+"""
+Session video inside the Tk window.
+
+run_pose_session keeps running on a worker thread with a SessionView as its
+presenter, so no OpenCV window is opened and nothing polls cv2.waitKey. The
+worker scales each composed frame to the view and converts it to RGB into
+one of three buffers; the Tk loop paints the newest finished buffer on a
+schedule paced to the display refresh rate. Neither side waits for the
+other: a frame finished between two paints replaces the one waiting (and is
+counted as dropped), and a buffer is only written again after Tk has moved
+on to a newer one, so frames are handed over without copying.
+"""
+import logging
+import threading
+import time
+
+import tkinter as tk
+
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+REFRESH_HZ = 60  # Tk cannot query the monitor; most run at 60 Hz
+
+log = logging.getLogger(__name__)
+
+
+# -------------------------
+# Triple buffer
+# -------------------------
+class FrameHandoff:
+    """
+    Triple buffer between one producer and one consumer thread. The
+    producer fills back(), then publish() makes it the pending frame; the
+    consumer's take() swaps the pending frame to the front and returns it.
+    The front buffer is never handed to the producer, so it stays valid
+    until the next take().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._back = self._pending = self._front = None
+        self._fresh = False
+        self.published = 0
+        self.dropped = 0  # published frames replaced before they were taken
+
+    def back(self, shape):
+        if self._back is None or self._back.shape != shape:
+            self._back = np.empty(shape, dtype=np.uint8)
+        return self._back
+
+    def publish(self):
+        with self._lock:
+            if self._fresh:
+                self.dropped += 1
+            self._back, self._pending = self._pending, self._back
+            self._fresh = True
+            self.published += 1
+
+    def take(self):
+        """
+        The newest published frame, or None if there is none since the last take().
+        """
+        with self._lock:
+            if not self._fresh:
+                return None
+            self._front, self._pending = self._pending, self._front
+            self._fresh = False
+            return self._front
+
+
+# -------------------------
+# View
+# -------------------------
+class SessionView(tk.Label):
+    """
+    Tk widget showing a session. Use it as run_pose_session's `present`
+    and start the session with run(), which also schedules the painting.
+    """
+
+    def __init__(self, parent, refresh_hz=REFRESH_HZ, **kwargs):
+        super().__init__(parent, anchor="center", **kwargs)
+        self.period = 1.0 / refresh_hz
+        self.handoff = FrameHandoff()
+        self.painted = 0
+        self._size = None  # widget size, written by the Tk thread only
+        self._scaled = None
+        self._photo = None
+        self._next_tick = None
+        self._after_id = None
+        self._stop = threading.Event()
+        self._worker = None
+        self._on_done = None
+        self._completed = False
+        self.bind("<Configure>", self._on_configure)
+
+    # ---- worker thread ----
+    def __call__(self, display, lm=None, score=0):
+        """
+        Presenter: hand the frame to the Tk loop. Returns True once stop() was called.
+        """
+        h, w = display.shape[:2]
+        size = self._size
+        if size:
+            scale = min(size[0] / w, size[1] / h)
+            w, h = max(1, int(w * scale)), max(1, int(h * scale))
+        rgb = self.handoff.back((h, w, 3))
+        if (w, h) != display.shape[1::-1]:
+            self._scaled = display = cv2.resize(display, (w, h), dst=self._scaled, interpolation=cv2.INTER_LINEAR)
+        cv2.cvtColor(display, cv2.COLOR_BGR2RGB, dst=rgb)
+        self.handoff.publish()
+        return self._stop.is_set()
+
+    def _work(self, target):
+        try:
+            target(self)
+            self._completed = True
+        except Exception:
+            log.exception("Session failed")
+
+    # ---- Tk thread ----
+    def run(self, target, on_done):
+        """
+        Call target(self) on a worker thread and paint its frames until it
+        returns; then on_done(completed) is called on the Tk thread.
+        completed is False if target raised.
+        """
+        self._stop.clear()
+        self._completed = False
+        self.handoff = FrameHandoff()
+        self.painted = 0
+        self._on_done = on_done
+        self.configure(text="", image="")
+        self._photo = None
+        self._worker = threading.Thread(target=self._work, args=(target,), daemon=True)
+        self._worker.start()
+        self._next_tick = time.perf_counter()
+        self._tick()
+
+    def stop(self):
+        """
+        Ask the running session to stop after its current frame. Returns False if none is running.
+        """
+        if self._worker is None:
+            return False
+        self._stop.set()
+        return True
+
+    def show_message(self, text, duration_ms, then):
+        self.configure(image="", text=text)
+        self._photo = None
+        self.after(duration_ms, then)
+
+    def _on_configure(self, event):
+        if event.width > 1 and event.height > 1:
+            self._size = (event.width, event.height)
+
+    def _tick(self):
+        frame = self.handoff.take()
+        if frame is not None:
+            self._paint(frame)
+        if not self._worker.is_alive():
+            self._finish()
+            return
+        # Next refresh boundary; skip ahead instead of bursting after a stall
+        now = time.perf_counter()
+        self._next_tick += self.period
+        if self._next_tick < now:
+            self._next_tick = now + self.period
+        self._after_id = self.after(max(1, round((self._next_tick - now) * 1000)), self._tick)
+
+    def _paint(self, frame):
+        image = Image.frombuffer("RGB", frame.shape[1::-1], frame, "raw", "RGB", 0, 1)
+        if self._photo is None or (self._photo.width(), self._photo.height()) != image.size:
+            self._photo = ImageTk.PhotoImage(image)
+            self.configure(image=self._photo)
+        else:
+            self._photo.paste(image)
+        self.painted += 1
+
+    def _finish(self):
+        self._worker = None
+        self._after_id = None
+        if self._on_done:
+            self._on_done(self._completed)
+
+    def destroy(self):
+        self._stop.set()
+        if self._after_id:
+            self.after_cancel(self._after_id)
+        super().destroy()
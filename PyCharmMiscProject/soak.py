@@ -0,0 +1,296 @@
+# soak.py
+"""
+Soak test: hours of simulated sessions through run_pose_session.
+
+Each session is a lesson from Lessons.py played by a synthetic student
+(synthetic.py) through the real frame loop: scoring, the hold and logging
+state machine, compositing, score logs and perf files. Only the camera,
+detector and clock are simulated. The camera advances a simulated clock by
+one frame per read, so an hour of sessions takes as long as the loop needs
+to process its frames, not an hour. Sessions rotate through clean, noisy,
+drifting, degenerate-burst and walk-away students.
+
+Throughput, resident memory, open file handles, threads and live Python
+objects are sampled as sessions go by. Growth in any of them over a long
+run is what degrades a kiosk left up for days.
+
+    python soak.py --hours 4 --out soak.json
+
+Exits with status 1 if file handles or threads grow, memory grows by more
+than --max-rss-growth, or a score is not finite.
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from Lessons import LESSONS
+from Pose_session import HOLD_TIME, run_pose_session
+from landmark_store import ArrayResult
+from session_stats import SessionStats
+from synthetic import lesson_segments, landmark_stream
+
+FPS = 30
+FRAME_SIZE = (240, 320)  # small frames: the soak is about state, not pixels
+SIM_START = 1.7e9  # simulated wall clock at the first session
+
+
+# -------------------------
+# Simulated camera and detector
+# -------------------------
+class SimClock:
+    def __init__(self, now=SIM_START):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class SyntheticCamera:
+    """
+    cv2.VideoCapture stand-in: every read() takes the stream's next frame
+    and moves the clock on by one frame time. The stream ending ends the video.
+    """
+
+    def __init__(self, stream, clock, fps=FPS, size=FRAME_SIZE):
+        self.stream = iter(stream)
+        self.clock = clock
+        self.fps = fps
+        self.landmarks = None  # what the detector will "find" in the last frame
+        self._frame = np.full(size + (3,), 90, dtype=np.uint8)
+
+    def read(self, buffer=None):
+        try:
+            self.landmarks = next(self.stream)
+        except StopIteration:
+            return False, buffer
+        self.clock.now += 1.0 / self.fps
+        if buffer is None or buffer.shape != self._frame.shape:
+            buffer = self._frame.copy()
+        else:
+            np.copyto(buffer, self._frame)
+        return True, buffer
+
+    def get(self, prop):
+        return {cv2.CAP_PROP_FRAME_HEIGHT: self._frame.shape[0],
+                cv2.CAP_PROP_FRAME_WIDTH: self._frame.shape[1],
+                cv2.CAP_PROP_FPS: self.fps}.get(prop, 0)
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        pass
+
+
+class SyntheticDetector:
+    """
+    Pose detector stand-in returning the camera's landmarks for its frame.
+    """
+
+    def __init__(self, camera):
+        self.camera = camera
+
+    def process(self, rgb):
+        return ArrayResult(self.camera.landmarks)
+
+    def reset(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class SyntheticResources:
+    """
+    session_resources.SessionResources stand-in lending one session's camera and detector.
+    """
+
+    def __init__(self, camera):
+        self.camera = camera
+        self.detector = SyntheticDetector(camera)
+
+    def acquire(self, timeout=None):
+        return self.camera, self.detector
+
+    def release(self):
+        pass
+
+
+# -------------------------
+# Students
+# -------------------------
+def session_segments(index, poses):
+    """
+    The synthetic student for session `index`, rotating through behaviours.
+    """
+    behaviour = index % 5
+    if behaviour == 0:
+        return lesson_segments(poses, "ideal")
+    if behaviour == 1:
+        return lesson_segments(poses, "noisy")
+    if behaviour == 2:
+        return lesson_segments(poses, "drifting")
+    if behaviour == 3:
+        # Tracking glitches in the middle of every pose
+        segments = []
+        for pose_name in poses:
+            segments += [("noisy", pose_name, 5.0), ("degenerate", pose_name, 2.0),
+                         ("missing", pose_name, 1.0), ("noisy", pose_name, HOLD_TIME + 2)]
+        return segments
+    # Walks away halfway through the lesson
+    half = max(1, len(poses) // 2)
+    return lesson_segments(poses[:half], "noisy") + [("missing", None, 5.0)]
+
+
+# -------------------------
+# Process sampling
+# -------------------------
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        return None  # not Linux
+
+
+def open_files():
+    for path in ("/proc/self/fd", "/dev/fd"):
+        if os.path.isdir(path):
+            return len(os.listdir(path))
+    return None
+
+
+def sample(session, sim_seconds, frames, wall_seconds):
+    return {
+        "session": session,
+        "sim_hours": sim_seconds / 3600,
+        "frames": frames,
+        "wall_s": wall_seconds,
+        "rss_mb": rss_mb(),
+        "open_files": open_files(),
+        "threads": threading.active_count(),
+        "objects": len(gc.get_objects()),
+    }
+
+
+def _growth(first, last, key):
+    if first[key] is None or last[key] is None:
+        return None
+    return last[key] - first[key]
+
+
+# -------------------------
+# Soak
+# -------------------------
+def soak(hours=1.0, fps=FPS, seed=0, samples=20, workdir=None, quiet=True):
+    """
+    Run simulated sessions until `hours` of simulated time have passed.
+    Files the sessions write go to workdir (a temporary directory if None).
+    Returns the report as a dict.
+    """
+    own_dir = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix="yoga_soak_")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    clock = SimClock()
+    stats = SessionStats()
+    frames = 0
+    bad_scores = 0
+
+    def present(display, lm=None, score=0):
+        nonlocal frames, bad_scores
+        frames += 1
+        if not math.isfinite(score):
+            bad_scores += 1
+        return False
+
+    target_seconds = hours * 3600
+    started = time.perf_counter()
+    history = []
+    next_sample = 0.0
+    session = 0
+    try:
+        while clock.now - SIM_START < target_seconds:
+            lesson = LESSONS[session % len(LESSONS)]
+            segments = session_segments(session, lesson["poses"])
+            camera = SyntheticCamera(landmark_stream(segments, fps, seed + session), clock, fps)
+            output = io.StringIO() if quiet else sys.stdout
+            with contextlib.redirect_stdout(output):
+                run_pose_session(lesson["poses"], resources=SyntheticResources(camera), present=present,
+                                 session_id=str(session), stats=stats, clock=clock)
+            session += 1
+            sim_seconds = clock.now - SIM_START
+            if sim_seconds >= next_sample:
+                history.append(sample(session, sim_seconds, frames, time.perf_counter() - started))
+                next_sample += target_seconds / samples
+    finally:
+        os.chdir(cwd)
+        if own_dir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    wall = time.perf_counter() - started
+    history.append(sample(session, clock.now - SIM_START, frames, wall))
+    # Growth is measured from a tenth of the way in, once caches and allocator pools have warmed up
+    first, last = history[min(samples // 10, len(history) - 1)], history[-1]
+    return {
+        "sessions": session,
+        "frames": frames,
+        "sim_hours": (clock.now - SIM_START) / 3600,
+        "wall_s": wall,
+        "frames_per_s": frames / wall if wall else None,
+        "speedup": (clock.now - SIM_START) / wall if wall else None,
+        "non_finite_scores": bad_scores,
+        "rss_growth_mb": _growth(first, last, "rss_mb"),
+        "open_files_growth": _growth(first, last, "open_files"),
+        "threads_growth": _growth(first, last, "threads"),
+        "objects_growth": _growth(first, last, "objects"),
+        "samples": history,
+        "stats": stats.summary(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Soak-test the session loop with simulated students.")
+    parser.add_argument("--hours", type=float, default=1.0, help="simulated time to run")
+    parser.add_argument("--fps", type=int, default=FPS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-rss-growth", type=float, default=50.0, help="MB of resident memory growth allowed")
+    parser.add_argument("--workdir", help="keep the session files here instead of a temporary directory")
+    parser.add_argument("--out", default="soak.json")
+    args = parser.parse_args(argv)
+
+    report = soak(args.hours, args.fps, args.seed, workdir=args.workdir)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=1)
+
+    print(f"{report['sessions']} sessions, {report['sim_hours']:.2f} simulated hours in "
+          f"{report['wall_s']:.0f} s ({report['frames_per_s']:.0f} frames/s, {report['speedup']:.0f}x real time)")
+    for key in ("rss_growth_mb", "open_files_growth", "threads_growth", "objects_growth"):
+        print(f"  {key}: {report[key]}")
+    failures = []
+    if report["non_finite_scores"]:
+        failures.append(f"{report['non_finite_scores']} non-finite scores")
+    if report["open_files_growth"]:
+        failures.append("open files grew")
+    if report["threads_growth"]:
+        failures.append("threads grew")
+    if report["rss_growth_mb"] is not None and report["rss_growth_mb"] > args.max_rss_growth:
+        failures.append("memory grew")
+    print("FAIL: " + ", ".join(failures) if failures else "OK", f"- report saved to {args.out}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+# startup_timing.py
+"""
+Startup budget of the app.
+
+main.py calls mark() at its milestones (window built, first paint, vision
+stack imported, detector ready). With --startup-report it writes them to
+yoga_startup.json once the detector is ready and exits. Running this module
+starts it that way under `python -X importtime` and prints the milestones
+next to the slowest imports:
+
+    python startup_timing.py
+    python startup_timing.py --budget 800    # exit 1 if first paint takes longer
+
+Times are milliseconds since main.py started executing; interpreter start-up
+before that shows up in the import table.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+REPORT_PATH = "yoga_startup.json"
+HEAVY_MODULES = ("cv2", "mediapipe", "numpy")  # must not be loaded before first paint
+
+_start = time.perf_counter()
+_milestones = []
+
+
+def mark(name):
+    """
+    Record a milestone and which heavy modules were loaded by then.
+    """
+    _milestones.append({
+        "name": name,
+        "ms": (time.perf_counter() - _start) * 1000,
+        "heavy_loaded": [m for m in HEAVY_MODULES if m in sys.modules],
+    })
+
+
+def write_report(path=REPORT_PATH):
+    with open(path, "w") as f:
+        json.dump({"milestones": _milestones}, f, indent=2)
+
+
+# -------------------------
+# -X importtime parsing
+# -------------------------
+def parse_importtime(stderr):
+    """
+    Rows of `-X importtime` output as dicts with module, depth (0 for
+    top-level imports), self_us and cumulative_us.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+        })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure app startup: milestones and import times.")
+    parser.add_argument("--budget", type=float, help="max milliseconds until first paint")
+    parser.add_argument("--top", type=int, default=15, help="slowest top-level imports to show")
+    args = parser.parse_args(argv)
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    report = os.path.join(here, REPORT_PATH)
+    if os.path.exists(report):
+        os.remove(report)
+
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "main.py", "--startup-report"],
+        cwd=here, capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    if not os.path.exists(report):
+        print(proc.stderr[-2000:])
+        sys.exit("main.py --startup-report did not write a report")
+
+    with open(report) as f:
+        milestones = json.load(f)["milestones"]
+    imports = [row for row in parse_importtime(proc.stderr) if row["depth"] == 0]
+    imports.sort(key=lambda row: row["cumulative_us"], reverse=True)
+
+    print(f"{'milestone':<24} {'ms':>8}  heavy modules loaded")
+    for m in milestones:
+        print(f"{m['name']:<24} {m['ms']:>8.0f}  {', '.join(m['heavy_loaded']) or '-'}")
+    print(f"{'process exit':<24} {wall_ms:>8.0f}")
+    print()
+    print(f"{'import':<32} {'cumulative ms':>14}")
+    for row in imports[:args.top]:
+        print(f"{row['module']:<32} {row['cumulative_us'] / 1000:>14.1f}")
+
+    with open(report, "w") as f:
+        json.dump({"milestones": milestones, "wall_ms": wall_ms, "imports": imports}, f, indent=2)
+
+    first_paint = next((m for m in milestones if m["name"] == "first paint"), None)
+    problems = []
+    if first_paint is None:
+        problems.append("no first paint milestone")
+    else:
+        if first_paint["heavy_loaded"]:
+            problems.append(f"{', '.join(first_paint['heavy_loaded'])} loaded before first paint")
+        if args.budget is not None and first_paint["ms"] > args.budget:
+            problems.append(f"first paint took {first_paint['ms']:.0f} ms, budget {args.budget:.0f} ms")
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+# studio.py
+"""
+One machine, several mats.
+
+run_studio starts one worker process per camera. Each worker owns its
+capture source and MediaPipe detector and runs the normal run_pose_session
+loop, but instead of opening a window it writes every composed frame, its
+landmarks and score into a shared-memory ring buffer. A single compositor
+process tiles the latest frame of every mat into one window. Frames never
+get pickled, so adding mats costs a core each until the machine is full.
+
+    python studio.py --sources 0 1 2 --poses TREE WARRIOR2 MOUNTAIN
+"""
+import argparse
+import logging
+import math
+import multiprocessing
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from landmark_store import NUM_FIELDS, NUM_LANDMARKS, fill_landmarks
+
+TILE_SHAPE = (480, 640, 3)
+WINDOW_NAME = "Yoga Sense Studio"
+
+
+# -------------------------
+# Shared-memory ring buffer
+# -------------------------
+class SharedFrameRing:
+    """
+    Single-writer ring of `slots` frames plus landmarks and score, in one
+    shared memory block. Each slot carries a sequence number that the writer
+    clears while filling it, so readers can detect a slot overwritten
+    mid-copy and skip it.
+    """
+
+    def __init__(self, shm, shape, slots):
+        self.shm = shm
+        self.shape = tuple(shape)
+        self.slots = slots
+        self._seq = 0
+        self._scratch = None  # reader side: a frame copied before it is known to be whole
+
+        offset = 0
+        buf = shm.buf
+
+        def view(dtype, shape):
+            nonlocal offset
+            arr = np.ndarray(shape, dtype=dtype, buffer=buf, offset=offset)
+            offset += arr.nbytes
+            return arr
+
+        self._latest = view(np.int64, (1,))
+        self._slot_seq = view(np.int64, (slots,))
+        self.scores = view(np.float64, (slots,))
+        self.landmarks = view(np.float32, (slots, NUM_LANDMARKS, NUM_FIELDS))
+        self.frames = view(np.uint8, (slots,) + self.shape)
+
+    @staticmethod
+    def size(shape, slots):
+        return 8 + slots * (8 + 8 + NUM_LANDMARKS * NUM_FIELDS * 4 + math.prod(shape))
+
+    @classmethod
+    def create(cls, shape, slots=3):
+        shm = shared_memory.SharedMemory(create=True, size=cls.size(shape, slots))
+        ring = cls(shm, shape, slots)
+        ring._latest[0] = 0
+        ring._slot_seq[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name, shape, slots=3):
+        return cls(shared_memory.SharedMemory(name=name), shape, slots)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, frame, lm=None, score=0.0):
+        seq = self._seq + 1
+        i = seq % self.slots
+        self._slot_seq[i] = -1  # slot being written
+        if frame.shape == self.shape:
+            np.copyto(self.frames[i], frame)
+        else:
+            cv2.resize(frame, (self.shape[1], self.shape[0]), dst=self.frames[i])
+        fill_landmarks(self.landmarks[i], lm)
+        self.scores[i] = score
+        self._slot_seq[i] = seq
+        self._latest[0] = seq
+        self._seq = seq
+
+    def read_latest(self, out, last_seq=0):
+        """
+        Copy the newest frame into `out` if it is newer than last_seq.
+        Returns (seq, score, landmarks) or None when there is nothing new or
+        the slot was overwritten during the copy; `out` is then left as it was.
+        """
+        seq = int(self._latest[0])
+        if seq <= last_seq:
+            return None
+        i = seq % self.slots
+        if self._slot_seq[i] != seq:
+            return None
+        if self._scratch is None:
+            self._scratch = np.empty(self.shape, dtype=np.uint8)
+        np.copyto(self._scratch, self.frames[i])
+        landmarks = self.landmarks[i].copy()
+        score = float(self.scores[i])
+        if self._slot_seq[i] != seq:
+            return None  # torn: the writer came round to this slot mid-copy
+        np.copyto(out, self._scratch)
+        return seq, score, landmarks
+
+    def close(self):
+        # Drop the numpy views before closing the mapping
+        self._latest = self._slot_seq = self.scores = self.landmarks = self.frames = None
+        self._scratch = None
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+# -------------------------
+# Worker: one mat
+# -------------------------
+class RingPresenter:
+    """
+    run_pose_session presenter that publishes frames to a ring instead of a window.
+    """
+
+    def __init__(self, ring, stop_event):
+        self.ring = ring
+        self.stop_event = stop_event
+
+    def __call__(self, display, lm=None, score=0):
+        self.ring.write(display, lm, score)
+        return self.stop_event.is_set()
+
+
+def _mat_worker(index, source, poses, mode, ring_name, shape, slots, stop_event, session_options):
+    # Each process has its own core; keep OpenCV from spawning a thread pool per mat
+    cv2.setNumThreads(1)
+    logging.basicConfig(level=logging.INFO, format=f"mat{index}: %(message)s")
+    from Pose_session import run_pose_session
+
+    ring = SharedFrameRing.attach(ring_name, shape, slots)
+    try:
+        run_pose_session(
+            poses, mode,
+            source=source,
+            present=RingPresenter(ring, stop_event),
+            session_id=f"mat{index}",
+            **session_options
+        )
+    finally:
+        ring.close()
+
+
+# -------------------------
+# Compositor
+# -------------------------
+def _grid(n):
+    cols = math.ceil(math.sqrt(n))
+    return math.ceil(n / cols), cols
+
+
+def run_compositor(ring_names, shape, slots, stop_event, target_score=90.0):
+    """
+    Tile the newest frame of every ring into one window until Esc or stop_event.
+    """
+    rings = [SharedFrameRing.attach(name, shape, slots) for name in ring_names]
+    rows, cols = _grid(len(rings))
+    h, w = shape[:2]
+    canvas = np.zeros((rows * h, cols * w, 3), dtype=np.uint8)
+    tiles = [canvas[r * h:(r + 1) * h, c * w:(c + 1) * w] for r in range(rows) for c in range(cols)]
+    seen = [0] * len(rings)
+
+    cv2.namedWindow(WINDOW_NAME, cv2.WINDOW_NORMAL)
+    cv2.setWindowProperty(WINDOW_NAME, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+    try:
+        while not stop_event.is_set():
+            for k, ring in enumerate(rings):
+                latest = ring.read_latest(tiles[k], seen[k])
+                if latest:
+                    seen[k], score, _ = latest
+                    # Frame the mat green once it is at the target score
+                    color = (0, 255, 0) if score >= target_score else (80, 80, 80)
+                    cv2.rectangle(tiles[k], (0, 0), (w - 1, h - 1), color, 4)
+            cv2.imshow(WINDOW_NAME, canvas)
+            if cv2.waitKey(1) & 0xFF == 27:
+                stop_event.set()
+    finally:
+        cv2.destroyAllWindows()
+        for ring in rings:
+            ring.close()
+
+
+# -------------------------
+# Supervisor
+# -------------------------
+def run_studio(sources, poses, mode="coach", tile_shape=TILE_SHAPE, slots=3, **session_options):
+    """
+    Run one session per capture source in parallel worker processes and show
+    them together. Extra keyword arguments go to run_pose_session.
+    Returns when every mat has finished its lesson or Esc is pressed.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    stop_event = ctx.Event()
+    rings = [SharedFrameRing.create(tile_shape, slots) for _ in sources]
+
+    workers = [
+        ctx.Process(
+            target=_mat_worker,
+            args=(i, source, poses, mode, ring.name, tile_shape, slots, stop_event, session_options),
+            daemon=True
+        )
+        for i, (source, ring) in enumerate(zip(sources, rings))
+    ]
+    compositor = ctx.Process(
+        target=run_compositor,
+        args=([ring.name for ring in rings], tile_shape, slots, stop_event),
+        daemon=True
+    )
+
+    try:
+        compositor.start()
+        for worker in workers:
+            worker.start()
+        while compositor.is_alive() and any(worker.is_alive() for worker in workers):
+            compositor.join(timeout=0.5)
+    finally:
+        stop_event.set()
+        for process in workers + [compositor]:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for ring in rings:
+            ring.close()
+            ring.unlink()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run several mats from one machine.")
+    parser.add_argument("--sources", nargs="+", required=True,
+                        help="camera indices or video paths, one per mat")
+    parser.add_argument("--poses", nargs="+", required=True)
+    parser.add_argument("--mode", default="coach", choices=("coach", "video"))
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    sources = [int(s) if s.isdigit() else s for s in args.sources]
+    run_studio(sources, args.poses, args.mode)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# synthetic.py
+"""
+Deterministic synthetic landmark streams.
+
+Frames are (33, 4) float32 arrays of x, y, z, visibility, as
+landmark_store.landmark_array returns them, built from hand-placed
+skeletons: a relaxed standing figure and an ideal form of every pose in
+pose.POSE_SPECS (each scores at least 98%). A stream is a list of segments
+(kind, pose name, seconds); the figure moves from the previous segment's
+pose into the new one over TRANSITION seconds, and the kind decides what
+happens on top of that:
+
+    ideal       the skeleton as is
+    noisy       independent jitter on every landmark
+    drifting    the whole figure wanders and changes size, plus jitter
+    degenerate  cycles through DEGENERATE: zero shoulder width, a torso of
+                zero length, every landmark on one point, the figure off frame
+    missing     no detection (None)
+
+The same segments and seed always give the same frames.
+"""
+import numpy as np
+
+TRANSITION = 1.5  # seconds to move into a segment's pose
+NOISE = 0.01
+KINDS = ("ideal", "noisy", "drifting", "degenerate", "missing")
+DEGENERATE = ("zero_shoulder_width", "collapsed_torso", "single_point", "off_frame")
+
+# A relaxed standing figure in normalized image coordinates (x, y)
+STANDING_SKELETON = np.array([
+    (0.50, 0.15),                                            # 0 nose
+    (0.51, 0.14), (0.52, 0.14), (0.53, 0.14),                # 1-3 left eye
+    (0.49, 0.14), (0.48, 0.14), (0.47, 0.14),                # 4-6 right eye
+    (0.55, 0.15), (0.45, 0.15),                              # 7-8 ears
+    (0.52, 0.17), (0.48, 0.17),                              # 9-10 mouth
+    (0.58, 0.30), (0.42, 0.30),                              # 11-12 shoulders
+    (0.66, 0.20), (0.34, 0.20),                              # 13-14 elbows
+    (0.72, 0.10), (0.28, 0.10),                              # 15-16 wrists
+    (0.73, 0.08), (0.27, 0.08),                              # 17-18 pinkies
+    (0.72, 0.07), (0.28, 0.07),                              # 19-20 index fingers
+    (0.71, 0.08), (0.29, 0.08),                              # 21-22 thumbs
+    (0.55, 0.55), (0.45, 0.55),                              # 23-24 hips
+    (0.55, 0.72), (0.45, 0.72),                              # 25-26 knees
+    (0.55, 0.90), (0.45, 0.90),                              # 27-28 ankles
+    (0.55, 0.92), (0.45, 0.92),                              # 29-30 heels
+    (0.57, 0.93), (0.43, 0.93),                              # 31-32 foot index
+])
+
+
+def _pose(changes):
+    p = STANDING_SKELETON.copy()
+    for index, xy in changes.items():
+        p[index] = xy
+    return p
+
+
+# Landmarks moved from the standing figure for each pose
+IDEAL_POSES = {
+    # arms straight overhead, wrists 1.8 shoulder widths apart
+    "MOUNTAIN": _pose({13: (0.612, 0.16), 14: (0.388, 0.16), 15: (0.644, 0.02), 16: (0.356, 0.02)}),
+    # right foot at the left knee, palms together at the chest
+    "TREE": _pose({13: (0.60, 0.40), 14: (0.40, 0.40), 15: (0.50, 0.30), 16: (0.50, 0.30),
+                   26: (0.34, 0.66), 28: (0.45, 0.68)}),
+    # left knee bent over the ankle, right leg straight back, arms level
+    "WARRIOR2": _pose({13: (0.74, 0.30), 14: (0.26, 0.30), 15: (0.90, 0.30), 16: (0.10, 0.30),
+                       25: (0.72, 0.62), 26: (0.35, 0.72), 27: (0.72, 0.90), 28: (0.25, 0.89)}),
+}
+
+
+def skeleton(pose_name=None):
+    """
+    (33, 4) float32 frame of the ideal pose, or standing for None.
+    """
+    frame = np.zeros((33, 4), dtype=np.float32)
+    frame[:, :2] = STANDING_SKELETON if pose_name is None else IDEAL_POSES[pose_name]
+    frame[:, 3] = 1.0
+    return frame
+
+
+def degenerate(case, pose_name=None):
+    """
+    A frame of the named DEGENERATE case.
+    """
+    frame = skeleton(pose_name)
+    if case == "zero_shoulder_width":
+        frame[11:13, :2] = frame[11:13, :2].mean(axis=0)
+    elif case == "collapsed_torso":
+        frame[23:25, :2] = frame[11:13, :2]
+    elif case == "single_point":
+        frame[:, :2] = 0.5
+    elif case == "off_frame":
+        frame[:, :2] += 1.5
+    else:
+        raise ValueError(f"unknown degenerate case: {case}")
+    return frame
+
+
+def synthetic_landmarks(n, noise=0.02, seed=0):
+    """
+    (n, 33, 4) array of jittered standing skeletons.
+    """
+    rng = np.random.default_rng(seed)
+    frames = np.zeros((n, 33, 4))
+    frames[..., :2] = STANDING_SKELETON + rng.normal(0, noise, (n, 33, 2))
+    frames[..., 3] = 1.0
+    return frames
+
+
+def landmark_stream(segments, fps=30, seed=0):
+    """
+    Yield one frame (or None for "missing") per 1/fps seconds of the
+    (kind, pose name, seconds) segments.
+    """
+    rng = np.random.default_rng(seed)
+    previous = skeleton()
+    offset = np.zeros(2)
+    scale = 1.0
+    for kind, pose_name, seconds in segments:
+        if kind not in KINDS:
+            raise ValueError(f"unknown stream kind: {kind}")
+        target = skeleton(pose_name)
+        frames = int(round(seconds * fps))
+        blend_frames = max(1, int(TRANSITION * fps))
+        for i in range(frames):
+            if kind == "missing":
+                yield None
+                continue
+            if kind == "degenerate":
+                case = DEGENERATE[(i * 2 // fps) % len(DEGENERATE)]  # each case for half a second
+                yield degenerate(case, pose_name)
+                continue
+            w = min(1.0, (i + 1) / blend_frames)
+            frame = previous + w * (target - previous)  # a new array, safe to change
+            if kind == "drifting":
+                offset = np.clip(offset + rng.normal(0, 0.002, 2), -0.15, 0.15)
+                scale = float(np.clip(scale + rng.normal(0, 0.002), 0.7, 1.2))
+                frame[:, :2] = (frame[:, :2] - 0.5) * scale + 0.5 + offset
+            if kind in ("noisy", "drifting"):
+                frame[:, :2] += rng.normal(0, NOISE, (33, 2))
+            yield frame.astype(np.float32, copy=False)
+        previous = target
+
+
+def lesson_segments(poses, kind="noisy", hold=12.0, approach=3.0):
+    """
+    Segments for going through a lesson: per pose, `approach` seconds to get
+    into it and `hold` seconds holding it.
+    """
+    return [(kind, pose_name, approach + hold) for pose_name in poses]
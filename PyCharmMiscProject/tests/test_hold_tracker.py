@@ -0,0 +1,94 @@
+# test_hold_tracker.py
+import pytest
+
+from hold_tracker import BREAK, DONE, LOG, NO_EVENTS, START, HoldTracker
+
+
+def tracker(**kwargs):
+    kwargs.setdefault("hold_time", 10.0)
+    kwargs.setdefault("enter_score", 90.0)
+    kwargs.setdefault("exit_score", 80.0)
+    kwargs.setdefault("exit_grace", 1.0)
+    kwargs.setdefault("log_interval", 0.5)
+    return HoldTracker(clock=lambda: pytest.fail("explicit times only"), **kwargs)
+
+
+def test_start_log_done():
+    hold = tracker()
+    assert hold.update(89.0, 0.0) == NO_EVENTS
+    assert hold.update(95.0, 1.0) == (START, LOG)
+    assert hold.active
+    assert hold.update(95.0, 1.2) == NO_EVENTS
+    assert hold.update(95.0, 1.5) == (LOG,)
+    assert hold.elapsed(4.0) == 3.0
+    assert hold.update(95.0, 11.0) == (LOG, DONE)
+    assert hold.completed and not hold.active
+
+
+def test_done_without_log_when_one_is_not_due():
+    hold = tracker(log_interval=2.0)
+    hold.update(95.0, 0.0)
+    assert hold.update(95.0, 9.0) == (LOG,)
+    assert hold.update(95.0, 10.0) == (DONE,)
+
+
+def test_no_events_after_done_until_reset():
+    hold = tracker(hold_time=1.0)
+    hold.update(95.0, 0.0)
+    assert DONE in hold.update(95.0, 1.0)
+    assert hold.update(95.0, 2.0) == NO_EVENTS
+    hold.reset()
+    assert hold.update(95.0, 3.0) == (START, LOG)
+
+
+def test_break_after_exit_grace():
+    hold = tracker()
+    hold.update(95.0, 0.0)
+    assert hold.update(70.0, 1.0) == NO_EVENTS
+    assert hold.update(70.0, 1.9) == NO_EVENTS
+    assert hold.update(70.0, 2.0) == (BREAK,)
+    assert not hold.active and not hold.completed
+    # Below enter_score nothing restarts; at it a new hold starts
+    assert hold.update(85.0, 2.5) == NO_EVENTS
+    assert hold.update(95.0, 3.0) == (START, LOG)
+    assert hold.count == 1
+
+
+def test_dip_within_grace_is_not_logged():
+    hold = tracker()
+    hold.update(95.0, 0.0)
+    # A LOG would be due at 0.5 and 1.0, but the score is below exit_score
+    assert hold.update(70.0, 0.5) == NO_EVENTS
+    assert hold.update(70.0, 1.0) == NO_EVENTS
+    assert hold.update(85.0, 1.2) == (LOG,)
+    assert hold.active
+    # The dip still counts towards the summary, and the grace restarts
+    assert hold.count == 4
+    assert hold.update(70.0, 1.5) == NO_EVENTS
+    assert hold.update(70.0, 2.4) == NO_EVENTS
+
+
+def test_enter_grace():
+    hold = tracker(enter_grace=0.5)
+    assert hold.update(95.0, 0.0) == NO_EVENTS
+    assert hold.update(95.0, 0.4) == NO_EVENTS
+    assert hold.update(85.0, 0.45) == NO_EVENTS  # dropped out, grace starts over
+    assert hold.update(95.0, 0.5) == NO_EVENTS
+    assert hold.update(95.0, 1.0) == (START, LOG)
+    assert hold.hold_start == 1.0
+
+
+def test_summary():
+    hold = tracker()
+    for t, score in ((0.0, 90.0), (1.0, 100.0), (2.0, 85.0), (3.0, 95.0)):
+        hold.update(score, t)
+    summary = hold.summary()
+    assert summary["count"] == 4
+    assert summary["mean"] == pytest.approx(92.5)
+    assert summary["std"] == pytest.approx(5.5901699437)
+    assert summary["min"] == 85.0
+    assert summary["time_above"] == pytest.approx(2.0)  # 0-1 and 1-2; 2-3 was below 90
+
+
+def test_exit_score_never_above_enter_score():
+    assert tracker(enter_score=80.0, exit_score=90.0).exit_score == 80.0
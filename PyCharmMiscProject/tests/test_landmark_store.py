@@ -0,0 +1,90 @@
+# test_landmark_store.py
+from types import SimpleNamespace
+
+import numpy as np
+
+from landmark_store import (
+    ArrayResult, HEADER, LandmarkRecorder, RECORD_DTYPE, detected_landmarks, fill_landmarks, landmark_array,
+    landmarks_from_array, open_landmarks, replay_landmarks, result_landmarks,
+)
+from synthetic import synthetic_landmarks
+
+
+def frames(n):
+    values = synthetic_landmarks(n).astype(np.float32)
+    values[:, :, 2] = -0.25
+    values[:, :, 3] = 0.75
+    return values
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "track.lmk"
+    values = frames(3)
+    with LandmarkRecorder(path, base_time=1700000000.5) as recorder:
+        recorder.write(0.0, landmarks_from_array(values[0]))  # MediaPipe-style list
+        recorder.write(0.1, None)
+        recorder.write(0.2, values[1])
+        recorder.write(0.3, values[2, :, :3])  # no visibility
+    assert recorder.frames == 4
+
+    track = open_landmarks(path)
+    assert track.base_time == 1700000000.5
+    assert track.timestamps.tolist() == [0.0, 0.1, 0.2, 0.3]
+    assert track.detected.tolist() == [True, False, True, True]
+    np.testing.assert_array_equal(track.landmarks[0], values[0])
+    assert np.isnan(track.landmarks[1]).all()
+    np.testing.assert_array_equal(track.landmarks[2], values[1])
+    np.testing.assert_array_equal(track.landmarks[3, :, :3], values[2, :, :3])
+    assert np.isnan(track.landmarks[3, :, 3]).all()
+
+    replayed = list(replay_landmarks(path))
+    assert [t for t, _ in replayed] == [0.0, 0.1, 0.2, 0.3]
+    assert replayed[1][1] is None
+    np.testing.assert_array_equal(replayed[2][1], values[1])
+
+
+def test_truncated_recording_keeps_complete_frames(tmp_path):
+    path = tmp_path / "track.lmk"
+    with LandmarkRecorder(path) as recorder:
+        for i, values in enumerate(frames(3)):
+            recorder.write(i, values)
+    with open(path, "r+b") as f:
+        f.truncate(HEADER.size + 2 * RECORD_DTYPE.itemsize + 10)
+    assert len(open_landmarks(path).timestamps) == 2
+
+
+def test_empty_recording(tmp_path):
+    path = tmp_path / "track.lmk"
+    LandmarkRecorder(path).close()
+    assert list(replay_landmarks(path)) == []
+
+
+def test_fill_landmarks():
+    out = np.zeros((33, 4), dtype=np.float32)
+    values = frames(1)[0]
+    fill_landmarks(out, landmarks_from_array(values))
+    np.testing.assert_array_equal(out, values)
+    fill_landmarks(out, None)
+    assert np.isnan(out).all()
+
+
+def test_array_result():
+    values = frames(1)[0]
+    result = ArrayResult(values)
+    assert result_landmarks(result) is values
+    lm = result.pose_landmarks.landmark
+    assert len(lm) == 33
+    np.testing.assert_array_equal(landmark_array(lm), values)
+
+    empty = ArrayResult(None)
+    assert empty.pose_landmarks is None
+    assert result_landmarks(empty) is None
+
+
+def test_detected_landmarks_does_not_copy():
+    values = frames(1)[0]
+    result = ArrayResult(values)
+    assert detected_landmarks(result) is values
+    lm = landmarks_from_array(values)
+    assert detected_landmarks(SimpleNamespace(pose_landmarks=SimpleNamespace(landmark=lm))) is lm
+    assert detected_landmarks(SimpleNamespace(pose_landmarks=None)) is None
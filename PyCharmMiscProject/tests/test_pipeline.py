@@ -0,0 +1,32 @@
+# test_pipeline.py
+import queue
+
+import pytest
+
+from pipeline import LatestQueue
+
+
+def test_latest_queue_drops_oldest():
+    dropped = []
+    q = LatestQueue(maxsize=2, on_drop=dropped.append)
+    for item in (1, 2, 3, 4):
+        q.put(item)
+    assert q.dropped == 2
+    assert dropped == [1, 2]
+    assert q.get(timeout=0) == 3
+    assert q.get(timeout=0) == 4
+
+
+def test_latest_queue_does_not_recycle_none():
+    dropped = []
+    q = LatestQueue(on_drop=dropped.append)
+    q.put(None)
+    q.put("frame")
+    assert q.dropped == 1
+    assert dropped == []
+    assert q.get(timeout=0) == "frame"
+
+
+def test_latest_queue_get_times_out():
+    with pytest.raises(queue.Empty):
+        LatestQueue().get(timeout=0.01)
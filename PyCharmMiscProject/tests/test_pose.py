@@ -0,0 +1,156 @@
+# test_pose.py
+"""
+The compiled rule scorers against the hand-written scorers they replaced.
+"""
+import math
+
+import numpy as np
+import pytest
+
+from landmark_store import landmarks_from_array
+from pose import POSE_SPECS, POSES, CompiledPoseSet, joint_angle_2d
+from synthetic import IDEAL_POSES, skeleton, synthetic_landmarks
+
+
+# -------------------------
+# Baseline scorers, as written before pose.py compiled POSE_SPECS
+# -------------------------
+def _angle(a, b, c):
+    ba = (a.x - b.x, a.y - b.y)
+    bc = (c.x - b.x, c.y - b.y)
+    mag_ba = math.hypot(*ba)
+    mag_bc = math.hypot(*bc)
+    if mag_ba == 0 or mag_bc == 0:
+        return 180
+    cosang = max(-1, min(1, (ba[0] * bc[0] + ba[1] * bc[1]) / (mag_ba * mag_bc)))
+    return math.degrees(math.acos(cosang))
+
+
+def _score_angle(actual, target, tolerance):
+    return max(0, 1 - abs(actual - target) / tolerance)
+
+
+def _torso(lm):
+    ls, rs, lh, rh = lm[11], lm[12], lm[23], lm[24]
+    return math.dist(((ls.x + rs.x) / 2, (ls.y + rs.y) / 2), ((lh.x + rh.x) / 2, (lh.y + rh.y) / 2))
+
+
+def baseline_mountain(lm):
+    ls, rs, le, re, lw, rw = lm[11], lm[12], lm[13], lm[14], lm[15], lm[16]
+    lh, lk, la, rh, rk, ra = lm[23], lm[25], lm[27], lm[24], lm[26], lm[28]
+    left_height = max(0, min(1, (ls.y - lw.y) / 0.25))
+    right_height = max(0, min(1, (rs.y - rw.y) / 0.25))
+    width_ratio = abs(lw.x - rw.x) / abs(ls.x - rs.x)
+    return {
+        "left_arm": 0.7 * left_height + 0.3 * _score_angle(_angle(ls, le, lw), 180, 60),
+        "right_arm": 0.7 * right_height + 0.3 * _score_angle(_angle(rs, re, rw), 180, 60),
+        "arm_width": max(0, 1 - abs(width_ratio - 1.8) / 0.8),
+        "left_leg": _score_angle(_angle(lh, lk, la), 180, 35),
+        "right_leg": _score_angle(_angle(rh, rk, ra), 180, 35),
+    }
+
+
+def baseline_tree(lm):
+    ls, rs, lw, rw = lm[11], lm[12], lm[15], lm[16]
+    lh, lk, la, rh, rk, ra = lm[23], lm[25], lm[27], lm[24], lm[26], lm[28]
+    torso = _torso(lm)
+    left_leg, right_leg = _angle(lh, lk, la), _angle(rh, rk, ra)
+    standing_leg = left_leg if abs(left_leg - 180) < abs(right_leg - 180) else right_leg
+    lifted = min(abs(la.y - lk.y) / torso, abs(ra.y - rk.y) / torso)
+    if lifted < 0.15:
+        lifted_score = 1.0
+    elif lifted > 0.35:
+        lifted_score = 0.0
+    else:
+        lifted_score = 1 - (lifted - 0.15) / 0.2
+    wrist_dist = math.dist((lw.x, lw.y), (rw.x, rw.y)) / torso
+    return {
+        "standing_leg": _score_angle(standing_leg, 180, 30),
+        "lifted_foot": lifted_score,
+        "hands": max(0, 1 - wrist_dist * 2),
+        "hand_height": max(0, 1 - abs((lw.y + rw.y) / 2 - (ls.y + rs.y) / 2) / 0.35),
+    }
+
+
+def baseline_warrior2(lm):
+    ls, rs, le, re, lw, rw = lm[11], lm[12], lm[13], lm[14], lm[15], lm[16]
+    lh, lk, la, rh, rk, ra = lm[23], lm[25], lm[27], lm[24], lm[26], lm[28]
+    left_knee, right_knee = _angle(lh, lk, la), _angle(rh, rk, ra)
+    if abs(left_knee - 95) < abs(right_knee - 95):
+        front_knee, back_knee = left_knee, right_knee
+    else:
+        front_knee, back_knee = right_knee, left_knee
+
+    def elbow_score(s, e, w):
+        angle_part = max(0, min(1, (_angle(s, e, w) - 135) / 45))
+        return (angle_part + max(0, 1 - abs(s.y - w.y) / 0.3)) / 2
+
+    return {
+        "front_knee": _score_angle(front_knee, 105, 90),
+        "back_knee": _score_angle(back_knee, 180, 70),
+        "left_arm": max(0, 1 - abs(ls.y - lw.y) / 0.3),
+        "right_arm": max(0, 1 - abs(rs.y - rw.y) / 0.3),
+        "left_elbow": elbow_score(ls, le, lw),
+        "right_elbow": elbow_score(rs, re, rw),
+    }
+
+
+BASELINES = {"MOUNTAIN": baseline_mountain, "TREE": baseline_tree, "WARRIOR2": baseline_warrior2}
+# acos loses precision near straight joints, where atan2 does not, so the
+# baseline is only good to about 1e-8 there
+TOLERANCE = 1e-6
+
+
+@pytest.fixture(scope="module")
+def frames():
+    frames = synthetic_landmarks(300, noise=0.05)
+    ideal = np.stack([skeleton(name) for name in IDEAL_POSES])
+    return np.concatenate([frames, ideal]).astype(np.float32)
+
+
+@pytest.mark.parametrize("name", sorted(BASELINES))
+def test_rules_match_baseline(name, frames):
+    for values in frames:
+        expected = BASELINES[name](landmarks_from_array(values))
+        accuracy, _, scores = POSES[name].score(values)
+        assert scores.keys() == expected.keys()
+        for key, value in expected.items():
+            assert scores[key] == pytest.approx(value, abs=TOLERANCE), key
+        assert accuracy == pytest.approx(sum(expected.values()) / len(expected) * 100, abs=TOLERANCE * 100)
+
+
+@pytest.mark.parametrize("name", sorted(BASELINES))
+def test_objects_and_arrays_score_alike(name, frames):
+    pose = POSES[name]
+    for values in frames[:50]:
+        assert pose.score(landmarks_from_array(values)) == pose.score(values)
+
+
+@pytest.mark.parametrize("name", sorted(BASELINES))
+def test_batch_matches_single_frames(name, frames):
+    pose = POSES[name]
+    accuracy, components = pose.score_batch(frames)
+    for i in range(0, len(frames), 7):
+        single, _, scores = pose.score(frames[i])
+        assert accuracy[i] == pytest.approx(single, abs=TOLERANCE)
+        for key, value in scores.items():
+            assert components[key][i] == pytest.approx(value, abs=TOLERANCE)
+        # A frame scores the same bits whatever the batch size
+        assert pose.score_batch(frames[i:i + 1])[0][0] == accuracy[i]
+
+
+def test_joint_angle_2d():
+    a, b, c = landmarks_from_array(np.array([[0.0, 0.0], [1.0, 0.0], [1.0, 1.0]]))
+    assert joint_angle_2d(a, b, c) == pytest.approx(90.0)
+    assert joint_angle_2d(b, b, c) == 180.0  # zero-length limb
+
+
+def test_pose_set_matches_single_poses(frames):
+    pose_set = CompiledPoseSet(POSE_SPECS)
+    accuracies, scores = pose_set.evaluate(frames)
+    for j, pose in enumerate(pose_set.poses):
+        accuracy, rule_scores = pose.evaluate(frames)
+        np.testing.assert_array_equal(accuracies[:, j], accuracy)
+        np.testing.assert_array_equal(scores[:, pose_set._rules[j]], rule_scores)
+        # A frame's accuracy does not depend on the batch it is in
+        assert pose_set.evaluate(frames[:1])[0][0, j] == accuracies[0, j]
@@ -0,0 +1,30 @@
+# test_reference_index.py
+import cv2
+import numpy as np
+
+from reference_cache import CLIP_ROTATION
+from reference_index import ReferenceIndex, load_scorers
+from synthetic import landmark_stream
+
+
+def test_rotation_is_stored_per_pose(tmp_path):
+    landmarks = np.array(list(landmark_stream([("noisy", "TREE", 2.0)])))
+    index = ReferenceIndex()
+    index.add("DEMO", landmarks, video="demo.mp4")
+    index.add("SIDEWAYS", landmarks, video="sideways.mov", rotation=cv2.ROTATE_90_CLOCKWISE)
+    path = tmp_path / "index.npz"
+    index.save(path)
+    scorers = load_scorers(path)
+    assert scorers["DEMO"].rotation is None
+    assert scorers["SIDEWAYS"].rotation == cv2.ROTATE_90_CLOCKWISE
+    assert scorers["SIDEWAYS"].video == "sideways.mov"
+
+
+def test_version_1_index_uses_clip_rotation(tmp_path):
+    index = ReferenceIndex()
+    index.add("TREE", np.array(list(landmark_stream([("noisy", "TREE", 2.0)]))), video="tree.MOV")
+    features, frames, video, _ = index.poses["TREE"]
+    path = tmp_path / "index.npz"
+    np.savez_compressed(path, version=np.array(1), names=np.array(["TREE"]),
+                        features_0=features.astype(np.float16), frames_0=frames, video_0=np.array(video))
+    assert load_scorers(path)["TREE"].rotation == CLIP_ROTATION
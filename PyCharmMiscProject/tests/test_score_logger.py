@@ -0,0 +1,76 @@
+# test_score_logger.py
+import struct
+import time
+
+import pytest
+
+from score_logger import BinarySink, ScoreLogger, read_binary_log
+
+EVENTS = [
+    (1700000000.25, "MOUNTAIN", 91.5, {"left_arm": 0.75, "right_arm": 1.0}, ""),
+    (1700000000.75, "TREE", 88.0, {}, "break"),
+]
+
+
+def test_binary_round_trip(tmp_path):
+    sink = BinarySink(str(tmp_path / "scores.yslog"))
+    sink.write(EVENTS)
+    sink.close()
+    assert list(read_binary_log(sink.path)) == EVENTS
+
+
+def test_binary_truncated_last_record(tmp_path):
+    path = tmp_path / "scores.yslog"
+    sink = BinarySink(str(path))
+    sink.write(EVENTS)
+    sink.close()
+    with open(path, "r+b") as f:
+        f.truncate(path.stat().st_size - 3)
+    assert list(read_binary_log(str(path))) == EVENTS[:1]
+
+
+def test_binary_version_1(tmp_path):
+    path = tmp_path / "scores.yslog"
+    with open(path, "wb") as f:
+        f.write(BinarySink._HEADER.pack(BinarySink.MAGIC, 1))
+        f.write(BinarySink._RECORD_V1.pack(1.5, 90.0, 4, 1) + b"TREE")
+        f.write(bytes((5,)) + b"hands" + struct.pack("<f", 0.5))
+    assert list(read_binary_log(str(path))) == [(1.5, "TREE", 90.0, {"hands": 0.5}, "")]
+
+
+class FailingSink:
+    def __init__(self):
+        self.closed = False
+
+    def write(self, events):
+        raise OSError("disk full")
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_close_after_writer_died():
+    sink = FailingSink()
+    logger = ScoreLogger(sink, queue_size=4, batch_size=1, close_timeout=1.0)
+    logger.log(0.0, "TREE", 90.0)
+    logger._thread.join(1.0)
+    assert not logger._thread.is_alive()
+    assert sink.closed
+    for _ in range(8):
+        logger.log(0.0, "TREE", 90.0)  # fills the queue nobody drains
+    assert logger.dropped > 0
+    start = time.monotonic()
+    logger.close()
+    assert time.monotonic() - start < 0.5
+
+
+def test_close_writes_queued_events(tmp_path):
+    sink = BinarySink(str(tmp_path / "scores.yslog"))
+    with ScoreLogger(sink, flush_interval=60.0) as logger:
+        for event in EVENTS:
+            logger.log(*event)
+    assert list(read_binary_log(sink.path)) == EVENTS
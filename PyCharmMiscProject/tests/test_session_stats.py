@@ -0,0 +1,81 @@
+# test_session_stats.py
+import csv
+
+import pytest
+
+from hold_tracker import BREAK, DONE
+from score_logger import CsvSink, format_log_time
+from session_stats import SessionStats, add_score_log
+
+START = 1700000000
+
+
+def write_log(directory, rows):
+    """
+    rows are (seconds after START, pose, score, event); the file name
+    encodes START as the session start.
+    """
+    sink = CsvSink(str(directory / f"yoga_scores_{START}.csv"))
+    sink.write([(START + t, pose, score, {}, event) for t, pose, score, event in rows])
+    sink.close()
+    return sink.path
+
+
+def hold(pose, start, seconds=10, score=95.0):
+    rows = [(start + i * 0.5, pose, score, "") for i in range(int(seconds * 2) + 1)]
+    return rows + [(start + seconds, pose, score, DONE)]
+
+
+def replay(path):
+    stats = SessionStats()
+    add_score_log(stats, path)
+    return stats.summary()
+
+
+def test_completed_lesson(tmp_path):
+    path = write_log(tmp_path, hold("MOUNTAIN", 5) + hold("TREE", 20))
+    summary = replay(path)
+    assert summary["poses"]["MOUNTAIN"]["completed"] == 1
+    assert summary["poses"]["TREE"]["completed"] == 1
+    lesson = summary["lessons"]["Beginner Flow"]
+    assert (lesson["attempts"], lesson["completed"]) == (1, 1)
+    # Time to target: from the session start, then from the previous hold's end
+    assert summary["poses"]["MOUNTAIN"]["time_to_target_s"]["mean"] == pytest.approx(5, abs=1)
+    assert summary["poses"]["TREE"]["time_to_target_s"]["mean"] == pytest.approx(5, abs=1)
+
+
+def test_break_and_quick_restart(tmp_path):
+    # The hold breaks and restarts within a second, then runs to done
+    rows = [(t * 0.5, "MOUNTAIN", 95.0, "") for t in range(8)]
+    rows.append((4.0, "MOUNTAIN", 95.0, BREAK))
+    rows += hold("MOUNTAIN", 4.5)
+    summary = replay(write_log(tmp_path, rows))
+    mountain = summary["poses"]["MOUNTAIN"]
+    assert (mountain["attempts"], mountain["completed"]) == (1, 1)
+    # Summary rows are not scores
+    assert mountain["hold_score"]["count"] == len(rows) - 2
+
+
+def test_break_without_done(tmp_path):
+    # Rows span the hold time, but the hold broke and never finished
+    rows = [(t * 0.5, "MOUNTAIN", 95.0, "") for t in range(8)]
+    rows.append((4.0, "MOUNTAIN", 95.0, BREAK))
+    rows += [(5 + t * 0.5, "MOUNTAIN", 95.0, "") for t in range(16)]
+    summary = replay(write_log(tmp_path, rows))
+    assert summary["poses"]["MOUNTAIN"]["completed"] == 0
+    assert summary["lessons"]["Beginner Flow"]["completed"] == 0
+
+
+def test_legacy_log_uses_span(tmp_path):
+    path = tmp_path / f"yoga_scores_{START}.csv"
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Pose", "Score", "Timestamp"])
+        for t in range(11):
+            writer.writerow(["MOUNTAIN", 95.0, format_log_time(START + t)])
+        for t in range(3):
+            writer.writerow(["TREE", 95.0, format_log_time(START + 20 + t)])
+    summary = replay(str(path))
+    assert summary["poses"]["MOUNTAIN"]["completed"] == 1
+    assert summary["poses"]["TREE"]["completed"] == 0
+    assert summary["lessons"]["Beginner Flow"]["completed"] == 0
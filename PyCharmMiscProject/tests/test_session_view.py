@@ -0,0 +1,37 @@
+# test_session_view.py
+from session_view import FrameHandoff
+
+
+def test_handoff_take_returns_latest_once():
+    handoff = FrameHandoff()
+    assert handoff.take() is None
+    handoff.back((2, 2, 3))[:] = 1
+    handoff.publish()
+    frame = handoff.take()
+    assert (frame == 1).all()
+    assert handoff.take() is None
+    assert (handoff.published, handoff.dropped) == (1, 0)
+
+
+def test_handoff_counts_frames_replaced_before_take():
+    handoff = FrameHandoff()
+    for value in (1, 2, 3):
+        handoff.back((2, 2, 3))[:] = value
+        handoff.publish()
+    assert (handoff.take() == 3).all()
+    assert (handoff.published, handoff.dropped) == (3, 2)
+
+
+def test_handoff_front_stays_valid():
+    handoff = FrameHandoff()
+    handoff.back((2, 2, 3))[:] = 1
+    handoff.publish()
+    front = handoff.take()
+    # The producer keeps writing while the consumer shows the front buffer
+    for value in (2, 3, 4):
+        back = handoff.back((2, 2, 3))
+        assert back is not front
+        back[:] = value
+        handoff.publish()
+    assert (front == 1).all()
+    assert (handoff.take() == 4).all()
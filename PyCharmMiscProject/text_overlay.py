@@ -0,0 +1,105 @@
+# text_overlay.py
+"""
+Cached text sprites for the session overlay.
+
+cv2.putText rasterizes glyph outlines every call, which at the large font
+scales of the session overlay is a noticeable part of a 1080p frame. The
+strings drawn (pose and score, hold timer, feedback lines) only change a
+few times per second, so TextCache renders each distinct string once into a
+small premultiplied sprite and afterwards only blends that sprite into
+its region of the frame. Sprites are keyed by everything that affects their
+pixels and evicted least recently used first.
+"""
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+class TextSprite:
+    """
+    A rendered string, stored premultiplied: `color` is the text color times
+    coverage and `inverse` the share of the background that shows through,
+    so blending is one multiply and one add. dx, dy is the offset of its
+    top-left corner from the putText origin.
+    """
+    __slots__ = ("color", "inverse", "dx", "dy", "_scratch")
+
+    def __init__(self, bgr, alpha, dx, dy):
+        alpha = cv2.merge([alpha] * 3)
+        self.color = cv2.multiply(bgr, alpha, scale=1 / 255)
+        self.inverse = cv2.bitwise_not(alpha)
+        self.dx = dx
+        self.dy = dy
+        self._scratch = np.empty_like(bgr)
+
+    @property
+    def shape(self):
+        return self.inverse.shape[:2]
+
+
+def render_text(text, font_scale, color, thickness, font=cv2.FONT_HERSHEY_SIMPLEX, line_type=cv2.LINE_8):
+    """
+    Rasterize text into a TextSprite with the pixels cv2.putText draws.
+    """
+    (w, h), baseline = cv2.getTextSize(text, font, font_scale, thickness)
+    pad = thickness + 1
+    alpha = np.zeros((h + baseline + 2 * pad, w + 2 * pad), dtype=np.uint8)
+    cv2.putText(alpha, text, (pad, pad + h), font, font_scale, 255, thickness, line_type)
+    bgr = np.empty(alpha.shape + (3,), dtype=np.uint8)
+    bgr[:] = color
+    return TextSprite(bgr, alpha, -pad, -(pad + h))
+
+
+def blend(display, sprite, org):
+    """
+    Draw sprite into display with its putText origin at org, clipped to the frame.
+    """
+    x0, y0 = org[0] + sprite.dx, org[1] + sprite.dy
+    sh, sw = sprite.shape
+    dh, dw = display.shape[:2]
+    left, top = max(0, -x0), max(0, -y0)
+    right, bottom = min(sw, dw - x0), min(sh, dh - y0)
+    if right <= left or bottom <= top:
+        return
+    region = display[y0 + top:y0 + bottom, x0 + left:x0 + right]
+    if (top, left, bottom, right) == (0, 0, sh, sw):
+        color, inverse, scratch = sprite.color, sprite.inverse, sprite._scratch
+    else:
+        # Partly off screen
+        color = sprite.color[top:bottom, left:right]
+        inverse = sprite.inverse[top:bottom, left:right]
+        scratch = None
+    background = cv2.multiply(region, inverse, dst=scratch, scale=1 / 255)
+    cv2.add(background, color, dst=region)
+
+
+class TextCache:
+    """
+    LRU cache of TextSprites. draw() takes the same arguments as cv2.putText.
+    """
+
+    def __init__(self, max_sprites=256):
+        self.max_sprites = max_sprites
+        self._sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def sprite(self, text, font_scale, color, thickness, font=cv2.FONT_HERSHEY_SIMPLEX, line_type=cv2.LINE_8):
+        key = (text, font, font_scale, tuple(color), thickness, line_type)
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self._sprites.move_to_end(key)
+            self.hits += 1
+            return sprite
+        self.misses += 1
+        sprite = self._sprites[key] = render_text(text, font_scale, color, thickness, font, line_type)
+        if len(self._sprites) > self.max_sprites:
+            self._sprites.popitem(last=False)
+        return sprite
+
+    def draw(self, display, text, org, font, font_scale, color, thickness=1, line_type=cv2.LINE_8):
+        blend(display, self.sprite(text, font_scale, color, thickness, font, line_type), org)
+
+    def __len__(self):
+        return len(self._sprites)